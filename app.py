@@ -1,42 +1,13 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+from uneb.data import district_summary, overall_summary, preview
+from uneb.layout import configure_page, district_label, select_scope
 
 # Set page configuration
-st.set_page_config(
-    page_title="Moyo & Adjumani Schools UNEB 2024 Analysis",
-    page_icon="🏫",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
+configure_page()
 
-# Load data
-@st.cache_data
-def load_data():
-    df = pd.read_excel('moyo_adjumani_schools.xlsx', sheet_name='Sheet1')
-    
-    # Clean and prepare the data
-    df.columns = df.columns.str.strip()
-    df = df.apply(lambda x: x.str.strip() if x.dtype == "object" else x)
-    
-    # Calculate performance metrics
-    df['Total_Students'] = df[['As', 'Bs', 'Cs', 'Ds', 'Es', 'Absent']].sum(axis=1)
-    df['Pass_Rate'] = (df['As'] + df['Bs'] + df['Cs']) / (df['Total_Students'] - df['Absent']) * 100
-    df['Excellent_Performance'] = (df['As'] + df['Bs']) / (df['Total_Students'] - df['Absent']) * 100
-    df['Failure_Rate'] = (df['Ds'] + df['Es']) / (df['Total_Students'] - df['Absent']) * 100
-    
-    # Create district-specific dataframes
-    moyo_df = df[df['DistrictName'] == 'MOYO']
-    adjumani_df = df[df['DistrictName'] == 'ADJUMANI']
-    
-    return df, moyo_df, adjumani_df
-
-df, moyo_df, adjumani_df = load_data()
+year, selected = select_scope()
+totals = overall_summary(year, selected)
+districts = district_summary(year, selected)
 
 # Main page
 st.title("🏫 MADI SUB-REGION SCHOOL PERFORAMCE DASHBOARD")
@@ -50,26 +21,26 @@ st.subheader("📊 Key Performance Indicators")
 col1, col2, col3, col4 = st.columns(4)
 
 with col1:
-    st.metric("Total Schools", len(df))
+    st.metric("Total Schools", int(totals['Schools']))
 with col2:
-    st.metric("Total Students", f"{df['Total_Students'].sum():,}")
+    st.metric("Total Students", f"{int(totals['Total_Students']):,}")
 with col3:
-    st.metric("Average Pass Rate", f"{df['Pass_Rate'].mean():.1f}%")
+    st.metric("Average Pass Rate", f"{totals['Pass_Rate']:.1f}%")
 with col4:
-    st.metric("Average Failure Rate", f"{df['Failure_Rate'].mean():.1f}%")
+    st.metric("Average Failure Rate", f"{totals['Failure_Rate']:.1f}%")
 
 # District comparison
 st.subheader("🏛️ District Comparison")
-col1, col2 = st.columns(2)
+ranked = districts.sort_values('Pass_Rate', ascending=False)
+cols = st.columns(min(len(ranked), 4))
 
-with col1:
-    st.metric("Moyo Average Pass Rate", f"{moyo_df['Pass_Rate'].mean():.1f}%")
-with col2:
-    st.metric("Adjumani Average Pass Rate", f"{adjumani_df['Pass_Rate'].mean():.1f}%")
+for i, (name, row) in enumerate(ranked.iterrows()):
+    with cols[i % len(cols)]:
+        st.metric(f"{district_label(name)} Average Pass Rate", f"{row['Pass_Rate']:.1f}%")
 
 # Data preview
 st.subheader("📋 Data Preview")
-st.dataframe(df.head(10))
+st.dataframe(preview(10, year, selected))
 
 # Footer
 st.markdown("---")
@@ -0,0 +1 @@
+"""Benchmarks for the dashboard's data layer and pages (see benchmarks/run.py)."""
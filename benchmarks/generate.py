@@ -0,0 +1,104 @@
+"""Synthetic UNEB school-results workbooks for benchmarking.
+
+The generated sheets have the same layout as ``moyo_adjumani_schools.xlsx``
+(No, DistrictName, CentreName, As..Es, Absent, Total) with distributions
+fitted to the real 2024 data: log-normal school sizes around ~700
+candidates, a grade mix centred on 2% A / 17% B / 49% C / 30% D / 2% E that
+shifts with a per-district and per-school quality effect, and absences on
+roughly a quarter of centres.
+
+    python -m benchmarks.generate --centres 10000 --districts 60 --out results.xlsx
+"""
+import argparse
+from pathlib import Path
+
+import numpy as np
+from openpyxl import Workbook
+
+HEADER = ['No', 'DistrictName', 'CentreName', 'As', 'Bs', 'Cs', 'Ds', 'Es', ' Absent', 'Total']
+
+# Share of graded candidates per grade in the real 2024 Madi results
+GRADE_MIX = np.array([0.018, 0.167, 0.494, 0.302, 0.019])
+
+DISTRICTS = [
+    'ADJUMANI', 'MOYO', 'OBONGI', 'YUMBE', 'KOBOKO', 'ARUA', 'MARACHA', 'TEREGO', 'MADI-OKOLLO',
+    'NEBBI', 'PAKWACH', 'ZOMBO', 'GULU', 'AMURU', 'NWOYA', 'OMORO', 'KITGUM', 'PADER', 'AGAGO',
+    'LAMWO', 'LIRA', 'ALEBTONG', 'OTUKE', 'DOKOLO', 'AMOLATAR', 'APAC', 'KWANIA', 'OYAM', 'KOLE',
+    'SOROTI', 'SERERE', 'KABERAMAIDO', 'KALAKI', 'KUMI', 'NGORA', 'BUKEDEA', 'MBALE', 'MANAFWA',
+    'NAMISINDWA', 'BUDUDA', 'SIRONKO', 'BULAMBULI', 'KAPCHORWA', 'KWEEN', 'BUKWO', 'TORORO', 'BUSIA',
+    'BUTALEJA', 'PALLISA', 'BUDAKA', 'KIBUKU', 'JINJA', 'KAMULI', 'IGANGA', 'MAYUGE', 'BUGIRI',
+    'NAMAYINGO', 'LUUKA', 'BUYENDE', 'KALIRO', 'MUKONO', 'BUIKWE', 'KAYUNGA', 'WAKISO', 'KAMPALA',
+    'MPIGI', 'BUTAMBALA', 'GOMBA', 'MITYANA', 'MUBENDE', 'KASSANDA', 'LUWERO', 'NAKASEKE', 'NAKASONGOLA',
+    'MASAKA', 'KALUNGU', 'BUKOMANSIMBI', 'LWENGO', 'RAKAI', 'KYOTERA', 'ISINGIRO', 'MBARARA',
+    'KIRUHURA', 'IBANDA', 'BUSHENYI', 'SHEEMA', 'RUKUNGIRI', 'KANUNGU', 'KABALE', 'RUBANDA', 'KISORO',
+    'NTUNGAMO', 'HOIMA', 'KIKUUBE', 'MASINDI', 'KIRYANDONGO', 'BULIISA', 'KIBAALE', 'KAGADI',
+    'KAKUMIRO', 'FORT PORTAL', 'KABAROLE', 'KYENJOJO', 'KYEGEGWA', 'KAMWENGE', 'KASESE', 'BUNDIBUGYO',
+    'NTOROKO', 'MOROTO', 'NAPAK', 'NAKAPIRIPIRIT', 'AMUDAT', 'KOTIDO', 'KAABONG', 'ABIM',
+]
+
+_PREFIXES = ['ST.MARY', 'ST.JOSEPH', 'ST.PAUL', 'ST.KIZITO', 'COMBONI', 'MODEL', 'SEED', 'PARENTS',
+             'TOWN', 'ISLAMIC', 'CHRIST THE KING', 'UGANDA MARTYRS', 'BISHOP', 'HILLSIDE', 'VALLEY']
+_KINDS = ['SECONDARY SCHOOL', 'SECONDARY SCHOOL', 'SECONDARY SCHOOL', 'COLLEGE', 'HIGH SCHOOL',
+          'COMPREHENSIVE COLLEGE', 'SEED SECONDARY SCHOOL']
+
+
+def district_names(count):
+    """``count`` district names: real ones first, then numbered extras."""
+    names = DISTRICTS[:count]
+    return names + [f'DISTRICT {i:03d}' for i in range(len(names) + 1, count + 1)]
+
+
+def generate_rows(centres, districts=40, seed=0):
+    """Yield one worksheet row per synthetic centre."""
+    rng = np.random.default_rng(seed)
+    names = district_names(districts)
+
+    district_quality = rng.normal(0, 0.5, len(names))
+    district_of = rng.integers(0, len(names), centres)
+    quality = district_quality[district_of] + rng.normal(0, 0.6, centres)
+
+    sizes = np.clip(rng.lognormal(np.log(650), 0.6, centres), 30, 4000).astype(int)
+
+    # Tilt the grade mix towards A/B (or D/E) by the school's quality
+    tilt = np.exp(np.outer(quality, [1.0, 0.6, 0.0, -0.5, -1.0]))
+    mix = GRADE_MIX * tilt
+    mix /= mix.sum(axis=1, keepdims=True)
+
+    absent = np.where(rng.random(centres) < 0.28, rng.poisson(12, centres), 0)
+    for i in range(centres):
+        grades = rng.multinomial(sizes[i] - min(absent[i], sizes[i] - 1), rng.dirichlet(mix[i] * 200))
+        place = names[district_of[i]]
+        name = f"{_PREFIXES[i % len(_PREFIXES)]} {_KINDS[(i // 7) % len(_KINDS)]},{place} {i:06d}"
+        a = int(min(absent[i], sizes[i] - 1))
+        yield [i + 1, place, name, *map(int, grades), a, int(grades.sum()) + a]
+
+
+def generate(path, centres, districts=40, seed=0, sheets=1):
+    """Write a workbook of ``centres`` schools across ``districts`` districts."""
+    wb = Workbook(write_only=True)
+    rows = generate_rows(centres, districts, seed)
+    per_sheet = -(-centres // sheets)
+    for s in range(sheets):
+        ws = wb.create_sheet(f'Sheet{s + 1}')
+        ws.append(HEADER)
+        for _, row in zip(range(per_sheet), rows):
+            ws.append(row)
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    wb.save(path)
+    return Path(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--centres', type=int, default=1000)
+    parser.add_argument('--districts', type=int, default=40)
+    parser.add_argument('--sheets', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', required=True)
+    args = parser.parse_args(argv)
+    path = generate(args.out, args.centres, args.districts, args.seed, args.sheets)
+    print(f"Wrote {args.centres} centres in {args.districts} districts to {path}")
+
+
+if __name__ == '__main__':
+    main()
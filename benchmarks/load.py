@@ -0,0 +1,395 @@
+"""Concurrent-viewer load test: rerun latency, throughput and server memory per viewer count.
+
+One ``streamlit run`` server is started over a synthetic dataset, and
+simulated viewers connect to it over its websocket, as browsers do, and
+browse the app the way district officers do around results release: they
+open pages (weighted towards the landing page, the ranking and the school
+comparison), narrow the sidebar to a few districts, and change the select
+boxes, search box and page number on each page, with an exponentially
+distributed think time between actions. The district selection carries over
+from page to page, as it does in the browser.
+
+The viewers therefore share the server's caches and its CPU as real ones
+do. First one viewer visits every page to warm the caches, as the first
+visitor of the day would, and the server's resident memory is taken as the
+baseline. Then viewers join until each session count is reached, and all
+connected viewers play their actions together. Each level reports:
+
+* rerun latency percentiles (p50/p95/p99) overall, per page and per action,
+  from sending the rerun to the server reporting the script finished
+* throughput, in reruns per second of wall time
+* the server's resident memory after the level
+
+Sessions stay connected from one level to the next, so memory is that of a
+server holding that many sessions. Its growth from level to level is the
+cost of the extra sessions and their cached views; memory the server hands
+back after the warm-up can put the first levels below the baseline. Chart
+images are not downloaded, so the timings cover the reruns, not serving the
+media files.
+
+A level fails (and the command exits 1) when any rerun raised or the
+reruns do not add up to ``sessions * actions``.
+
+    python -m benchmarks.load                                 # 1, 4 and 16 viewers, 1k centres
+    python -m benchmarks.load --sessions 8 32 --centres 10000 --think 0 --output load.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+from benchmarks.run import ROOT, workbook_for
+
+DEFAULT_SESSIONS = [1, 4, 16]
+
+# How often a viewer opens each page, relative to the others (default 1)
+PAGE_WEIGHTS = {'app.py': 4, 'School_Ranking.py': 3, 'School_Comparison.py': 3, 'Overall_Performance.py': 2}
+
+# Chance that an action opens another page, and that it changes the sidebar districts
+NAVIGATE = 0.3
+SCOPE = 0.15
+
+# Input widgets viewers change, by their element type in Streamlit's protocol
+WIDGETS = {'selectbox', 'multiselect', 'number_input', 'text_input'}
+SIDEBAR = 1
+
+PERCENTILES = [50, 95, 99]
+TIMEOUT = 600
+
+
+def _server_rss_mb(pid):
+    try:
+        with open(f'/proc/{pid}/status') as fh:
+            kib = next(int(line.split()[1]) for line in fh if line.startswith('VmRSS:'))
+    except OSError:
+        # No /proc (macOS)
+        kib = int(subprocess.run(['ps', '-o', 'rss=', '-p', str(pid)], capture_output=True, text=True).stdout)
+    return round(kib / 1024, 1)
+
+
+def _label(path):
+    # Page names as the server's navigation lists them, as script paths
+    return f'pages/{path}.py' if path else 'app.py'
+
+
+class Viewer:
+    """One simulated viewer: a session of the server, on one page at a time."""
+
+    def __init__(self, url, rng, think, queries):
+        self.url = url
+        self.rng = rng
+        self.think = think
+        self.queries = queries
+        self.socket = None
+        self.pages = {}
+        self.page = None
+        self.widgets = {}
+        self.states = {}
+        self.timings = []
+        self.errors = []
+
+    async def connect(self):
+        try:
+            import websockets
+        except ImportError:
+            raise RuntimeError("the load test needs the websockets package (pip install websockets)") from None
+        self.socket = await websockets.connect(self.url, subprotocols=['streamlit'], max_size=None)
+
+    async def close(self):
+        await self.socket.close()
+
+    async def _run(self, action, page_hash):
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        message = BackMsg()
+        message.rerun_script.page_script_hash = page_hash
+        message.rerun_script.widget_states.widgets.extend(self.states.values())
+        start = time.perf_counter()
+        await self.socket.send(message.SerializeToString())
+        widgets = {}
+        while True:
+            forward = ForwardMsg()
+            forward.ParseFromString(await asyncio.wait_for(self.socket.recv(), TIMEOUT))
+            kind = forward.WhichOneof('type')
+            if kind == 'navigation':
+                self.pages = {_label(page.url_pathname): page.page_script_hash
+                              for page in forward.navigation.app_pages}
+            elif kind == 'delta' and forward.delta.WhichOneof('type') == 'new_element':
+                element = forward.delta.new_element
+                name = element.WhichOneof('type')
+                if name == 'exception':
+                    self.errors.append(f"{self.page} ({action}): {element.exception.message}")
+                elif name in WIDGETS:
+                    widget = getattr(element, name)
+                    widgets[widget.id] = name, widget, forward.metadata.delta_path[0] == SIDEBAR
+            elif kind == 'script_finished':
+                if forward.script_finished != ForwardMsg.FINISHED_SUCCESSFULLY:
+                    self.errors.append(f"{self.page} ({action}): {ForwardMsg.ScriptFinishedStatus.Name(forward.script_finished)}")
+                break
+        self.timings.append((self.page, action, time.perf_counter() - start))
+        # Like the browser, send back the values of the widgets still shown
+        self.widgets = widgets
+        self.states = {key: state for key, state in self.states.items() if key in widgets}
+
+    async def visit(self, page):
+        self.page = page
+        self.states = {}
+        await self._run('open', self.pages.get(page, ''))
+
+    def _set(self, key):
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        self.states[key] = state = WidgetState(id=key)
+        return state
+
+    def _chosen(self, key):
+        if key in self.states:
+            return list(self.states[key].string_array_value.data)
+        _, widget, _ = self.widgets[key]
+        return [widget.options[i] for i in widget.default]
+
+    def _choices(self):
+        # (action, widget id) pairs for the widgets on the current page
+        choices = []
+        for key, (name, widget, sidebar) in self.widgets.items():
+            if sidebar:
+                continue
+            if name == 'selectbox' and len(widget.options) > 1:
+                choices.append(('select', key))
+            elif name == 'text_input':
+                choices.append(('search', key))
+            elif name == 'number_input' and widget.has_min and widget.has_max and widget.max != widget.min:
+                choices.append(('page', key))
+            elif name == 'multiselect' and set(widget.options) - set(self._chosen(key)):
+                choices.append(('pick', key))
+        return choices
+
+    async def interact(self):
+        rng = self.rng
+        pickers = [key for key, (name, _, sidebar) in self.widgets.items() if sidebar and name == 'multiselect']
+        choices = self._choices()
+        if pickers and (rng.random() < SCOPE or not choices):
+            options = list(self.widgets[pickers[0]][1].options)
+            # Half the time back to every district, otherwise one to three of them
+            chosen = [] if rng.random() < 0.5 else rng.sample(options, rng.randint(1, min(3, len(options))))
+            self._set(pickers[0]).string_array_value.data.extend(chosen)
+            action = 'scope'
+        elif not choices:
+            action = 'rerun'
+        else:
+            action, key = rng.choice(choices)
+            widget = self.widgets[key][1]
+            if action == 'select':
+                self._set(key).string_value = rng.choice(list(widget.options))
+            elif action == 'search':
+                self._set(key).string_value = rng.choice(self.queries)
+            elif action == 'page':
+                self._set(key).double_value = rng.randint(int(widget.min), int(widget.max))
+            else:
+                chosen = self._chosen(key)
+                extra = rng.choice(sorted(set(widget.options) - set(chosen)))
+                self._set(key).string_array_value.data.extend(chosen + [extra])
+        await self._run(action, self.pages.get(self.page, ''))
+
+    async def play(self, actions, entries, weights):
+        for step in range(actions):
+            if step and self.think:
+                await asyncio.sleep(self.rng.expovariate(1 / self.think))
+            try:
+                if not step or self.rng.random() < NAVIGATE:
+                    await self.visit(self.rng.choices(entries, weights)[0])
+                else:
+                    await self.interact()
+            except Exception as exc:
+                # Recorded, not raised: the rerun is missing from the timings and fails the level
+                self.errors.append(f"{self.page} (step {step + 1}): {type(exc).__name__}: {exc}")
+
+
+def _search_words(names, count=40, seed=0):
+    # Words viewers would type, taken from the centre names themselves
+    words = sorted({w for name in names for w in str(name).replace(',', ' ').split() if len(w) > 2})
+    return random.Random(seed).sample(words, min(count, len(words))) or ['school']
+
+
+def _percentiles(seconds):
+    values = np.percentile(seconds, PERCENTILES) if seconds else [float('nan')] * len(PERCENTILES)
+    return {f'p{p}_s': round(float(v), 4) for p, v in zip(PERCENTILES, values)}
+
+
+def _summary(timings, key):
+    groups = defaultdict(list)
+    for timing in timings:
+        groups[timing[key]].append(timing[2])
+    return {name: {'reruns': len(seconds), **_percentiles(seconds)} for name, seconds in sorted(groups.items())}
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def serve(workbook, snapshots):
+    """A ``streamlit run`` server of the app over ``workbook``; yields ``(process, websocket url)``."""
+    port = _free_port()
+    env = {**os.environ, 'UNEB_WORKBOOKS': str(workbook), 'UNEB_SNAPSHOT_DIR': snapshots}
+    log = tempfile.TemporaryFile()
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'streamlit', 'run', str(ROOT / 'app.py'), '--server.headless', 'true',
+         '--server.address', '127.0.0.1', '--server.port', str(port), '--server.fileWatcherType', 'none',
+         '--browser.gatherUsageStats', 'false'],
+        cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT,
+    )
+    try:
+        deadline = time.monotonic() + TIMEOUT
+        while True:
+            try:
+                with urllib.request.urlopen(f'http://127.0.0.1:{port}/_stcore/health', timeout=5):
+                    break
+            except OSError:
+                if server.poll() is not None or time.monotonic() > deadline:
+                    log.seek(0)
+                    raise RuntimeError(f"streamlit server did not start:\n{log.read().decode()[-2000:]}")
+                time.sleep(0.2)
+        yield server, f'ws://127.0.0.1:{port}/_stcore/stream'
+    finally:
+        server.terminate()
+        server.wait()
+        log.close()
+
+
+async def _levels(server, url, levels, actions, think, seed, entries, weights, queries):
+    # Imports, data load and every page's default view, as the first visitor of the day pays them
+    warm = Viewer(url, random.Random(seed), 0, queries)
+    await warm.connect()
+    await warm.visit('app.py')
+    for page in entries:
+        await warm.visit(page)
+    await warm.close()
+    baseline = _server_rss_mb(server.pid)
+
+    viewers, results = [], []
+    for sessions in levels:
+        while len(viewers) < sessions:
+            viewer = Viewer(url, random.Random(seed + len(viewers) + 1), think, queries)
+            viewer.pages = warm.pages
+            await viewer.connect()
+            viewers.append(viewer)
+        for viewer in viewers:
+            viewer.timings, viewer.errors = [], []
+        began = time.perf_counter()
+        await asyncio.gather(*(viewer.play(actions, entries, weights) for viewer in viewers))
+        wall = time.perf_counter() - began
+
+        timings = [timing for viewer in viewers for timing in viewer.timings]
+        errors = [error for viewer in viewers for error in viewer.errors]
+        if len(timings) != sessions * actions:
+            errors.append(f"{len(timings)} of {sessions * actions} reruns completed")
+        results.append({
+            'sessions': sessions,
+            'reruns': len(timings),
+            'wall_s': round(wall, 3),
+            'throughput_per_s': round(len(timings) / wall, 2),
+            **_percentiles([t[2] for t in timings]),
+            'pages': _summary(timings, 0),
+            'actions': _summary(timings, 1),
+            'server_rss_mb': _server_rss_mb(server.pid),
+            'failed': bool(errors),
+            'errors': sorted(set(errors))[:20],
+        })
+    for viewer in viewers:
+        await viewer.close()
+    return baseline, results
+
+
+def measure(levels, centres, actions, think, seed):
+    """Serve the app once and load it with each of ``levels`` concurrent viewers, in increasing order."""
+    workbook, districts = workbook_for(centres)
+    snapshots = tempfile.mkdtemp(prefix='uneb-load-')
+    os.environ['UNEB_WORKBOOKS'] = str(workbook)
+    os.environ['UNEB_SNAPSHOT_DIR'] = snapshots
+    # Parse once here, so the server starts from the snapshot
+    from uneb.refresh import LiveDataset
+    queries = _search_words(LiveDataset(interval=0).state.frame['CentreName'].unique(), seed=seed)
+
+    entries = ['app.py'] + [f'pages/{page.name}' for page in sorted((ROOT / 'pages').glob('*.py'))]
+    weights = [PAGE_WEIGHTS.get(os.path.basename(page), 1) for page in entries]
+    with serve(workbook, snapshots) as (server, url):
+        baseline, results = asyncio.run(_levels(server, url, sorted(set(levels)), actions, think, seed,
+                                                entries, weights, queries))
+    return {'centres': centres, 'districts': districts, 'server_rss_baseline_mb': baseline}, results
+
+
+def _row(label, stats):
+    times = '  '.join(f"p{p} {stats[f'p{p}_s']:7.3f}s" for p in PERCENTILES)
+    return f"  {label:36s} {stats['reruns']:5d} reruns  {times}"
+
+
+def report(results):
+    meta = results['meta']
+    print(f"\nOne server, {meta['centres']} centres; resident memory after warm-up "
+          f"{meta['server_rss_baseline_mb']} MB")
+    for level in results['levels']:
+        print(f"\n{level['sessions']} viewer(s): {level['reruns']} reruns in "
+              f"{level['wall_s']:.1f}s ({level['throughput_per_s']:.2f}/s), "
+              f"server RSS {level['server_rss_mb']} MB" + ("  FAILED" if level['failed'] else ""))
+        print(_row('all reruns', level))
+        for page, stats in level['pages'].items():
+            print(_row(page, stats))
+        for action, stats in level['actions'].items():
+            print(_row(f'[{action}]', stats))
+        for error in level['errors']:
+            print(f"  ERROR: {error}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sessions', type=int, nargs='+', default=DEFAULT_SESSIONS,
+                        help='concurrent viewer counts to measure (default: 1 4 16)')
+    parser.add_argument('--centres', type=int, default=1000, help='size of the synthetic dataset (default: 1000)')
+    parser.add_argument('--actions', type=int, default=20, help='page visits and interactions per viewer and level')
+    parser.add_argument('--think', type=float, default=0.5,
+                        help='mean seconds between a viewer\'s actions; 0 for back-to-back (default: 0.5)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', type=Path, help='write results JSON here')
+    args = parser.parse_args(argv)
+
+    print(f"Load testing {', '.join(map(str, sorted(set(args.sessions))))} viewer(s)...", file=sys.stderr)
+    served, levels = measure(args.sessions, args.centres, args.actions, args.think, args.seed)
+    results = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'actions': args.actions,
+            'think_s': args.think,
+            'seed': args.seed,
+            **served,
+        },
+        'levels': levels,
+    }
+    report(results)
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=1))
+    return 1 if any(level['failed'] for level in results['levels']) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,191 @@
+"""Benchmark the data layer and every page against synthetic workbooks.
+
+For each dataset size a fresh worker process generates (or reuses) a
+synthetic workbook, then measures:
+
+* ``parse_s``     - cold load: Excel parse, cleaning and metrics, snapshot write
+* ``snapshot_s``  - warm load from the on-disk snapshot with Streamlit caches cleared
+* per page        - ``first_s`` (first headless run through Streamlit's AppTest,
+                    chart cache cold) and ``rerun_s`` (same session rerun)
+* ``peak_rss_mb`` - the worker's peak resident memory after all of the above
+
+Results are written as JSON. Compare against the committed baseline with
+``--check`` (non-zero exit on regressions) or refresh it with
+``--update-baseline``:
+
+    python -m benchmarks.run --sizes 100 1000 10000 --check
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+DATA_DIR = Path(__file__).resolve().parent / 'data'
+BASELINE = Path(__file__).resolve().parent / 'baseline.json'
+
+# 100000 centres works too (pass --sizes) but takes several minutes per run
+DEFAULT_SIZES = [100, 1000, 10000]
+
+# A timing regresses when it exceeds the baseline by this factor (and by
+# at least MIN_DELTA_S, so sub-millisecond noise is ignored)
+TOLERANCE = 1.25
+MIN_DELTA_S = 0.05
+
+
+def pages():
+    return [ROOT / 'app.py'] + sorted((ROOT / 'pages').glob('*.py'))
+
+
+def workbook_for(centres):
+    districts = max(2, min(135, centres // 40))
+    path = DATA_DIR / f'uneb_{centres}.xlsx'
+    if not path.exists():
+        from benchmarks.generate import generate
+        generate(path, centres, districts)
+    return path, districts
+
+
+def _peak_rss_mb():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1 << 20 if sys.platform == 'darwin' else 1 << 10), 1)
+
+
+def measure(centres):
+    """Run every measurement for one size in this process and return the results."""
+    workbook, districts = workbook_for(centres)
+    os.environ['UNEB_WORKBOOKS'] = str(workbook)
+    os.environ['UNEB_SNAPSHOT_DIR'] = tempfile.mkdtemp(prefix='uneb-bench-')
+    sys.path.insert(0, str(ROOT))
+    os.chdir(ROOT)
+
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+    from uneb import data
+
+    result = {'centres': centres, 'districts': districts,
+              'workbook_bytes': workbook.stat().st_size}
+
+    start = time.perf_counter()
+    data.load_data()
+    result['parse_s'] = round(time.perf_counter() - start, 4)
+
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    start = time.perf_counter()
+    data.load_data()
+    result['snapshot_s'] = round(time.perf_counter() - start, 4)
+
+    result['pages'] = {}
+    for page in pages():
+        at = AppTest.from_file(str(page), default_timeout=600)
+        start = time.perf_counter()
+        at.run()
+        first = time.perf_counter() - start
+        start = time.perf_counter()
+        at.run()
+        rerun = time.perf_counter() - start
+        result['pages'][page.name] = {
+            'first_s': round(first, 4),
+            'rerun_s': round(rerun, 4),
+            'errors': [str(e.value) for e in at.exception],
+        }
+
+    result['peak_rss_mb'] = _peak_rss_mb()
+    return result
+
+
+def run_size(centres):
+    """Measure one size in a fresh interpreter so memory and caches start clean."""
+    proc = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.run', '--worker', str(centres)],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"benchmark worker for {centres} centres failed:\n{proc.stderr}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def timings(results):
+    """Flatten results into {'<size>/<name>': seconds}."""
+    flat = {}
+    for size, res in results['sizes'].items():
+        for key in ('parse_s', 'snapshot_s'):
+            flat[f'{size}/{key}'] = res[key]
+        for page, times in res['pages'].items():
+            for key in ('first_s', 'rerun_s'):
+                flat[f'{size}/{page}/{key}'] = times[key]
+    return flat
+
+
+def regressions(results, baseline):
+    current, base = timings(results), timings(baseline)
+    found = []
+    for key, seconds in sorted(current.items()):
+        old = base.get(key)
+        if old is not None and seconds > old * TOLERANCE and seconds - old > MIN_DELTA_S:
+            found.append(f'{key}: {old:.3f}s -> {seconds:.3f}s (x{seconds / old:.2f})')
+    return found
+
+
+def report(results):
+    for size, res in results['sizes'].items():
+        print(f"\n{size} centres / {res['districts']} districts: parse {res['parse_s']:.3f}s, "
+              f"snapshot {res['snapshot_s']:.3f}s, peak RSS {res['peak_rss_mb']} MB")
+        for page, times in res['pages'].items():
+            errors = f"  ERRORS: {times['errors']}" if times['errors'] else ''
+            print(f"  {page:36s} first {times['first_s']:8.3f}s  rerun {times['rerun_s']:8.3f}s{errors}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--output', type=Path, help='write results JSON here')
+    parser.add_argument('--baseline', type=Path, default=BASELINE)
+    parser.add_argument('--check', action='store_true', help='exit 1 on regressions against the baseline')
+    parser.add_argument('--update-baseline', action='store_true')
+    parser.add_argument('--worker', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        print(json.dumps(measure(args.worker)))
+        return 0
+
+    results = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+        },
+        'sizes': {},
+    }
+    for centres in args.sizes:
+        print(f"Benchmarking {centres} centres...", file=sys.stderr)
+        results['sizes'][str(centres)] = run_size(centres)
+    report(results)
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=1))
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(results, indent=1))
+        print(f"\nBaseline written to {args.baseline}")
+    elif args.baseline.exists():
+        found = regressions(results, json.loads(args.baseline.read_text()))
+        print("\nRegressions against baseline:" if found else "\nNo regressions against baseline.")
+        for line in found:
+            print(f"  {line}")
+        if found and args.check:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
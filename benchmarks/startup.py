@@ -0,0 +1,137 @@
+"""Cold-start budget and import-time profile of the landing page and every page.
+
+Each entry point is run once in a fresh interpreter under ``python -X
+importtime`` (data snapshot warm, chart cache cold). For each one this
+reports the wall time from interpreter start to the rendered page, how long
+the page script itself took, and the heaviest packages it imported. The
+landing page's cold start is checked against the budget in
+``startup.json``:
+
+    python -m benchmarks.startup                # profile every entry point
+    python -m benchmarks.startup --check        # exit 1 if app.py is over budget
+    python -m benchmarks.startup --update-budget
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from benchmarks.run import ROOT, pages
+
+BUDGET_FILE = Path(__file__).resolve().parent / 'startup.json'
+
+# New budgets leave this much headroom over the measured cold start
+HEADROOM = 1.3
+
+# Imports after this line on stderr were triggered by the page script
+MARKER = '--- page run ---'
+
+# Packages no page should need before it actually draws something
+HEAVY = ['matplotlib', 'seaborn', 'plotly', 'scipy']
+
+_IMPORT_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+
+def worker(page):
+    sys.path.insert(0, str(ROOT))
+    os.chdir(ROOT)
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(str(ROOT / page), default_timeout=300)
+    loaded = set(sys.modules)
+    print(MARKER, file=sys.stderr, flush=True)
+    start = time.perf_counter()
+    at.run()
+    print(json.dumps({
+        'page_s': time.perf_counter() - start,
+        'errors': [str(e.value) for e in at.exception],
+        # Streamlit itself may already have imported some of them
+        'heavy': [name for name in HEAVY if name in sys.modules and name not in loaded],
+    }))
+
+
+def profile(stderr, top=8):
+    """Cumulative import seconds per top-level package imported by the page script."""
+    _, _, after = stderr.partition(MARKER)
+    packages = defaultdict(float)
+    for match in _IMPORT_LINE.finditer(after):
+        _, cumulative, indent, name = match.groups()
+        # Only count outermost imports so nested ones are not added twice
+        if len(indent) == 1:
+            packages[name.split('.')[0]] += int(cumulative) / 1e6
+    ranked = sorted(packages.items(), key=lambda item: -item[1])[:top]
+    return {name: round(seconds, 4) for name, seconds in ranked}
+
+
+def measure(page):
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-m', 'benchmarks.startup', '--worker', page],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    wall = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(f"startup worker for {page} failed:\n{proc.stderr[-2000:]}")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    return {
+        'cold_start_s': round(wall, 4),
+        'page_s': round(result['page_s'], 4),
+        'heavy_modules': result['heavy'],
+        'page_imports_s': profile(proc.stderr),
+        'errors': result['errors'],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pages', nargs='+', help='entry points relative to the repo (default: all)')
+    parser.add_argument('--check', action='store_true', help='exit 1 if app.py is over budget')
+    parser.add_argument('--update-budget', action='store_true')
+    parser.add_argument('--output', type=Path, help='write results JSON here')
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        worker(args.worker)
+        return 0
+
+    entries = args.pages or [str(p.relative_to(ROOT)) for p in pages()]
+    if args.check or args.update_budget:
+        entries = list(dict.fromkeys(['app.py', *entries]))
+    # Make sure the data snapshot exists so every run measures the same warm-data start
+    measure('app.py')
+
+    results = {}
+    for page in entries:
+        results[page] = res = measure(page)
+        heavy = ', '.join(res['heavy_modules']) or 'none'
+        print(f"{page:40s} cold start {res['cold_start_s']:6.2f}s  page {res['page_s']:6.2f}s  heavy: {heavy}")
+        for name, seconds in res['page_imports_s'].items():
+            print(f"    {name:30s} {seconds * 1000:8.1f} ms")
+        if res['errors']:
+            print(f"    ERRORS: {res['errors']}")
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=1))
+    if args.update_budget:
+        budget = round(results['app.py']['cold_start_s'] * HEADROOM, 2)
+        BUDGET_FILE.write_text(json.dumps({'app.py': {'budget_s': budget}, 'measured': results}, indent=1))
+        print(f"\nBudget for app.py set to {budget:.2f}s in {BUDGET_FILE}")
+    elif BUDGET_FILE.exists():
+        budget = json.loads(BUDGET_FILE.read_text())['app.py']['budget_s']
+        took = results['app.py']['cold_start_s'] if 'app.py' in results else None
+        if took is not None:
+            over = took > budget
+            print(f"\napp.py cold start {took:.2f}s, budget {budget:.2f}s: {'OVER BUDGET' if over else 'ok'}")
+            if over and args.check:
+                return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,8 +1,10 @@
 import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
 import numpy as np
-from app import df
+from uneb.charts import show_chart
+from uneb.data import METRICS, district_summary, school_index, schools_at
+from uneb.layout import configure_page
+
+configure_page()
 
 st.title("🏫 ATF SUPPORTED SCHOOLS PERFORMANCE ANALYSIS")
 st.subheader("Comparative Analysis: MOYO SECONDARY SCHOOL vs BEZZA AL-HIJJI SECONDARY SCHOOL")
@@ -13,8 +15,9 @@ Amani Transformational Foundation, highlighting their performance metrics, stren
 """)
 
 # Filter data for the two schools
-moyo_school = df[df['CentreName'].str.contains('MOYO SECONDARY SCHOOL', case=False)]
-bezza_school = df[df['CentreName'].str.contains('BEZZA AL-HIJJI SECONDARY SCHOOL', case=False)]
+index = school_index()
+moyo_school = schools_at(index.exact('MOYO SECONDARY SCHOOL'))
+bezza_school = schools_at(index.exact('BEZZA AL-HIJJI SECONDARY SCHOOL'))
 
 # Check if schools were found
 if moyo_school.empty or bezza_school.empty:
@@ -63,20 +66,23 @@ with tab1:
     moyo_values = [moyo_school[metric].iloc[0] for metric in metrics]
     bezza_values = [bezza_school[metric].iloc[0] for metric in metrics]
     
-    x = np.arange(len(metrics))
-    width = 0.35
+    def metrics_chart(moyo_values, bezza_values):
+        import matplotlib.pyplot as plt
+        x = np.arange(len(metrics))
+        width = 0.35
     
-    fig, ax = plt.subplots(figsize=(10, 6))
-    ax.bar(x - width/2, moyo_values, width, label='MOYO SECONDARY SCHOOL', color='skyblue')
-    ax.bar(x + width/2, bezza_values, width, label='BEZZA AL-HIJJI SECONDARY SCHOOL', color='lightcoral')
-    ax.set_xlabel('Performance Metrics')
-    ax.set_ylabel('Percentage (%)')
-    ax.set_title('Performance Comparison')
-    ax.set_xticks(x)
-    ax.set_xticklabels(['Pass Rate (A-C)', 'Excellent (A-B)', 'Failure Rate (D-E)'])
-    ax.legend()
+        fig, ax = plt.subplots(figsize=(10, 6))
+        ax.bar(x - width/2, moyo_values, width, label='MOYO SECONDARY SCHOOL', color='skyblue')
+        ax.bar(x + width/2, bezza_values, width, label='BEZZA AL-HIJJI SECONDARY SCHOOL', color='lightcoral')
+        ax.set_xlabel('Performance Metrics')
+        ax.set_ylabel('Percentage (%)')
+        ax.set_title('Performance Comparison')
+        ax.set_xticks(x)
+        ax.set_xticklabels(['Pass Rate (A-C)', 'Excellent (A-B)', 'Failure Rate (D-E)'])
+        ax.legend()
+        return fig
     
-    st.pyplot(fig)
+    show_chart(metrics_chart, moyo_values, bezza_values)
     
     st.markdown("""
     Both schools show room for improvement, with MOYO SECONDARY SCHOOL performing slightly better 
@@ -97,32 +103,35 @@ with tab2:
     moyo_percent = [grade/moyo_total*100 for grade in moyo_grades]
     bezza_percent = [grade/bezza_total*100 for grade in bezza_grades]
     
-    x = np.arange(len(grades))
-    width = 0.35
-    
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
-    
-    # Absolute numbers
-    ax1.bar(x - width/2, moyo_grades, width, label='MOYO', color='skyblue')
-    ax1.bar(x + width/2, bezza_grades, width, label='BEZZA', color='lightcoral')
-    ax1.set_xlabel('Grade')
-    ax1.set_ylabel('Number of Students')
-    ax1.set_title('Grade Distribution (Absolute Numbers)')
-    ax1.set_xticks(x)
-    ax1.set_xticklabels(grades)
-    ax1.legend()
-    
-    # Percentages
-    ax2.bar(x - width/2, moyo_percent, width, label='MOYO', color='skyblue')
-    ax2.bar(x + width/2, bezza_percent, width, label='BEZZA', color='lightcoral')
-    ax2.set_xlabel('Grade')
-    ax2.set_ylabel('Percentage (%)')
-    ax2.set_title('Grade Distribution (Percentage)')
-    ax2.set_xticks(x)
-    ax2.set_xticklabels(grades)
-    ax2.legend()
-    
-    st.pyplot(fig)
+    def grades_chart(moyo_grades, bezza_grades, moyo_percent, bezza_percent):
+        import matplotlib.pyplot as plt
+        x = np.arange(len(grades))
+        width = 0.35
+    
+        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
+    
+        # Absolute numbers
+        ax1.bar(x - width/2, moyo_grades, width, label='MOYO', color='skyblue')
+        ax1.bar(x + width/2, bezza_grades, width, label='BEZZA', color='lightcoral')
+        ax1.set_xlabel('Grade')
+        ax1.set_ylabel('Number of Students')
+        ax1.set_title('Grade Distribution (Absolute Numbers)')
+        ax1.set_xticks(x)
+        ax1.set_xticklabels(grades)
+        ax1.legend()
+    
+        # Percentages
+        ax2.bar(x - width/2, moyo_percent, width, label='MOYO', color='skyblue')
+        ax2.bar(x + width/2, bezza_percent, width, label='BEZZA', color='lightcoral')
+        ax2.set_xlabel('Grade')
+        ax2.set_ylabel('Percentage (%)')
+        ax2.set_title('Grade Distribution (Percentage)')
+        ax2.set_xticks(x)
+        ax2.set_xticklabels(grades)
+        ax2.legend()
+        return fig
+    
+    show_chart(grades_chart, moyo_grades, bezza_grades, moyo_percent, bezza_percent)
     
     st.markdown("""
     **Analysis:** 
@@ -135,8 +144,9 @@ with tab3:
     st.subheader("Performance within District Context")
     
     # Get district averages for comparison
-    moyo_district_avg = df[df['DistrictName'] == 'MOYO'][['Pass_Rate', 'Excellent_Performance', 'Failure_Rate']].mean()
-    adjumani_district_avg = df[df['DistrictName'] == 'ADJUMANI'][['Pass_Rate', 'Excellent_Performance', 'Failure_Rate']].mean()
+    districts = district_summary()
+    moyo_district_avg = districts.loc[moyo_school['DistrictName'].iloc[0], list(METRICS)]
+    adjumani_district_avg = districts.loc[bezza_school['DistrictName'].iloc[0], list(METRICS)]
     
     # Create comparison data
     comparison_data = {
@@ -146,24 +156,27 @@ with tab3:
         'Adjumani District Avg': [adjumani_district_avg['Pass_Rate'], adjumani_district_avg['Excellent_Performance'], adjumani_district_avg['Failure_Rate']]
     }
     
-    metrics = ['Pass Rate', 'Excellent Performance', 'Failure Rate']
-    x = np.arange(len(metrics))
-    width = 0.2
+    def context_chart(comparison_data):
+        import matplotlib.pyplot as plt
+        metrics = ['Pass Rate', 'Excellent Performance', 'Failure Rate']
+        x = np.arange(len(metrics))
+        width = 0.2
     
-    fig, ax = plt.subplots(figsize=(12, 6))
-    ax.bar(x - width*1.5, comparison_data['MOYO SS'], width, label='MOYO SS', color='skyblue')
-    ax.bar(x - width/2, comparison_data['MOYO District Avg'], width, label='MOYO District Avg', color='deepskyblue', alpha=0.7)
-    ax.bar(x + width/2, comparison_data['BEZZA SS'], width, label='BEZZA SS', color='lightcoral')
-    ax.bar(x + width*1.5, comparison_data['Adjumani District Avg'], width, label='Adjumani District Avg', color='indianred', alpha=0.7)
+        fig, ax = plt.subplots(figsize=(12, 6))
+        ax.bar(x - width*1.5, comparison_data['MOYO SS'], width, label='MOYO SS', color='skyblue')
+        ax.bar(x - width/2, comparison_data['MOYO District Avg'], width, label='MOYO District Avg', color='deepskyblue', alpha=0.7)
+        ax.bar(x + width/2, comparison_data['BEZZA SS'], width, label='BEZZA SS', color='lightcoral')
+        ax.bar(x + width*1.5, comparison_data['Adjumani District Avg'], width, label='Adjumani District Avg', color='indianred', alpha=0.7)
     
-    ax.set_xlabel('Performance Metrics')
-    ax.set_ylabel('Percentage (%)')
-    ax.set_title('School Performance vs District Averages')
-    ax.set_xticks(x)
-    ax.set_xticklabels(metrics)
-    ax.legend()
+        ax.set_xlabel('Performance Metrics')
+        ax.set_ylabel('Percentage (%)')
+        ax.set_title('School Performance vs District Averages')
+        ax.set_xticks(x)
+        ax.set_xticklabels(metrics)
+        ax.legend()
+        return fig
     
-    st.pyplot(fig)
+    show_chart(context_chart, comparison_data)
     
     st.markdown("""
     **Analysis:** 
@@ -189,21 +202,24 @@ with tab4:
         'Bs to As': bezza_school['Bs'].iloc[0]
     }
     
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
+    def improvement_chart(moyo_improvement, bezza_improvement):
+        import matplotlib.pyplot as plt
+        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
     
-    # MOYO improvement opportunities
-    ax1.bar(moyo_improvement.keys(), moyo_improvement.values(), color='skyblue')
-    ax1.set_title('MOYO SS: Students for Potential Improvement')
-    ax1.set_ylabel('Number of Students')
-    ax1.tick_params(axis='x', rotation=45)
+        # MOYO improvement opportunities
+        ax1.bar(moyo_improvement.keys(), moyo_improvement.values(), color='skyblue')
+        ax1.set_title('MOYO SS: Students for Potential Improvement')
+        ax1.set_ylabel('Number of Students')
+        ax1.tick_params(axis='x', rotation=45)
     
-    # BEZZA improvement opportunities
-    ax2.bar(bezza_improvement.keys(), bezza_improvement.values(), color='lightcoral')
-    ax2.set_title('BEZZA SS: Students for Potential Improvement')
-    ax2.set_ylabel('Number of Students')
-    ax2.tick_params(axis='x', rotation=45)
+        # BEZZA improvement opportunities
+        ax2.bar(bezza_improvement.keys(), bezza_improvement.values(), color='lightcoral')
+        ax2.set_title('BEZZA SS: Students for Potential Improvement')
+        ax2.set_ylabel('Number of Students')
+        ax2.tick_params(axis='x', rotation=45)
+        return fig
     
-    st.pyplot(fig)
+    show_chart(improvement_chart, moyo_improvement, bezza_improvement)
     
     st.markdown("""
     **Improvement Opportunities:**
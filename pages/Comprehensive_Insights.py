@@ -1,5 +1,12 @@
 import streamlit as st
-from app import df, moyo_df, adjumani_df
+from uneb.data import GRADES, best_schools, district_summary, overall_summary, worst_schools
+from uneb.layout import configure_page, district_label, select_scope
+
+configure_page()
+
+year, selected = select_scope()
+totals = overall_summary(year, selected)
+districts = district_summary(year, selected)
 
 st.title("💡 COMPREHENSIVE INSIGHTS")
 
@@ -14,47 +21,47 @@ st.header("📊 Key Statistics")
 col1, col2, col3, col4 = st.columns(4)
 
 with col1:
-    st.metric("Total Schools", len(df))
+    st.metric("Total Schools", int(totals['Schools']))
 with col2:
-    st.metric("Total Students", f"{df['Total_Students'].sum():,}")
+    st.metric("Total Students", f"{int(totals['Total_Students']):,}")
 with col3:
-    st.metric("Average Pass Rate", f"{df['Pass_Rate'].mean():.1f}%")
+    st.metric("Average Pass Rate", f"{totals['Pass_Rate']:.1f}%")
 with col4:
-    st.metric("Average Failure Rate", f"{df['Failure_Rate'].mean():.1f}%")
+    st.metric("Average Failure Rate", f"{totals['Failure_Rate']:.1f}%")
 
 # District comparison
 st.header("🏛️ District Comparison")
 
-col1, col2 = st.columns(2)
+ranked = districts.sort_values('Pass_Rate', ascending=False)
+cols = st.columns(min(len(ranked), 4))
 
-with col1:
-    st.metric("Moyo Average Pass Rate", f"{moyo_df['Pass_Rate'].mean():.1f}%")
-    st.metric("Moyo Average Failure Rate", f"{moyo_df['Failure_Rate'].mean():.1f}%")
-    
-with col2:
-    st.metric("Adjumani Average Pass Rate", f"{adjumani_df['Pass_Rate'].mean():.1f}%")
-    st.metric("Adjumani Average Failure Rate", f"{adjumani_df['Failure_Rate'].mean():.1f}%")
+for i, (name, row) in enumerate(ranked.iterrows()):
+    with cols[i % len(cols)]:
+        st.metric(f"{district_label(name)} Average Pass Rate", f"{row['Pass_Rate']:.1f}%")
+        st.metric(f"{district_label(name)} Average Failure Rate", f"{row['Failure_Rate']:.1f}%")
 
-st.metric("Performance Gap", 
-          f"{moyo_df['Pass_Rate'].mean() - adjumani_df['Pass_Rate'].mean():.1f}%",
-          delta_color="inverse")
+# Gap between the best and worst performing selected districts
+if len(ranked) > 1:
+    st.metric("Performance Gap", 
+              f"{ranked['Pass_Rate'].iloc[0] - ranked['Pass_Rate'].iloc[-1]:.1f}%",
+              delta_color="inverse")
 
 # Top and bottom performers
 st.header("🏆 Top and Bottom Performing Schools")
 
 col1, col2 = st.columns(2)
 
+def list_schools(schools):
+    for name, district, rate in zip(schools['CentreName'], schools['DistrictName'], schools['Pass_Rate']):
+        st.write(f"**{name}** ({district}): {rate:.1f}% Pass Rate")
+
 with col1:
     st.subheader("Top 5 Schools")
-    top_5 = df.nlargest(5, 'Pass_Rate')[['CentreName', 'DistrictName', 'Pass_Rate', 'Total_Students']]
-    for i, row in top_5.iterrows():
-        st.write(f"**{row['CentreName']}** ({row['DistrictName']}): {row['Pass_Rate']:.1f}% Pass Rate")
+    list_schools(best_schools('Pass_Rate', 5, year, selected))
 
 with col2:
     st.subheader("Bottom 5 Schools")
-    bottom_5 = df.nsmallest(5, 'Pass_Rate')[['CentreName', 'DistrictName', 'Pass_Rate', 'Total_Students']]
-    for i, row in bottom_5.iterrows():
-        st.write(f"**{row['CentreName']}** ({row['DistrictName']}): {row['Pass_Rate']:.1f}% Pass Rate")
+    list_schools(worst_schools('Pass_Rate', 5, year, selected))
 
 # Absenteeism analysis
 st.header("❌ Absenteeism Analysis")
@@ -62,23 +69,23 @@ st.header("❌ Absenteeism Analysis")
 col1, col2, col3 = st.columns(3)
 
 with col1:
-    st.metric("Total Absent Students", df['Absent'].sum())
+    st.metric("Total Absent Students", int(totals['Absent']))
 with col2:
-    st.metric("Overall Absenteeism Rate", f"{df['Absent'].sum()/df['Total_Students'].sum()*100:.1f}%")
+    st.metric("Overall Absenteeism Rate", f"{totals['Absent_Rate']:.1f}%")
 with col3:
-    st.metric("Adjumani vs Moyo Absenteeism", 
-              f"{adjumani_df['Absent'].sum()/adjumani_df['Total_Students'].sum()*100:.1f}% vs {moyo_df['Absent'].sum()/moyo_df['Total_Students'].sum()*100:.1f}%")
+    st.metric(" vs ".join(district_label(name) for name in districts.index) + " Absenteeism", 
+              " vs ".join(f"{rate:.1f}%" for rate in districts['Absent_Rate']))
 
 # Grade distribution insights
 st.header("📝 Grade Distribution Insights")
 
-grades = ['As', 'Bs', 'Cs', 'Ds', 'Es']
-total_grades = df[grades].sum().sum()
+grades = GRADES
+total_grades = totals[grades].sum()
 
 col1, col2, col3, col4, col5 = st.columns(5)
 
 for i, grade in enumerate(grades):
-    count = df[grade].sum()
+    count = totals[grade]
     with [col1, col2, col3, col4, col5][i]:
         st.metric(f"{grade} Grades", f"{count/total_grades*100:.1f}%")
 
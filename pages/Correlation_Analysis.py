@@ -1,8 +1,12 @@
 import streamlit as st
-import pandas as pd
-import seaborn as sns
-import matplotlib.pyplot as plt
-from app import df
+from uneb.binning import draw_density, use_density
+from uneb.charts import show_chart
+from uneb.data import correlation_matrix as selection_correlations, density, get_columns, school_count
+from uneb.layout import configure_page, district_label, select_scope
+
+configure_page()
+
+year, selected = select_scope()
 
 st.title("🔗 Correlation Analysis")
 
@@ -11,59 +15,72 @@ This page explores the relationships between different factors in the dataset,
 helping to identify which variables are most strongly associated with school performance.
 """)
 
-# Calculate correlation matrix - include all relevant columns
-correlation_cols = ['Total_Students', 'As', 'Bs', 'Cs', 'Ds', 'Es', 'Absent', 'Pass_Rate', 'Failure_Rate']
-correlation_matrix = df[correlation_cols].corr()
-
 # Display correlation heatmap
 st.subheader("📊 Correlation Matrix of School Metrics")
 
-fig, ax = plt.subplots(figsize=(10, 8))
-sns.heatmap(correlation_matrix, annot=True, cmap='coolwarm', center=0, ax=ax, fmt='.2f')
-ax.set_title('Correlation Matrix of School Metrics')
-st.pyplot(fig)
-
-st.markdown("""
-This heatmap shows how different factors relate to each other. 
-The numbers (correlation coefficients) indicate the strength and direction of a relationship between two factors. 
-A number close to **+1** means a strong positive relationship (as one goes up, the other goes up). 
-A number close to **-1** means a strong negative relationship (as one goes up, the other goes down). 
-A number near **0** means no relationship.
-""")
-
-# Key correlations
-st.subheader("🔍 Key Correlation Insights")
-
-col1, col2, col3 = st.columns(3)
-
-with col1:
-    # Check if Failure_Rate exists in the correlation matrix
-    if 'Failure_Rate' in correlation_matrix.index and 'Pass_Rate' in correlation_matrix.columns:
-        failure_corr = correlation_matrix.loc['Pass_Rate', 'Failure_Rate']
-        st.metric("Pass Rate vs Failure Rate", 
-                  f"{failure_corr:.2f}",
-                  "Perfect negative correlation (expected)")
-    else:
-        st.metric("Pass Rate vs Failure Rate", "N/A", "Data not available")
-
-with col2:
-    # Calculate correlation with excellent grades (A+B)
-    if 'Pass_Rate' in correlation_matrix.index and 'As' in correlation_matrix.columns and 'Bs' in correlation_matrix.columns:
-        excellent_corr = (correlation_matrix.loc['Pass_Rate', 'As'] + correlation_matrix.loc['Pass_Rate', 'Bs']) / 2
-        st.metric("Pass Rate vs Excellent Grades", 
-                  f"{excellent_corr:.2f}",
-                  "Strong positive relationship")
-    else:
-        st.metric("Pass Rate vs Excellent Grades", "N/A", "Data not available")
+def heatmap_chart(correlation_matrix):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    fig, ax = plt.subplots(figsize=(10, 8))
+    sns.heatmap(correlation_matrix, annot=True, cmap='coolwarm', center=0, ax=ax, fmt='.2f')
+    ax.set_title('Correlation Matrix of School Metrics')
+    return fig
+
+# The scope picker, heatmap and headline figures rerun on their own when the
+# scope changes, without re-running the rest of the page
+@st.fragment
+def correlations(year, selected):
+    # Correlations come from per-district statistics merged for the chosen scope,
+    # so no school rows are scanned here
+    scope = st.selectbox("Correlations across", ["All selected districts", *selected],
+                         format_func=lambda name: name if name == "All selected districts" else district_label(name))
+    correlation_matrix = selection_correlations(year, selected if scope == "All selected districts" else [scope])
+
+    show_chart(heatmap_chart, correlation_matrix)
+
+    st.markdown("""
+    This heatmap shows how different factors relate to each other. 
+    The numbers (correlation coefficients) indicate the strength and direction of a relationship between two factors. 
+    A number close to **+1** means a strong positive relationship (as one goes up, the other goes up). 
+    A number close to **-1** means a strong negative relationship (as one goes up, the other goes down). 
+    A number near **0** means no relationship.
+    """)
+
+    # Key correlations
+    st.subheader("🔍 Key Correlation Insights")
+
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        # Check if Failure_Rate exists in the correlation matrix
+        if 'Failure_Rate' in correlation_matrix.index and 'Pass_Rate' in correlation_matrix.columns:
+            failure_corr = correlation_matrix.loc['Pass_Rate', 'Failure_Rate']
+            st.metric("Pass Rate vs Failure Rate", 
+                      f"{failure_corr:.2f}",
+                      "Perfect negative correlation (expected)")
+        else:
+            st.metric("Pass Rate vs Failure Rate", "N/A", "Data not available")
+
+    with col2:
+        # Calculate correlation with excellent grades (A+B)
+        if 'Pass_Rate' in correlation_matrix.index and 'As' in correlation_matrix.columns and 'Bs' in correlation_matrix.columns:
+            excellent_corr = (correlation_matrix.loc['Pass_Rate', 'As'] + correlation_matrix.loc['Pass_Rate', 'Bs']) / 2
+            st.metric("Pass Rate vs Excellent Grades", 
+                      f"{excellent_corr:.2f}",
+                      "Strong positive relationship")
+        else:
+            st.metric("Pass Rate vs Excellent Grades", "N/A", "Data not available")
     
-with col3:
-    if 'Pass_Rate' in correlation_matrix.index and 'Absent' in correlation_matrix.columns:
-        absent_corr = correlation_matrix.loc['Pass_Rate', 'Absent']
-        st.metric("Pass Rate vs Absenteeism", 
-                  f"{absent_corr:.2f}",
-                  "Moderate negative relationship")
-    else:
-        st.metric("Pass Rate vs Absenteeism", "N/A", "Data not available")
+    with col3:
+        if 'Pass_Rate' in correlation_matrix.index and 'Absent' in correlation_matrix.columns:
+            absent_corr = correlation_matrix.loc['Pass_Rate', 'Absent']
+            st.metric("Pass Rate vs Absenteeism", 
+                      f"{absent_corr:.2f}",
+                      "Moderate negative relationship")
+        else:
+            st.metric("Pass Rate vs Absenteeism", "N/A", "Data not available")
+
+correlations(year, selected)
 
 # Detailed explanation of key correlations
 st.subheader("📋 Interpretation of Key Correlations")
@@ -85,44 +102,61 @@ The correlation is typically very low, confirming that size is not a primary dri
 # Scatter plots to visualize key relationships
 st.subheader("📈 Visualizing Key Relationships")
 
-relationship = st.selectbox(
-    "Select relationship to visualize:",
-    options=[
-        "Pass Rate vs Excellent Grades (A+B)",
-        "Pass Rate vs Absenteeism",
-        "School Size vs Pass Rate",
-        "Pass Rate vs Failure Rate"
-    ]
-)
-
-fig, ax = plt.subplots(figsize=(10, 6))
-
-if relationship == "Pass Rate vs Excellent Grades (A+B)":
-    df['Excellent_Grades'] = df['As'] + df['Bs']
-    ax.scatter(df['Excellent_Grades'], df['Pass_Rate'], alpha=0.7)
-    ax.set_xlabel('Number of Excellent Grades (A+B)')
+def scatter_chart(x, y, xlabel, title):
+    import matplotlib.pyplot as plt
+    fig, ax = plt.subplots(figsize=(10, 6))
+    ax.scatter(x, y, alpha=0.7)
+    ax.set_xlabel(xlabel)
     ax.set_ylabel('Pass Rate (%)')
-    ax.set_title('Pass Rate vs Number of Excellent Grades')
-    
-elif relationship == "Pass Rate vs Absenteeism":
-    ax.scatter(df['Absent'], df['Pass_Rate'], alpha=0.7)
-    ax.set_xlabel('Number of Absent Students')
+    ax.set_title(title)
+    return fig
+
+def density_chart(counts, xedges, yedges, xlabel, title):
+    import matplotlib.pyplot as plt
+    fig, ax = plt.subplots(figsize=(10, 6))
+    draw_density(ax, counts, xedges, yedges)
+    ax.set_xlabel(xlabel)
     ax.set_ylabel('Pass Rate (%)')
-    ax.set_title('Pass Rate vs Absenteeism')
+    ax.set_title(title)
+    return fig
+
+# Large selections are drawn as a density grid rather than one point per school
+def show_relationship(year, selected, column, xlabel, title):
+    count = school_count(year, selected)
+    if use_density(count):
+        show_chart(density_chart, *density(column, 'Pass_Rate', year, selected), xlabel=xlabel, title=title)
+        st.caption(f"With {count:,} schools, each cell shows how many schools fall in it instead of one point per school.")
+    else:
+        df = get_columns([column, 'Pass_Rate'], year, selected)
+        show_chart(scatter_chart, df[column], df['Pass_Rate'], xlabel=xlabel, title=title)
+
+# Only this section reruns when another relationship is picked
+@st.fragment
+def relationships(year, selected):
+    relationship = st.selectbox(
+        "Select relationship to visualize:",
+        options=[
+            "Pass Rate vs Excellent Grades (A+B)",
+            "Pass Rate vs Absenteeism",
+            "School Size vs Pass Rate",
+            "Pass Rate vs Failure Rate"
+        ]
+    )
+
+    if relationship == "Pass Rate vs Excellent Grades (A+B)":
+        show_relationship(year, selected, 'Excellent_Grades', xlabel='Number of Excellent Grades (A+B)',
+                          title='Pass Rate vs Number of Excellent Grades')
     
-elif relationship == "School Size vs Pass Rate":
-    ax.scatter(df['Total_Students'], df['Pass_Rate'], alpha=0.7)
-    ax.set_xlabel('Total Students')
-    ax.set_ylabel('Pass Rate (%)')
-    ax.set_title('School Size vs Pass Rate')
+    elif relationship == "Pass Rate vs Absenteeism":
+        show_relationship(year, selected, 'Absent', xlabel='Number of Absent Students', title='Pass Rate vs Absenteeism')
     
-else:  # Pass Rate vs Failure Rate
-    ax.scatter(df['Failure_Rate'], df['Pass_Rate'], alpha=0.7)
-    ax.set_xlabel('Failure Rate (%)')
-    ax.set_ylabel('Pass Rate (%)')
-    ax.set_title('Pass Rate vs Failure Rate')
+    elif relationship == "School Size vs Pass Rate":
+        show_relationship(year, selected, 'Total_Students', xlabel='Total Students', title='School Size vs Pass Rate')
+    
+    else:  # Pass Rate vs Failure Rate
+        show_relationship(year, selected, 'Failure_Rate', xlabel='Failure Rate (%)', title='Pass Rate vs Failure Rate')
 
-st.pyplot(fig)
+relationships(year, selected)
 
 # Key insights
 st.subheader("💡 Key Insights")
@@ -1,8 +1,15 @@
 import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
 import numpy as np
-from app import df, moyo_df, adjumani_df
+from uneb.charts import show_chart
+from uneb.data import GRADES, district_summary
+from uneb.layout import configure_page, district_colors, district_label, select_scope
+
+configure_page()
+
+year, selected = select_scope()
+districts = district_summary(year, selected)
+labels = [district_label(name) for name in districts.index]
+colors = district_colors(list(districts.index))
 
 st.title("📈 DETAILED GRADE DISTRIBUTION ANALYSIS")
 
@@ -12,6 +19,33 @@ showing the distribution of A, B, C, D, and E grades across districts,
 along with analysis of absenteeism patterns.
 """)
 
+# Side-by-side district bars for each grade (one row of ``values`` per district)
+def grade_chart(values, labels, colors, title, ylabel):
+    import matplotlib.pyplot as plt
+    x = np.arange(len(GRADES))
+    width = 0.7 / len(values)
+    offsets = (np.arange(len(values)) - (len(values) - 1) / 2) * width
+    
+    fig, ax = plt.subplots(figsize=(10, 6))
+    for offset, row, label, color in zip(offsets, values.to_numpy(), labels, colors):
+        ax.bar(x + offset, row, width, label=label, color=color)
+    ax.set_title(title)
+    ax.set_xlabel('Grade')
+    ax.set_ylabel(ylabel)
+    ax.set_xticks(x)
+    ax.set_xticklabels(GRADES)
+    ax.legend()
+    return fig
+
+# Single bar per district
+def district_chart(values, colors, title, ylabel):
+    import matplotlib.pyplot as plt
+    fig, ax = plt.subplots(figsize=(8, 6))
+    ax.bar(values.index, values.values, color=colors)
+    ax.set_title(title)
+    ax.set_ylabel(ylabel)
+    return fig
+
 # Create tabs for different visualizations
 tab1, tab2, tab3, tab4 = st.tabs([
     "Total Grade Distribution", 
@@ -23,23 +57,10 @@ tab1, tab2, tab3, tab4 = st.tabs([
 with tab1:
     st.subheader("📊 Total Grade Distribution by District")
     
-    grades = ['As', 'Bs', 'Cs', 'Ds', 'Es']
-    moyo_grades = moyo_df[grades].sum()
-    adjumani_grades = adjumani_df[grades].sum()
+    grade_counts = districts[GRADES].astype('int64')
     
-    x = np.arange(len(grades))
-    width = 0.35
-    
-    fig, ax = plt.subplots(figsize=(10, 6))
-    ax.bar(x - width/2, moyo_grades.values, width, label='Moyo', color='skyblue')
-    ax.bar(x + width/2, adjumani_grades.values, width, label='Adjumani', color='lightcoral')
-    ax.set_title('Total Grade Distribution by District')
-    ax.set_xlabel('Grade')
-    ax.set_ylabel('Number of Students')
-    ax.set_xticks(x)
-    ax.set_xticklabels(grades)
-    ax.legend()
-    st.pyplot(fig)
+    show_chart(grade_chart, grade_counts, labels, colors,
+               title='Total Grade Distribution by District', ylabel='Number of Students')
     
     st.markdown("""
     This shows the actual number of students receiving each grade. 
@@ -50,19 +71,10 @@ with tab1:
 with tab2:
     st.subheader("📈 Percentage Grade Distribution by District")
     
-    moyo_percent = moyo_grades / moyo_grades.sum() * 100
-    adjumani_percent = adjumani_grades / adjumani_grades.sum() * 100
+    grade_percent = grade_counts.div(grade_counts.sum(axis=1), axis=0) * 100
     
-    fig, ax = plt.subplots(figsize=(10, 6))
-    ax.bar(x - width/2, moyo_percent.values, width, label='Moyo', color='skyblue')
-    ax.bar(x + width/2, adjumani_percent.values, width, label='Adjumani', color='lightcoral')
-    ax.set_title('Percentage Grade Distribution by District')
-    ax.set_xlabel('Grade')
-    ax.set_ylabel('Percentage (%)')
-    ax.set_xticks(x)
-    ax.set_xticklabels(grades)
-    ax.legend()
-    st.pyplot(fig)
+    show_chart(grade_chart, grade_percent, labels, colors,
+               title='Percentage Grade Distribution by District', ylabel='Percentage (%)')
     
     st.markdown("""
     When we look at percentages, the performance gap becomes even clearer. 
@@ -74,13 +86,10 @@ with tab2:
 with tab3:
     st.subheader("❌ Total Absenteeism by District")
     
-    absent_by_district = df.groupby('DistrictName')['Absent'].sum()
+    absent_by_district = districts['Absent']
     
-    fig, ax = plt.subplots(figsize=(8, 6))
-    ax.bar(absent_by_district.index, absent_by_district.values, color=['skyblue', 'lightcoral'])
-    ax.set_title('Total Absenteeism by District')
-    ax.set_ylabel('Number of Absent Students')
-    st.pyplot(fig)
+    show_chart(district_chart, absent_by_district, colors,
+               title='Total Absenteeism by District', ylabel='Number of Absent Students')
     
     st.markdown("""
     In raw numbers, absenteeism is a bigger problem in Adjumani. 
@@ -91,13 +100,10 @@ with tab3:
 with tab4:
     st.subheader("📉 Absenteeism Rate by District")
     
-    absent_rate = df.groupby('DistrictName')['Absent'].sum() / df.groupby('DistrictName')['Total_Students'].sum() * 100
+    absent_rate = districts['Absent_Rate']
     
-    fig, ax = plt.subplots(figsize=(8, 6))
-    ax.bar(absent_rate.index, absent_rate.values, color=['skyblue', 'lightcoral'])
-    ax.set_title('Absenteeism Rate by District')
-    ax.set_ylabel('Absenteeism Rate (%)')
-    st.pyplot(fig)
+    show_chart(district_chart, absent_rate, colors,
+               title='Absenteeism Rate by District', ylabel='Absenteeism Rate (%)')
     
     st.markdown("""
     The absenteeism rate is significantly higher in Adjumani. 
@@ -1,8 +1,13 @@
 import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-from app import df, moyo_df, adjumani_df
+from uneb.charts import show_chart
+from uneb.data import METRICS, district_summary
+from uneb.layout import configure_page, district_colors, select_scope
+
+configure_page()
+
+year, selected = select_scope()
+districts = district_summary(year, selected)
+colors = district_colors(list(districts.index))
 
 st.title("🏠 OVERALL PERFORMANCE COMPARISION BY DISTRICT")
 
@@ -23,16 +28,20 @@ with tab1:
     st.subheader("📈 Average Performance Metrics by District")
     
     # Performance metrics by district
-    metrics = ['Pass_Rate', 'Excellent_Performance', 'Failure_Rate']
-    district_metrics = df.groupby('DistrictName')[metrics].mean()
+    metrics = list(METRICS)
+    district_metrics = districts[metrics]
+    
+    def metrics_chart(district_metrics):
+        import matplotlib.pyplot as plt
+        fig, ax = plt.subplots(figsize=(10, 6))
+        district_metrics.plot(kind='bar', ax=ax)
+        ax.set_title('Average Performance Metrics by District')
+        ax.set_ylabel('Percentage (%)')
+        ax.legend(list(METRICS.values()))
+        ax.tick_params(axis='x', rotation=0)
+        return fig
     
-    fig, ax = plt.subplots(figsize=(10, 6))
-    district_metrics.plot(kind='bar', ax=ax)
-    ax.set_title('Average Performance Metrics by District')
-    ax.set_ylabel('Percentage (%)')
-    ax.legend(['Pass Rate (A-C)', 'Excellent Performance (A-B)', 'Failure Rate (D-E)'])
-    ax.tick_params(axis='x', rotation=0)
-    st.pyplot(fig)
+    show_chart(metrics_chart, district_metrics)
     
     st.markdown("""
     This chart shows that Moyo district significantly outperforms Adjumani in all key metrics. 
@@ -43,12 +52,16 @@ with tab1:
 with tab2:
     st.subheader("📊 School Distribution by District")
     
-    district_counts = df['DistrictName'].value_counts()
+    district_counts = districts['Schools'].sort_values(ascending=False)
     
-    fig, ax = plt.subplots(figsize=(8, 8))
-    ax.pie(district_counts.values, labels=district_counts.index, autopct='%1.1f%%', startangle=90)
-    ax.set_title('School Distribution by District')
-    st.pyplot(fig)
+    def schools_chart(district_counts):
+        import matplotlib.pyplot as plt
+        fig, ax = plt.subplots(figsize=(8, 8))
+        ax.pie(district_counts.values, labels=district_counts.index, autopct='%1.1f%%', startangle=90)
+        ax.set_title('School Distribution by District')
+        return fig
+    
+    show_chart(schools_chart, district_counts)
     
     st.markdown("""
     The pie chart shows that schools are almost evenly distributed between the two districts, 
@@ -59,13 +72,17 @@ with tab2:
 with tab3:
     st.subheader("👥 Total Students by District")
     
-    students_by_district = df.groupby('DistrictName')['Total_Students'].sum()
+    students_by_district = districts['Total_Students']
+    
+    def students_chart(students_by_district, colors):
+        import matplotlib.pyplot as plt
+        fig, ax = plt.subplots(figsize=(8, 6))
+        ax.bar(students_by_district.index, students_by_district.values, color=colors)
+        ax.set_title('Total Students by District')
+        ax.set_ylabel('Number of Students')
+        return fig
     
-    fig, ax = plt.subplots(figsize=(8, 6))
-    ax.bar(students_by_district.index, students_by_district.values, color=['skyblue', 'lightcoral'])
-    ax.set_title('Total Students by District')
-    ax.set_ylabel('Number of Students')
-    st.pyplot(fig)
+    show_chart(students_chart, students_by_district, colors)
     
     st.markdown("""
     Adjumani serves a larger student population than Moyo, despite having a similar number of schools. 
@@ -75,13 +92,17 @@ with tab3:
 with tab4:
     st.subheader("🏫 Average School Size by District")
     
-    avg_size = df.groupby('DistrictName')['Total_Students'].mean()
+    avg_size = districts['Avg_School_Size']
+    
+    def size_chart(avg_size, colors):
+        import matplotlib.pyplot as plt
+        fig, ax = plt.subplots(figsize=(8, 6))
+        ax.bar(avg_size.index, avg_size.values, color=colors)
+        ax.set_title('Average School Size by District')
+        ax.set_ylabel('Average Students per School')
+        return fig
     
-    fig, ax = plt.subplots(figsize=(8, 6))
-    ax.bar(avg_size.index, avg_size.values, color=['skyblue', 'lightcoral'])
-    ax.set_title('Average School Size by District')
-    ax.set_ylabel('Average Students per School')
-    st.pyplot(fig)
+    show_chart(size_chart, avg_size, colors)
     
     st.markdown("""
     This confirms that schools in Adjumani are larger on average than those in Moyo. 
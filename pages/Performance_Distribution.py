@@ -1,8 +1,15 @@
 import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
-import numpy as np
-from app import df, moyo_df, adjumani_df
+from uneb.binning import draw_density, draw_histograms, use_density
+from uneb.charts import show_chart
+from uneb.data import best_schools, density, get_columns, histograms, school_count
+from uneb.layout import configure_page, district_colors, district_label, select_scope
+
+configure_page()
+
+year, selected = select_scope()
+count = school_count(year, selected)
+labels = [district_label(name) for name in selected]
+colors = district_colors(list(selected))
 
 st.title("📊 PERFORMANCE DISTRIBUTION ANALYSIS")
 
@@ -11,6 +18,17 @@ This page explores how performance is distributed across schools in each distric
 examining patterns in pass rates, failure rates, and the relationship between school size and performance.
 """)
 
+# Overlaid per-district histograms of one metric, drawn from precomputed bin counts
+def histogram_chart(edges, counts, labels, colors, title, xlabel):
+    import matplotlib.pyplot as plt
+    fig, ax = plt.subplots(figsize=(10, 6))
+    draw_histograms(ax, edges, counts, alpha=0.7, label=labels, color=colors)
+    ax.set_title(title)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel('Number of Schools')
+    ax.legend()
+    return fig
+
 # Create tabs for different visualizations
 tab1, tab2, tab3, tab4 = st.tabs([
     "Pass Rate Distribution", 
@@ -22,14 +40,8 @@ tab1, tab2, tab3, tab4 = st.tabs([
 with tab1:
     st.subheader("📈 Pass Rate Distribution by District")
     
-    fig, ax = plt.subplots(figsize=(10, 6))
-    ax.hist([moyo_df['Pass_Rate'], adjumani_df['Pass_Rate']], 
-             bins=10, alpha=0.7, label=['Moyo', 'Adjumani'], color=['skyblue', 'lightcoral'])
-    ax.set_title('Pass Rate Distribution by District')
-    ax.set_xlabel('Pass Rate (%)')
-    ax.set_ylabel('Number of Schools')
-    ax.legend()
-    st.pyplot(fig)
+    show_chart(histogram_chart, *histograms('Pass_Rate', year, selected), labels, colors,
+               title='Pass Rate Distribution by District', xlabel='Pass Rate (%)')
     
     st.markdown("""
     This histogram shows how schools are distributed across different pass rate ranges. 
@@ -40,14 +52,8 @@ with tab1:
 with tab2:
     st.subheader("📉 Failure Rate Distribution by District")
     
-    fig, ax = plt.subplots(figsize=(10, 6))
-    ax.hist([moyo_df['Failure_Rate'], adjumani_df['Failure_Rate']], 
-             bins=10, alpha=0.7, label=['Moyo', 'Adjumani'], color=['skyblue', 'lightcoral'])
-    ax.set_title('Failure Rate Distribution by District')
-    ax.set_xlabel('Failure Rate (%)')
-    ax.set_ylabel('Number of Schools')
-    ax.legend()
-    st.pyplot(fig)
+    show_chart(histogram_chart, *histograms('Failure_Rate', year, selected), labels, colors,
+               title='Failure Rate Distribution by District', xlabel='Failure Rate (%)')
     
     st.markdown("""
     The failure rate distribution shows the opposite pattern. 
@@ -58,14 +64,34 @@ with tab2:
 with tab3:
     st.subheader("🏫 School Size vs Performance")
     
-    fig, ax = plt.subplots(figsize=(10, 6))
-    ax.scatter(moyo_df['Total_Students'], moyo_df['Pass_Rate'], alpha=0.7, label='Moyo', color='skyblue')
-    ax.scatter(adjumani_df['Total_Students'], adjumani_df['Pass_Rate'], alpha=0.7, label='Adjumani', color='lightcoral')
-    ax.set_title('School Size vs Pass Rate')
-    ax.set_xlabel('Total Students')
-    ax.set_ylabel('Pass Rate (%)')
-    ax.legend()
-    st.pyplot(fig)
+    def size_chart(frames, labels, colors):
+        import matplotlib.pyplot as plt
+        fig, ax = plt.subplots(figsize=(10, 6))
+        for frame, label, color in zip(frames, labels, colors):
+            ax.scatter(frame['Total_Students'], frame['Pass_Rate'], alpha=0.7, label=label, color=color)
+        ax.set_title('School Size vs Pass Rate')
+        ax.set_xlabel('Total Students')
+        ax.set_ylabel('Pass Rate (%)')
+        ax.legend()
+        return fig
+    
+    def size_density_chart(counts, xedges, yedges):
+        import matplotlib.pyplot as plt
+        fig, ax = plt.subplots(figsize=(10, 6))
+        draw_density(ax, counts, xedges, yedges)
+        ax.set_title('School Size vs Pass Rate')
+        ax.set_xlabel('Total Students')
+        ax.set_ylabel('Pass Rate (%)')
+        return fig
+    
+    if use_density(count):
+        show_chart(size_density_chart, *density('Total_Students', 'Pass_Rate', year, selected))
+        st.caption(f"With {count:,} schools, each cell shows how many schools fall in it instead of one point per school.")
+    else:
+        schools = get_columns(['DistrictName', 'Total_Students', 'Pass_Rate'], year, selected)
+        rows = schools.groupby('DistrictName', observed=True, sort=False).indices
+        district_frames = [schools.take(rows.get(name, []))[['Total_Students', 'Pass_Rate']] for name in selected]
+        show_chart(size_chart, district_frames, labels, colors)
     
     st.markdown("""
     This scatter plot shows no clear relationship between school size and performance. 
@@ -76,23 +102,26 @@ with tab3:
 with tab4:
     st.subheader("🏆 Top 10 Performing Schools")
     
-    top_schools = df.nlargest(10, 'Pass_Rate')[['CentreName', 'DistrictName', 'Pass_Rate']]
-    
-    fig, ax = plt.subplots(figsize=(12, 8))
-    colors = ['skyblue' if x == 'MOYO' else 'lightcoral' for x in top_schools['DistrictName']]
-    bars = ax.barh(range(len(top_schools)), top_schools['Pass_Rate'], color=colors)
-    ax.set_yticks(range(len(top_schools)))
-    ax.set_yticklabels([f"{row.CentreName} ({row.DistrictName})" for _, row in top_schools.iterrows()])
-    ax.set_title('Top 10 Performing Schools by Pass Rate')
-    ax.set_xlabel('Pass Rate (%)')
+    top_schools = best_schools('Pass_Rate', 10, year, selected)[['CentreName', 'DistrictName', 'Pass_Rate']]
     
-    # Add district color legend
-    from matplotlib.patches import Patch
-    legend_elements = [Patch(facecolor='skyblue', label='Moyo'),
-                       Patch(facecolor='lightcoral', label='Adjumani')]
-    ax.legend(handles=legend_elements, loc='lower right')
+    def top_schools_chart(top_schools, palette):
+        import matplotlib.pyplot as plt
+        fig, ax = plt.subplots(figsize=(12, 8))
+        colors = [palette[x] for x in top_schools['DistrictName']]
+        ax.barh(range(len(top_schools)), top_schools['Pass_Rate'], color=colors)
+        ax.set_yticks(range(len(top_schools)))
+        ax.set_yticklabels(top_schools['CentreName'].astype(str) + ' (' + top_schools['DistrictName'].astype(str) + ')')
+        ax.set_title('Top 10 Performing Schools by Pass Rate')
+        ax.set_xlabel('Pass Rate (%)')
+        
+        # Add district color legend
+        from matplotlib.patches import Patch
+        legend_elements = [Patch(facecolor=color, label=district_label(name))
+                           for name, color in palette.items() if name in set(top_schools['DistrictName'])]
+        ax.legend(handles=legend_elements, loc='lower right')
+        return fig
     
-    st.pyplot(fig)
+    show_chart(top_schools_chart, top_schools, dict(zip(selected, colors)))
     
     st.markdown("""
     Moyo dominates the top performers, taking 7 of the top 10 spots. 
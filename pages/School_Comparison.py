@@ -0,0 +1,127 @@
+import streamlit as st
+import numpy as np
+from uneb.charts import show_chart
+from uneb.data import GRADES, METRICS, percentiles, school_index, school_names, schools_at
+from uneb.layout import configure_page, select_scope
+
+configure_page()
+
+year, selected = select_scope()
+names = school_names(year)
+index = school_index(year)
+
+st.title("🔎 SCHOOL COMPARISON")
+
+st.markdown("""
+Search for any schools in the selected districts and compare their results side by side.
+Names are matched regardless of case and punctuation, by the start of any word,
+and approximately when nothing matches exactly.
+""")
+
+# Positions refer to the year's school table, so start over when the year changes.
+# Streamlit drops the widget's key once a visit to another page leaves it unrendered.
+if st.session_state.get('compare_year') != year:
+    st.session_state['compare_year'] = year
+    st.session_state['compare_schools'] = []
+
+def school_label(position):
+    row = names.iloc[position]
+    return f"{row['CentreName']} ({row['DistrictName']})"
+
+query = st.text_input("Search schools", placeholder="e.g. st mary pakele")
+matches = index.positions(index.search(query, limit=25, groups=selected), groups=selected) if query else []
+matches = [int(p) for p in matches]
+
+if query and not matches:
+    st.warning("No schools match that search in the selected districts.")
+
+chosen = st.multiselect(
+    "Schools to compare",
+    options=list(dict.fromkeys(st.session_state.get('compare_schools', []) + matches)),
+    format_func=school_label,
+    key='compare_schools',
+)
+
+if not chosen:
+    st.info("Search for a school above and add two or more schools to compare them.")
+    st.stop()
+
+# Percentile ranks by pass rate, among all of the year's schools and within the school's district
+overall, district = percentiles('Pass_Rate', chosen, year)
+schools = schools_at(chosen, year).assign(Percentile=overall, District_Percentile=district)
+labels = [f"{name} ({district})" for name, district in zip(schools['CentreName'], schools['DistrictName'])]
+
+# Summary table
+st.subheader("📋 Selected Schools")
+st.dataframe(
+    schools[['CentreName', 'DistrictName', 'Pass_Rate', 'Excellent_Performance', 'Failure_Rate',
+             'Percentile', 'District_Percentile', 'Performance_Category', 'Total_Students', 'Absent']],
+    column_config={
+        "CentreName": "School Name",
+        "DistrictName": "District",
+        "Pass_Rate": st.column_config.ProgressColumn(
+            "Pass Rate",
+            format="%.1f%%",
+            min_value=0,
+            max_value=100,
+        ),
+        "Excellent_Performance": st.column_config.NumberColumn("Excellent (A-B)", format="%.1f%%"),
+        "Failure_Rate": st.column_config.NumberColumn("Failure Rate (D-E)", format="%.1f%%"),
+        "Percentile": st.column_config.NumberColumn(
+            "Percentile", format="%.0f",
+            help="Share of the year's schools with a pass rate no higher than this school's",
+        ),
+        "District_Percentile": st.column_config.NumberColumn(
+            "District Percentile", format="%.0f",
+            help="The same, among the schools of its own district",
+        ),
+        "Performance_Category": "Performance Category",
+        "Total_Students": "Total Students",
+        "Absent": "Absent",
+    },
+    hide_index=True,
+    width="stretch"
+)
+
+# Metric comparison
+st.subheader("📊 Performance Metrics")
+
+def metrics_chart(values, labels):
+    import matplotlib.pyplot as plt
+    x = np.arange(len(METRICS))
+    width = 0.8 / len(values)
+    offsets = (np.arange(len(values)) - (len(values) - 1) / 2) * width
+
+    fig, ax = plt.subplots(figsize=(12, 6))
+    for offset, row, label in zip(offsets, values, labels):
+        ax.bar(x + offset, row, width, label=label)
+    ax.set_xlabel('Performance Metrics')
+    ax.set_ylabel('Percentage (%)')
+    ax.set_title('Performance Comparison')
+    ax.set_xticks(x)
+    ax.set_xticklabels(list(METRICS.values()))
+    ax.legend(fontsize='small')
+    return fig
+
+show_chart(metrics_chart, schools[list(METRICS)].to_numpy(), labels)
+
+# Grade mix
+st.subheader("📝 Grade Distribution")
+
+def grades_chart(percent, labels):
+    import matplotlib.pyplot as plt
+    fig, ax = plt.subplots(figsize=(12, max(3, 0.6 * len(labels) + 1)))
+    left = np.zeros(len(labels))
+    for grade, values, color in zip(GRADES, percent.T, ['darkgreen', 'lightgreen', 'gold', 'orange', 'firebrick']):
+        ax.barh(labels, values, left=left, label=grade, color=color)
+        left += values
+    ax.set_xlabel('Percentage of Graded Students (%)')
+    ax.set_title('Grade Distribution (Percentage)')
+    ax.invert_yaxis()
+    ax.legend(ncol=len(GRADES), loc='upper center', bbox_to_anchor=(0.5, -0.12))
+    return fig
+
+grades = schools[GRADES].to_numpy(dtype=float)
+totals = grades.sum(axis=1, keepdims=True)
+percent = np.divide(grades * 100, totals, out=np.zeros_like(grades), where=totals > 0)
+show_chart(grades_chart, percent, labels)
@@ -1,7 +1,14 @@
 import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
-from app import df
+import numpy as np
+from uneb.charts import show_chart
+from uneb.cube import tier_counts
+from uneb.data import filter_values, ranked_schools, school_count, year_cube
+from uneb.layout import configure_page, select_scope
+from uneb.ranking import page_count
+
+configure_page()
+
+year, selected = select_scope()
 
 st.title("🏫 SCHOOL PERFORMANCE RANKING AND COMPARISION")
 
@@ -10,33 +17,24 @@ This page categorizes schools into performance tiers to provide a clear, actiona
 highlighting which schools need immediate intervention and which can serve as models of excellence.
 """)
 
-# Create performance categories
-def performance_category(row):
-    if row['Pass_Rate'] >= 80:
-        return 'Excellent (80-100%)'
-    elif row['Pass_Rate'] >= 60:
-        return 'Good (60-79%)'
-    elif row['Pass_Rate'] >= 40:
-        return 'Fair (40-59%)'
-    else:
-        return 'Poor (<40%)'
-
-df['Performance_Category'] = df.apply(performance_category, axis=1)
-
 # Performance category distribution
 st.subheader("🏆 School Performance Distribution by District")
 
-performance_counts = df.groupby(['DistrictName', 'Performance_Category']).size().unstack(fill_value=0)
+performance_counts = tier_counts(year_cube(year, selected))
+
+def tier_chart(performance_counts):
+    import matplotlib.pyplot as plt
+    fig, ax = plt.subplots(figsize=(10, 6))
+    performance_counts.plot(kind='bar', stacked=True, ax=ax, 
+                            color=['firebrick', 'goldenrod', 'lightgreen', 'darkgreen'])
+    ax.set_title('School Performance Distribution by District')
+    ax.set_xlabel('District')
+    ax.set_ylabel('Number of Schools')
+    ax.legend(title='Performance Category')
+    ax.tick_params(axis='x', rotation=0)
+    return fig
 
-fig, ax = plt.subplots(figsize=(10, 6))
-performance_counts.plot(kind='bar', stacked=True, ax=ax, 
-                        color=['firebrick', 'goldenrod', 'lightgreen', 'darkgreen'])
-ax.set_title('School Performance Distribution by District')
-ax.set_xlabel('District')
-ax.set_ylabel('Number of Schools')
-ax.legend(title='Performance Category')
-ax.tick_params(axis='x', rotation=0)
-st.pyplot(fig)
+show_chart(tier_chart, performance_counts)
 
 st.markdown("""
 This chart categorizes schools into performance tiers. 
@@ -50,43 +48,69 @@ every school in Adjumani's "Poor" category requires immediate and intensive supp
 # Show detailed school rankings
 st.subheader("📋 Detailed School Performance Rankings")
 
-# Add filters
-col1, col2 = st.columns(2)
-with col1:
-    district_filter = st.selectbox("Filter by District", 
-                                  options=["All"] + list(df['DistrictName'].unique()))
-with col2:
-    category_filter = st.selectbox("Filter by Performance Category", 
-                                  options=["All"] + list(df['Performance_Category'].unique()))
-
-# Apply filters
-filtered_df = df.copy()
-if district_filter != "All":
-    filtered_df = filtered_df[filtered_df['DistrictName'] == district_filter]
-if category_filter != "All":
-    filtered_df = filtered_df[filtered_df['Performance_Category'] == category_filter]
-
-# Sort by performance
-sorted_df = filtered_df.sort_values('Pass_Rate', ascending=False)
-
-# Display the table
-st.dataframe(
-    sorted_df[['CentreName', 'DistrictName', 'Pass_Rate', 'Performance_Category', 'Total_Students']],
-    column_config={
-        "CentreName": "School Name",
-        "DistrictName": "District",
-        "Pass_Rate": st.column_config.ProgressColumn(
-            "Pass Rate",
-            format="%.1f%%",
-            min_value=0,
-            max_value=100,
-        ),
-        "Performance_Category": "Performance Category",
-        "Total_Students": "Total Students"
-    },
-    hide_index=True,
-    use_container_width=True
-)
+# Only one page of the ranking is taken out of the frame and sent to the browser
+PAGE_SIZES = [25, 50, 100, 250]
+
+def first_page():
+    st.session_state['ranking_page'] = 1
+
+# Filters, pager and table rerun on their own, so changing them does not
+# redraw the chart above
+@st.fragment
+def ranking_table(year, selected):
+    # Add filters
+    col1, col2, col3 = st.columns([2, 2, 1])
+    with col1:
+        district_filter = st.selectbox("Filter by District", 
+                                      options=["All"] + filter_values('DistrictName', year, selected),
+                                      on_change=first_page)
+    with col2:
+        category_filter = st.selectbox("Filter by Performance Category", 
+                                      options=["All"] + filter_values('Performance_Category', year, selected),
+                                      on_change=first_page)
+    with col3:
+        st.session_state.setdefault('ranking_page_size', 50)
+        page_size = st.selectbox("Rows per page", PAGE_SIZES, key='ranking_page_size', on_change=first_page)
+
+    # Only the count of the matches and the schools on the visible page are looked up
+    criteria = {}
+    if district_filter != "All":
+        criteria['DistrictName'] = district_filter
+    if category_filter != "All":
+        criteria['Performance_Category'] = category_filter
+    total = school_count(year, selected, criteria)
+    pages = page_count(total, page_size)
+    st.session_state['ranking_page'] = min(st.session_state.get('ranking_page', 1), pages)
+    page = st.number_input(f"Page (of {pages:,})", min_value=1, max_value=pages, key='ranking_page')
+
+    start = (page - 1) * page_size
+    page_rows = ranked_schools('Pass_Rate', start, start + page_size, criteria, year, selected)
+    page_rows = page_rows[['CentreName', 'DistrictName', 'Pass_Rate', 'Performance_Category', 'Total_Students']]
+    page_rows.insert(0, 'Rank', np.arange(start + 1, start + 1 + len(page_rows)))
+
+    # Display the table
+    st.dataframe(
+        page_rows,
+        column_config={
+            "Rank": "Rank",
+            "CentreName": "School Name",
+            "DistrictName": "District",
+            "Pass_Rate": st.column_config.ProgressColumn(
+                "Pass Rate",
+                format="%.1f%%",
+                min_value=0,
+                max_value=100,
+            ),
+            "Performance_Category": "Performance Category",
+            "Total_Students": "Total Students"
+        },
+        hide_index=True,
+        width="stretch"
+    )
+    st.caption(f"Schools ranked {start + 1:,}–{start + len(page_rows):,} of {total:,}"
+               if len(page_rows) else "No schools match these filters.")
+
+ranking_table(year, selected)
 
 # Key insights
 st.subheader("💡 Key Insights")
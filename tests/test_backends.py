@@ -0,0 +1,79 @@
+"""The in-memory dataset and the database archive must answer every page alike."""
+import numpy as np
+import pandas as pd
+import pytest
+import streamlit as st
+
+from benchmarks.generate import generate
+from uneb import data, snapshot
+from uneb.database import DATABASE_ENV, Database
+from uneb.ingest import DEFAULT_SOURCE, SOURCES_ENV, source_files
+
+COLUMNS = ['CentreName', 'DistrictName', 'Pass_Rate', 'Performance_Category', 'Total_Students']
+
+
+def answers():
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    year = data.exam_years()[-1]
+    districts = data.district_names(year)
+    positions = np.arange(len(data.school_names(year)))
+    found = {
+        'percentiles': data.percentiles('Pass_Rate', positions, year),
+        'ranked': data.ranked_schools('Pass_Rate', 0, len(positions), None, year),
+        'ranked_district': data.ranked_schools('Pass_Rate', 3, 13, {'DistrictName': districts[-1]}, year),
+        'best': data.best_schools('Pass_Rate', 5, year, districts[:2]),
+        'worst': data.worst_schools('Failure_Rate', 5, year),
+        'cube': data.year_cube(year),
+        'correlations': data.correlation_matrix(year),
+        'district_correlations': data.correlation_matrix(year, districts[:1]),
+    }
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    return found
+
+
+@pytest.fixture(params=['bundled', 'generated'])
+def both(request, tmp_path, monkeypatch):
+    if request.param == 'bundled':
+        monkeypatch.setenv(SOURCES_ENV, str(DEFAULT_SOURCE))
+    else:
+        monkeypatch.setenv(SOURCES_ENV, str(generate(tmp_path / 'results_2023.xlsx', 400, 6, seed=5)))
+    monkeypatch.setattr(snapshot, 'SNAPSHOT_DIR', tmp_path / 'snapshots')
+    monkeypatch.delenv(DATABASE_ENV, raising=False)
+    memory = answers()
+
+    archive = tmp_path / 'archive.db'
+    builder = Database(archive, read_only=False)
+    builder.update(source_files())
+    builder.close()
+    monkeypatch.setenv(DATABASE_ENV, str(archive))
+    return memory, answers()
+
+
+def test_percentiles_agree(both):
+    memory, database = both
+    for ours, theirs in zip(memory['percentiles'], database['percentiles']):
+        np.testing.assert_allclose(ours, theirs, equal_nan=True)
+
+
+@pytest.mark.parametrize('name', ['ranked', 'ranked_district', 'best', 'worst'])
+def test_rankings_agree(both, name):
+    memory, database = both
+    ours, theirs = memory[name][COLUMNS], database[name][COLUMNS]
+    assert ours['CentreName'].astype(str).tolist() == theirs['CentreName'].astype(str).tolist()
+    assert ours['DistrictName'].astype(str).tolist() == theirs['DistrictName'].astype(str).tolist()
+    np.testing.assert_allclose(ours['Pass_Rate'].astype(float), theirs['Pass_Rate'].astype(float),
+                               rtol=1e-6, equal_nan=True)
+
+
+def test_cube_agrees(both):
+    memory, database = both
+    pd.testing.assert_frame_equal(memory['cube'], database['cube'], check_dtype=False, check_exact=False,
+                                  check_index_type=False, rtol=1e-6)
+
+
+@pytest.mark.parametrize('name', ['correlations', 'district_correlations'])
+def test_correlations_agree(both, name):
+    memory, database = both
+    pd.testing.assert_frame_equal(memory[name], database[name], check_exact=False, rtol=1e-6, atol=1e-6)
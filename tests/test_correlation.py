@@ -0,0 +1,51 @@
+"""Correlations merged from per-district statistics must match pandas on the raw rows."""
+import pandas as pd
+import pytest
+
+from benchmarks.generate import HEADER, generate_rows
+from uneb.correlation import COLUMNS, CorrelationStats
+from uneb.metrics import add_metrics
+from uneb.refresh import prepare
+from uneb.schema import compact
+
+
+@pytest.fixture(scope='module')
+def frame():
+    years = []
+    for year, seed in ((2023, 1), (2024, 2)):
+        df = pd.DataFrame(list(generate_rows(300, districts=6, seed=seed)), columns=HEADER)
+        years.append(df.assign(Year=year))
+    df = prepare(pd.concat(years, ignore_index=True))
+    # Centres where nobody sat have no rates, so pairs are only complete on some rows
+    df.loc[[5, 17, 400], ['As', 'Bs', 'Cs', 'Ds', 'Es', 'Absent', 'Total']] = 0
+    return compact(add_metrics(df))
+
+
+def expected(frame, year, districts):
+    rows = frame[(frame['Year'] == year) & frame['DistrictName'].isin(districts)]
+    return rows[COLUMNS].astype('float64').corr()
+
+
+@pytest.mark.parametrize('year', [2023, 2024])
+def test_merged_matrix_matches_pandas(frame, year):
+    stats = CorrelationStats.build(frame)
+    names = sorted(frame.loc[frame['Year'] == year, 'DistrictName'].unique())
+    for districts in ([names[0]], names[:3], names):
+        pd.testing.assert_frame_equal(stats.matrix(year, districts), expected(frame, year, districts),
+                                      check_exact=False, rtol=1e-9, atol=1e-12)
+
+
+def test_patched_statistics_match_pandas(frame):
+    # Built without a third of the rows, then another third swapped for them
+    base = frame[frame.index % 3 != 0]
+    stats = CorrelationStats.build(base).patch(frame[frame.index % 3 == 1], frame[frame.index % 3 == 0])
+    kept = frame[frame.index % 3 != 1]
+    names = sorted(frame['DistrictName'].unique())
+    for year in (2023, 2024):
+        pd.testing.assert_frame_equal(stats.matrix(year, names), expected(kept, year, names),
+                                      check_exact=False, rtol=1e-9, atol=1e-12)
+
+
+def test_selection_without_schools_is_undefined(frame):
+    matrix = CorrelationStats.build(frame).matrix(1999, ['NOWHERE'])
+    assert matrix.isna().all().all()
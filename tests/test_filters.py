@@ -0,0 +1,55 @@
+"""Filter-index lookups must select exactly the rows a boolean mask would."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.generate import HEADER, generate_rows
+from uneb.filters import FilterIndex
+from uneb.metrics import TIERS, add_metrics
+from uneb.refresh import prepare
+from uneb.schema import compact
+
+
+@pytest.fixture(scope='module')
+def frame():
+    df = pd.DataFrame(list(generate_rows(500, districts=5, seed=3)), columns=HEADER).assign(Year=2024)
+    return compact(add_metrics(prepare(df)))
+
+
+def combinations(frame):
+    districts = frame['DistrictName'].unique().tolist()
+    yield {}
+    for district in districts[:3]:
+        yield {'DistrictName': district}
+    for tier in TIERS:
+        yield {'Performance_Category': tier}
+        yield {'DistrictName': districts[-1], 'Performance_Category': tier}
+    yield {'DistrictName': 'NOWHERE'}
+    yield {'DistrictName': 'NOWHERE', 'Performance_Category': TIERS[0]}
+
+
+def test_select_matches_boolean_mask(frame):
+    index = FilterIndex(frame)
+    for criteria in combinations(frame):
+        mask = np.ones(len(frame), dtype=bool)
+        for column, value in criteria.items():
+            mask &= (frame[column] == value).to_numpy()
+        selected = index.select(criteria)
+        expected = np.flatnonzero(mask)
+        assert (np.arange(len(frame)) if selected is None else selected).tolist() == expected.tolist(), criteria
+
+
+def test_values_in_order_of_first_appearance(frame):
+    index = FilterIndex(frame)
+    assert index.values('DistrictName') == frame['DistrictName'].drop_duplicates().tolist()
+    tiers = frame['Performance_Category'].dropna().drop_duplicates().tolist()
+    assert index.values('Performance_Category') == tiers
+
+
+def test_missing_values_match_nothing():
+    frame = pd.DataFrame({'DistrictName': ['MOYO', 'MOYO', 'ADJUMANI'],
+                          'Performance_Category': pd.Categorical([TIERS[0], None, TIERS[0]], categories=TIERS)})
+    index = FilterIndex(frame)
+    assert index.values('Performance_Category') == [TIERS[0]]
+    assert index.select({'Performance_Category': TIERS[0]}).tolist() == [0, 2]
+    assert index.select({'DistrictName': 'MOYO', 'Performance_Category': TIERS[1]}).tolist() == []
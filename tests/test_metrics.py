@@ -0,0 +1,59 @@
+"""Derived metrics, including rows with blank count cells."""
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from uneb.metrics import add_metrics
+from uneb.schema import compact
+
+
+def raw():
+    return pd.DataFrame({
+        'DistrictName': ['MOYO', 'MOYO', 'ADJUMANI', 'ADJUMANI'],
+        'CentreName': ['A', 'B', 'C', 'D'],
+        'As': [5, None, 2, 0],
+        'Bs': [10, 4, 3, 0],
+        'Cs': [20, 8, None, 0],
+        'Ds': [4, 2, 1, 0],
+        'Es': [1, 0, 0, 0],
+        'Absent': [2, 1, None, 3],
+    })
+
+
+def test_metrics_match_pandas_arithmetic_with_blank_cells():
+    df = raw()
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        result = add_metrics(df)
+
+    total = df[['As', 'Bs', 'Cs', 'Ds', 'Es', 'Absent']].sum(axis=1)
+    sat = total - df['Absent']
+    expected = {
+        'Total_Students': total,
+        'Excellent_Grades': df['As'] + df['Bs'],
+        'Pass_Rate': (df['As'] + df['Bs'] + df['Cs']) / sat * 100,
+        'Excellent_Performance': (df['As'] + df['Bs']) / sat * 100,
+        'Failure_Rate': (df['Ds'] + df['Es']) / sat * 100,
+    }
+    for column, values in expected.items():
+        if column.endswith(('_Rate', '_Performance')):
+            # Nobody sat at centre D: NaN rather than pandas' 0/0
+            values = values.where(sat > 0)
+        np.testing.assert_allclose(result[column].astype(float), values.astype(float), equal_nan=True,
+                                   err_msg=column)
+    assert result['Total_Students'].tolist() == [42, 15, 6, 3]
+    assert result['Performance_Category'].isna().tolist() == [False, True, True, True]
+
+
+def test_blank_cells_survive_compact():
+    result = compact(add_metrics(raw()))
+    assert result['Total_Students'].tolist() == [42, 15, 6, 3]
+    assert np.isnan(result['Pass_Rate'].iloc[1])
+
+
+def test_complete_counts_stay_integer():
+    df = raw().fillna(0)
+    result = add_metrics(df)
+    assert result['Total_Students'].dtype == np.int64
+    assert result['Excellent_Grades'].dtype == np.int64
@@ -0,0 +1,51 @@
+"""Rank orders keep ties in table order, missing values last, and pages seamless."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from uneb.ranking import RankOrder, page_count
+from uneb.store import MemoryStore
+
+VALUES = [50.0, 80.0, np.nan, 80.0, 20.0, 50.0, np.nan, 95.0, 50.0]
+
+
+def test_ties_keep_table_order_and_missing_values_last():
+    ranking = RankOrder(VALUES)
+    assert ranking.order.tolist() == [7, 1, 3, 0, 5, 8, 4, 2, 6]
+    assert ranking.reverse.tolist() == [4, 0, 5, 8, 1, 3, 7, 2, 6]
+    assert RankOrder(VALUES, ascending=True).order.tolist() == ranking.reverse.tolist()
+
+
+def test_top_and_bottom_skip_missing_values():
+    ranking = RankOrder(VALUES)
+    assert ranking.top(3).tolist() == [7, 1, 3]
+    assert ranking.top(20).tolist() == [7, 1, 3, 0, 5, 8, 4]
+    assert ranking.bottom(2).tolist() == [4, 0]
+
+
+def test_percentiles_count_ties_as_equal():
+    ranking = RankOrder(VALUES, groups=list('aabbbaaab'))
+    # Seven ranked values: the three 50s each do at least as well as four of them
+    np.testing.assert_allclose(ranking.percentile, 100 * np.array([4, 6, np.nan, 6, 1, 4, np.nan, 7, 4]) / 7)
+    np.testing.assert_allclose(ranking.group_percentile[[0, 1, 5, 6, 7]], [50, 75, 50, np.nan, 100])
+
+
+def test_select_reorders_a_subset_by_rank():
+    ranking = RankOrder(VALUES)
+    assert ranking.select(np.array([0, 2, 3, 4, 8])).tolist() == [3, 0, 8, 4, 2]
+
+
+@pytest.mark.parametrize('size', [1, 2, 3, 4, 9, 10])
+def test_pages_join_up_at_every_boundary(size):
+    frame = pd.DataFrame({'CentreName': [f'S{i}' for i in range(len(VALUES))], 'Pass_Rate': VALUES,
+                          'Year': 2024, 'DistrictName': 'MOYO', 'Performance_Category': 'Good (60-79%)'})
+    store = MemoryStore(frame)
+    pages = [store.schools(2024, order='Pass_Rate', limit=size, offset=page * size)
+             for page in range(page_count(len(frame), size))]
+    assert all(len(page) == size for page in pages[:-1])
+    assert pd.concat(pages)['CentreName'].tolist() == [f'S{i}' for i in RankOrder(VALUES).order]
+    assert len(store.schools(2024, order='Pass_Rate', limit=size, offset=len(frame))) == 0
+
+
+def test_page_count():
+    assert [page_count(total, 10) for total in (0, 1, 10, 11, 20)] == [1, 1, 1, 2, 2]
@@ -0,0 +1,73 @@
+"""A refreshed dataset must match one built from scratch over the same workbooks."""
+import numpy as np
+import pandas as pd
+import pytest
+from openpyxl import Workbook
+
+from benchmarks.generate import HEADER, generate_rows
+from uneb import snapshot
+from uneb.cube import build_cube
+from uneb.correlation import CorrelationStats
+from uneb.ingest import SOURCES_ENV, source_files
+from uneb.refresh import LiveDataset, build
+
+
+def write_workbook(path, rows):
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet('Sheet1')
+    ws.append(HEADER)
+    for row in rows:
+        ws.append(row)
+    wb.save(path)
+
+
+def assert_correlations_equal(patched, fresh):
+    assert sorted(patched.groups) == sorted(fresh.groups)
+    for key in fresh.groups:
+        np.testing.assert_allclose(patched.groups[key].corr(), fresh.groups[key].corr(),
+                                   rtol=1e-9, atol=1e-9, equal_nan=True)
+
+
+@pytest.fixture
+def workbooks(tmp_path, monkeypatch):
+    monkeypatch.setenv(SOURCES_ENV, str(tmp_path / 'results'))
+    monkeypatch.setattr(snapshot, 'SNAPSHOT_DIR', tmp_path / 'snapshots')
+    (tmp_path / 'results').mkdir()
+    rows = {
+        2023: list(generate_rows(60, districts=4, seed=1)),
+        2024: list(generate_rows(80, districts=5, seed=2)),
+    }
+    for year, year_rows in rows.items():
+        write_workbook(tmp_path / 'results' / f'results_{year}.xlsx', year_rows)
+    return tmp_path / 'results', rows
+
+
+def test_refresh_matches_fresh_build(workbooks):
+    folder, rows = workbooks
+    live = LiveDataset(interval=1e-9)
+
+    edited = [list(row) for row in rows[2024]]
+    edited[3][3:8] = [40, 10, 5, 0, 0]                    # grades of one centre corrected
+    edited[3][9] = sum(edited[3][3:9])
+    edited[10][8] = edited[10][8] + 3                     # absences of another
+    del edited[20:25]                                      # centres dropped
+    edited += [[100 + i, *row[1:]] for i, row in enumerate(generate_rows(6, districts=7, seed=3))]
+    write_workbook(folder / 'results_2024.xlsx', edited)
+    # A whole district gone from one year, and a year added
+    write_workbook(folder / 'results_2023.xlsx', [row for row in rows[2023] if row[1] != 'ADJUMANI'])
+    write_workbook(folder / 'results_2022.xlsx', generate_rows(30, districts=3, seed=4))
+
+    assert live.refresh()
+    state = live.state
+    fresh, _ = build(source_files())
+
+    pd.testing.assert_frame_equal(pd.DataFrame(state.frame), fresh)
+    pd.testing.assert_frame_equal(pd.DataFrame(state.cube), build_cube(fresh), check_exact=False, rtol=1e-9)
+    assert_correlations_equal(state.correlations, CorrelationStats.build(fresh))
+
+
+def test_refresh_without_changes_keeps_the_state(workbooks):
+    live = LiveDataset(interval=1e-9)
+    state = live.state
+    assert not live.refresh()
+    assert live.state is state
@@ -0,0 +1,55 @@
+"""Compact column types: smaller, lossless, and never wrapping bad counts."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from uneb.metrics import add_metrics
+from uneb.schema import compact, memory_report
+
+
+@pytest.fixture
+def schools():
+    df = pd.DataFrame({
+        'No': [1, 2, 3],
+        'DistrictName': ['MOYO', 'ADJUMANI', 'MOYO'],
+        'CentreName': ['ST.MARY', 'PAKELE', 'MOYO SS'],
+        'As': [5, 0, 300], 'Bs': [10, 4, 2], 'Cs': [20, 8, 1], 'Ds': [4, 2, 0], 'Es': [1, 0, 0],
+        'Absent': [2, 1, 0], 'Total': [42, 15, 303], 'Year': [2024, 2024, 2024],
+    })
+    return add_metrics(df)
+
+
+def test_compact_types(schools):
+    df = compact(schools)
+    assert df['DistrictName'].dtype == 'category'
+    assert df['CentreName'].dtype == 'category'
+    # Every count shares the type of the largest centre total
+    assert {str(df[c].dtype) for c in ['As', 'Bs', 'Absent', 'Total', 'Total_Students']} == {'uint16'}
+    assert df['Pass_Rate'].dtype == np.float32
+    assert df['Year'].dtype == np.uint16
+    assert isinstance(df['Performance_Category'].dtype, pd.CategoricalDtype)
+
+
+def test_compact_round_trip(schools):
+    df = compact(schools)
+    back = df.astype({c: t for c, t in schools.dtypes.items() if c not in ('Performance_Category',)})
+    pd.testing.assert_frame_equal(back, schools, check_exact=False, rtol=1e-6)
+    pd.testing.assert_frame_equal(compact(df), df)
+
+
+def test_negative_counts_keep_their_type(schools):
+    bad = schools.assign(As=[5, -3, 300], Total=[42, 15, -9223372036854775808])
+    df = compact(bad)
+    assert df['As'].dtype == np.int64 and df['As'].tolist() == [5, -3, 300]
+    assert df['Total'].dtype == np.int64 and df['Total'].iloc[2] == -9223372036854775808
+    # The valid counts are still compacted, sized without the bad columns
+    assert df['Bs'].dtype == np.uint16
+
+
+def test_memory_report(schools):
+    df = compact(schools)
+    report = memory_report(df)
+    assert report['Column'].tolist() == list(df.columns) + ['Total']
+    numeric = report[report['Column'].isin(['As', 'Total_Students', 'Year', 'Pass_Rate'])]
+    assert (numeric['Bytes'] < numeric['Default bytes']).all()
+    assert report['Bytes'].iloc[-1] == report['Bytes'].iloc[:-1].sum()
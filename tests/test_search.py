@@ -0,0 +1,49 @@
+"""The name index finds schools however the query is spelt, and only where asked."""
+import pytest
+
+from uneb.search import SchoolIndex, normalize
+
+NAMES = ["St. Mary's Secondary School", 'MOYO SECONDARY SCHOOL', 'Moyo Seed School',
+         'Adjumani Secondary School', 'Obongi Seed School', 'MOYO SECONDARY SCHOOL']
+DISTRICTS = ['MOYO', 'MOYO', 'MOYO', 'ADJUMANI', 'OBONGI', 'ADJUMANI']
+
+
+@pytest.fixture
+def index():
+    return SchoolIndex(NAMES, groups=DISTRICTS)
+
+
+def test_exact_ignores_case_and_punctuation(index):
+    assert normalize("ST.MARY'S  secondary school") == normalize(NAMES[0])
+    assert index.exact("st marys secondary school").tolist() == []
+    assert index.exact("ST.MARY'S SECONDARY SCHOOL").tolist() == [0]
+    # A name shared by two centres finds both rows
+    assert index.exact('moyo secondary school').tolist() == [1, 5]
+
+
+def test_prefix_before_word_matches(index):
+    found = index.search('moyo s')
+    assert found == ['moyo secondary school', 'moyo seed school']
+    # Every query word must start a word of the name, in any order
+    assert index.search('seed obo') == ['obongi seed school']
+
+
+def test_fuzzy_is_only_a_fallback(index):
+    assert index.search('adjumani secondery') == ['adjumani secondary school']
+    assert index.search('mooyo seconadry') == ['moyo secondary school']
+    assert index.search('zzz') == []
+
+
+def test_groups_limit_names_and_positions(index):
+    assert index.search('secondary', groups=['ADJUMANI']) == ['adjumani secondary school',
+                                                              'moyo secondary school']
+    assert index.positions(['moyo secondary school'], groups=['ADJUMANI']).tolist() == [5]
+    assert index.search('obongi', groups=['MOYO']) == []
+
+
+def test_limit_counts_names_not_rows(index):
+    # Prefix matches come first, then names with a word starting that way
+    assert index.search('s', limit=3) == ['st mary s secondary school', 'adjumani secondary school',
+                                          'moyo secondary school']
+    assert index.search('secondary school', limit=10) == ['adjumani secondary school', 'moyo secondary school',
+                                                          'st mary s secondary school']
@@ -0,0 +1 @@
+"""Data layer for the Madi sub-region UNEB performance dashboard."""
@@ -0,0 +1,56 @@
+"""Histogram counts and 2-D density grids for charts over many schools.
+
+Charts of per-school values are drawn from arrays binned once per dataset
+version (see the cached accessors in ``uneb.data``) instead of raw rows, so
+drawing cost, the chart-cache fingerprint and the PNG stay the same size
+however many schools there are.
+
+* Histograms are always drawn from counts. Overlaid histograms share the
+  bin edges matplotlib would pick for the combined values, so the chart is
+  identical to ``ax.hist`` on the raw series.
+* Scatter plots switch to a density grid once they would draw more than
+  ``POINT_THRESHOLD`` points.
+"""
+import numpy as np
+
+# Above this many points a scatter plot is drawn as a density grid
+POINT_THRESHOLD = 5000
+
+HIST_BINS = 10
+DENSITY_BINS = 60
+
+
+def use_density(points):
+    return points > POINT_THRESHOLD
+
+
+def histograms(series, bins=HIST_BINS):
+    """Shared bin edges and per-series counts, as ``ax.hist(series, bins)`` would bin them."""
+    values = [np.asarray(s, dtype=float) for s in series]
+    values = [v[~np.isnan(v)] for v in values]
+    edges = np.histogram_bin_edges(np.concatenate(values) if values else [], bins=bins)
+    return edges, [np.histogram(v, bins=edges)[0] for v in values]
+
+
+def density(x, y, bins=DENSITY_BINS):
+    """2-D counts of the points where both ``x`` and ``y`` are present, with the grid edges."""
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    keep = ~(np.isnan(x) | np.isnan(y))
+    return np.histogram2d(x[keep], y[keep], bins=bins)
+
+
+def draw_histograms(ax, edges, counts, **kwargs):
+    """Overlaid histograms of precomputed ``counts`` over shared ``edges``."""
+    centres = [edges[:-1]] * len(counts)
+    return ax.hist(centres, bins=edges, weights=counts, **kwargs)
+
+
+def draw_density(ax, counts, xedges, yedges, label='Number of Schools'):
+    """Log-scaled density grid with a colour bar; empty cells stay blank."""
+    from matplotlib.colors import LogNorm
+
+    grid = np.ma.masked_equal(counts.T, 0)
+    mesh = ax.pcolormesh(xedges, yedges, grid, cmap='viridis',
+                         norm=LogNorm(vmin=1, vmax=max(1, counts.max())))
+    ax.figure.colorbar(mesh, ax=ax, label=label)
+    return mesh
@@ -0,0 +1,207 @@
+"""Pre-rendered bundles for serving published results without recomputing them.
+
+Published results do not change, so a build step can do the work once for
+every visitor. A bundle is a versioned folder holding the cleaned table and
+the PNG of every chart the app shows for the common views: each exam year
+with all of its districts and with each district alone, and every option of
+the pages' select boxes. Each chart is stored under its chart-cache key
+(``uneb.charts.fingerprint``), which is what the app looks it up by:
+
+    python -m uneb.bundle --output bundles/          # prints the new bundle folder
+    UNEB_BUNDLE=bundles/<name> streamlit run app.py
+
+With ``UNEB_BUNDLE`` set the app maps its data from the bundle instead of
+reading the workbooks, never refreshes, and sends pre-rendered charts
+straight from disk. Anything the bundle does not cover - another
+combination of districts, say - falls back to drawing live as usual. A
+bundle written for another data format is ignored with a warning.
+"""
+import argparse
+import json
+import logging
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import as_completed
+from functools import lru_cache
+from pathlib import Path
+
+from uneb import perf, snapshot
+
+BUNDLE_ENV = 'UNEB_BUNDLE'
+
+# Bump whenever what a bundle holds, or how it is laid out, changes
+FORMAT_VERSION = 1
+
+_MANIFEST = 'manifest.json'
+_DATA = 'data.feather'
+_CHARTS = 'charts'
+
+log = logging.getLogger(__name__)
+
+
+def _format():
+    # Charts depend on the table, so a new snapshot format invalidates bundles too
+    return {'bundle': FORMAT_VERSION, 'snapshot': snapshot.FORMAT_VERSION}
+
+
+class Bundle:
+    """A built bundle folder."""
+
+    def __init__(self, path, manifest):
+        self.path = Path(path)
+        self.manifest = manifest
+
+    @classmethod
+    def open(cls, path):
+        """The bundle at ``path``; None (with a warning) if it is missing or of another format."""
+        try:
+            manifest = json.loads((Path(path) / _MANIFEST).read_text())
+        except (OSError, ValueError):
+            log.warning("No usable bundle at %s; computing everything live", path)
+            return None
+        if manifest.get('format') != _format():
+            log.warning("Bundle %s has format %s, expected %s; computing everything live",
+                        path, manifest.get('format'), _format())
+            return None
+        return cls(path, manifest)
+
+    def dataset(self):
+        """The bundled table and its snapshot meta."""
+        with perf.span('bundle.data'):
+            return snapshot.read_frame(self.path / _DATA)
+
+    def chart(self, key):
+        """PNG bytes of the chart with cache key ``key``, or None if it was not pre-rendered."""
+        try:
+            png = (self.path / _CHARTS / f'{key}.png').read_bytes()
+        except FileNotFoundError:
+            perf.count('bundle.miss')
+            return None
+        perf.count('bundle.hit')
+        return png
+
+
+@lru_cache(maxsize=None)
+def _open(path):
+    return Bundle.open(path)
+
+
+def active():
+    """The bundle named by ``$UNEB_BUNDLE``, if the app is serving one."""
+    path = os.environ.get(BUNDLE_ENV)
+    return _open(path) if path else None
+
+
+def entry_points():
+    from uneb.export import ROOT
+
+    return ['app.py'] + [str(p.relative_to(ROOT)) for p in sorted((ROOT / 'pages').glob('*.py'))]
+
+
+def views(years, districts=None):
+    """``(year, districts)`` scopes to pre-render: all districts together, then each alone."""
+    from uneb import data
+
+    scopes = []
+    for year in years:
+        names = data.district_names(year)
+        scopes.append((year, tuple(names)))
+        if len(names) > 1:
+            scopes.extend((year, (name,)) for name in names if not districts or name in districts)
+    return scopes
+
+
+def render_view(view):
+    """``{key: png}`` of every chart the app shows for one view, select-box options included."""
+    from uneb.charts import recording
+    from uneb.export import run_page
+
+    year, districts = view
+    charts = {}
+    for script in entry_points():
+        at, shown = run_page(script, year, districts)
+        charts.update(shown)
+        # One select box at a time, each put back before the next
+        for i in range(len(at.main.selectbox)):
+            chosen = at.main.selectbox[i].index
+            for option in range(len(at.main.selectbox[i].options)):
+                if option != chosen:
+                    with recording() as shown:
+                        at.main.selectbox[i].select_index(option).run()
+                    charts.update(shown)
+            if len(at.main.selectbox[i].options) > 1:
+                at.main.selectbox[i].select_index(chosen).run()
+            if at.exception:
+                raise RuntimeError(f"{script} failed for {', '.join(districts)} ({year}): {at.exception[0].value}")
+    return charts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--output', type=Path, default=Path('bundles'), help='folder for bundles (default: bundles)')
+    parser.add_argument('--years', nargs='+', type=int, help='exam years (default: all)')
+    parser.add_argument('--districts', nargs='+', type=str.upper,
+                        help='pre-render single-district views only for these (default: every district)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args(argv)
+
+    from uneb.export import headless, worker_pool
+
+    headless()
+    import matplotlib
+    import streamlit
+
+    from uneb import data
+
+    start = time.perf_counter()
+    state = data.current()
+    if state.frame is None:
+        parser.error("bundles are built from the workbooks; unset UNEB_DATABASE")
+    name = snapshot.snapshot_key(state.sources)
+    final = args.output / name
+    tmp = args.output / f'.{name}.{os.getpid()}.tmp'
+    shutil.rmtree(tmp, ignore_errors=True)
+    (tmp / _CHARTS).mkdir(parents=True)
+    snapshot.write_frame(tmp / _DATA, state.frame, {'rows': state.rows})
+
+    years = args.years or data.exam_years()
+    scopes = views(years, args.districts)
+    print(f"Pre-rendering {len(scopes)} view(s) of {len(entry_points())} pages with {args.workers} worker(s)")
+    charts = 0
+    with worker_pool(args.workers) as pool:
+        futures = {pool.submit(render_view, view): view for view in scopes}
+        for future in as_completed(futures):
+            year, districts = futures[future]
+            rendered = future.result()
+            for key, png in rendered.items():
+                path = tmp / _CHARTS / f'{key}.png'
+                if not path.exists():
+                    path.write_bytes(png)
+                    charts += 1
+            label = 'all districts' if len(districts) > 1 else districts[0]
+            print(f"  {year} {label:30s} {len(rendered):4d} charts")
+
+    (tmp / _MANIFEST).write_text(json.dumps({
+        'format': _format(),
+        'dataset': name,
+        'sources': [Path(s).name for s in state.sources],
+        'years': years,
+        'views': len(scopes),
+        'charts': charts,
+        'built': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        # Charts are only byte-identical to live ones under the same renderer
+        'streamlit': streamlit.__version__,
+        'matplotlib': matplotlib.__version__,
+    }, indent=1))
+    shutil.rmtree(final, ignore_errors=True)
+    os.replace(tmp, final)
+    print(f"{charts} charts in {time.perf_counter() - start:.1f}s; serve with {BUNDLE_ENV}={final}")
+    return 0
+
+
+if __name__ == '__main__':
+    # Run the importable copy, as uneb.export does, so worker tasks unpickle
+    import uneb.bundle
+    sys.exit(uneb.bundle.main())
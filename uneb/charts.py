@@ -0,0 +1,168 @@
+"""Rendered-chart cache with an explicit matplotlib figure lifecycle.
+
+Pages describe each chart as a small function that takes its input data and
+returns a matplotlib figure. ``show_chart`` rasterizes that figure once,
+closes it straight away so pyplot's global figure registry never grows, and
+keeps the PNG in a process-wide LRU keyed by the function, a fingerprint of
+its data and its parameters. Later reruns - from any session - send the
+cached image without touching matplotlib.
+
+matplotlib is only imported when a chart actually has to be drawn; pages
+import pyplot inside their chart functions for the same reason, so a page
+whose charts are all cached never loads it.
+
+When the app serves a pre-rendered bundle (see ``uneb.bundle``) the cache key
+doubles as the artifact name: a chart missing from memory is read from the
+bundle, and only drawn if the bundle does not have it either.
+
+Hits, misses and evictions are counted as ``charts.*`` in ``uneb.perf``, and
+drawing and rasterizing are timed as ``chart.draw`` / ``chart.render`` spans.
+"""
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from uneb import bundle, perf
+
+# Same rasterization settings st.pyplot uses
+SAVEFIG_KWARGS = {"format": "png", "bbox_inches": "tight", "dpi": 200}
+
+# Streamlit shrinks images wider than its content area (2 x 730 px), decoding
+# and re-encoding them on every rerun; charts are rasterized to fit instead
+MAX_WIDTH = 2 * 730
+
+MAX_ENTRIES = 128
+
+
+class RenderCache:
+    """Thread-safe LRU of rendered PNG bytes."""
+
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            png = self._entries.get(key)
+            if png is not None:
+                self._entries.move_to_end(key)
+        perf.count('charts.hit' if png is not None else 'charts.miss')
+        return png
+
+    def put(self, key, png):
+        with self._lock:
+            self._entries[key] = png
+            self._entries.move_to_end(key)
+            evicted = 0
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                evicted += 1
+        if evicted:
+            perf.count('charts.evict', evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+cache = RenderCache()
+
+_recorders = []
+
+
+@contextmanager
+def recording():
+    """Collect ``(key, png)`` for every chart shown while active, in display order.
+
+    Used by the report exporter (``uneb.export``) to embed the charts of a
+    page it has run headlessly, and to build bundles (``uneb.bundle``).
+    """
+    shown = []
+    _recorders.append(shown)
+    try:
+        yield shown
+    finally:
+        _recorders.remove(shown)
+
+
+def _update(digest, value):
+    if isinstance(value, (pd.DataFrame, pd.Series, pd.Index)):
+        digest.update(repr((type(value).__name__, value.shape)).encode())
+        if isinstance(value, pd.DataFrame):
+            digest.update(repr(list(value.columns)).encode())
+        digest.update(pd.util.hash_pandas_object(value, index=True).values.tobytes())
+    elif isinstance(value, np.ndarray):
+        digest.update(repr((value.dtype.str, value.shape)).encode())
+        digest.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, (list, tuple)):
+        digest.update(f"{type(value).__name__}{len(value)}".encode())
+        for item in value:
+            _update(digest, item)
+    elif isinstance(value, dict):
+        for name in sorted(value):
+            digest.update(repr(name).encode())
+            _update(digest, value[name])
+    else:
+        digest.update(repr(value).encode())
+
+
+def fingerprint(draw, data, params):
+    """Cache key for ``draw(*data, **params)``."""
+    digest = hashlib.sha256()
+    # Page scripts all run as __main__, so the file disambiguates same-named
+    # functions; only its name counts, so keys match wherever the app is installed
+    digest.update(f"{os.path.basename(draw.__code__.co_filename)}:{draw.__qualname__}".encode())
+    _update(digest, data)
+    _update(digest, params)
+    return digest.hexdigest()
+
+
+def render(fig):
+    """Rasterize ``fig`` to PNG bytes and release it."""
+    import matplotlib.pyplot as plt
+
+    try:
+        dpi = min(SAVEFIG_KWARGS['dpi'], MAX_WIDTH / fig.get_figwidth())
+        for _ in range(3):
+            buf = io.BytesIO()
+            fig.savefig(buf, **{**SAVEFIG_KWARGS, 'dpi': dpi})
+            png = buf.getvalue()
+            # The tight bounding box can come out wider than the figure
+            width = int.from_bytes(png[16:20], 'big')
+            if width <= MAX_WIDTH:
+                break
+            dpi *= (MAX_WIDTH - 1) / width
+        return png
+    finally:
+        plt.close(fig)
+
+
+def show_chart(draw, *data, **params):
+    """Display ``draw(*data, **params)``, reusing the cached image when possible."""
+    chart = {'chart': draw.__qualname__, 'page': os.path.basename(draw.__code__.co_filename)}
+    with perf.span('chart.fingerprint', **chart):
+        key = fingerprint(draw, data, params)
+    png = cache.get(key)
+    if png is None:
+        served = bundle.active()
+        png = served.chart(key) if served else None
+        if png is None:
+            with perf.span('chart.draw', **chart):
+                fig = draw(*data, **params)
+            with perf.span('chart.render', **chart):
+                png = render(fig)
+        cache.put(key, png)
+    for shown in _recorders:
+        shown.append((key, png))
+    st.image(png, width="stretch")
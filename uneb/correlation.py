@@ -0,0 +1,105 @@
+"""Correlation matrices from additive per-district sufficient statistics.
+
+For every (year, district) the engine keeps, for each pair of columns, the
+number of rows where both are present and the sums, sums of squares and
+cross-products over those rows. Those are additive, so:
+
+* the matrix of any selection of districts is the merge of a handful of
+  small arrays, whatever the number of schools behind them;
+* rows that change in a refresh are subtracted and re-added, as for the
+  aggregate cube, without rescanning anything else.
+
+Values are shifted by a fixed per-column reference before summing, which
+keeps the raw-moment formula numerically close to pandas' two-pass
+``DataFrame.corr()`` (pairwise-complete Pearson), whose results it matches.
+"""
+import numpy as np
+import pandas as pd
+
+# School-level quantities whose pairwise correlations the dashboard shows
+COLUMNS = ['Total_Students', 'As', 'Bs', 'Cs', 'Ds', 'Es', 'Absent', 'Pass_Rate', 'Failure_Rate']
+
+KEYS = ['Year', 'DistrictName']
+
+
+class Moments:
+    """Pairwise-complete sums over a set of rows, for ``len(COLUMNS)`` columns.
+
+    ``n[i, j]`` counts rows where columns i and j are both present; over those
+    rows ``s[i, j]`` and ``ss[i, j]`` sum column i and its square, and
+    ``p[i, j]`` sums the product of the two columns.
+    """
+
+    def __init__(self, n, s, ss, p):
+        self.n, self.s, self.ss, self.p = n, s, ss, p
+
+    @classmethod
+    def of(cls, values, shift):
+        present = ~np.isnan(values)
+        x = np.where(present, values - shift, 0.0)
+        m = present.astype(float)
+        return cls(m.T @ m, x.T @ m, (x * x).T @ m, x.T @ x)
+
+    @classmethod
+    def zero(cls, k=len(COLUMNS)):
+        return cls(*(np.zeros((k, k)) for _ in range(4)))
+
+    def __add__(self, other):
+        return Moments(self.n + other.n, self.s + other.s, self.ss + other.ss, self.p + other.p)
+
+    def __sub__(self, other):
+        return Moments(self.n - other.n, self.s - other.s, self.ss - other.ss, self.p - other.p)
+
+    def corr(self):
+        """Pearson correlation matrix (NaN where fewer than two rows or no variance)."""
+        n, s, ss, p = self.n, self.s, self.ss, self.p
+        cov = n * p - s * s.T
+        var = n * ss - s * s
+        with np.errstate(divide='ignore', invalid='ignore'):
+            r = cov / np.sqrt(var * var.T)
+        valid = (n >= 2) & (var > 0) & (var.T > 0)
+        r = np.where(valid, np.clip(r, -1.0, 1.0), np.nan)
+        np.fill_diagonal(r, np.where(np.diag(valid), 1.0, np.nan))
+        return pd.DataFrame(r, index=COLUMNS, columns=COLUMNS)
+
+
+class CorrelationStats:
+    """``Moments`` of ``COLUMNS`` per (year, district)."""
+
+    def __init__(self, groups, shift):
+        self.groups = groups
+        self.shift = shift
+
+    @classmethod
+    def build(cls, frame):
+        values = frame[COLUMNS].to_numpy(dtype=float)
+        shift = np.nan_to_num(np.nanmean(values, axis=0)) if len(values) else np.zeros(len(COLUMNS))
+        return cls(cls._moments(frame, values, shift), shift)
+
+    @staticmethod
+    def _moments(frame, values, shift):
+        positions = frame.groupby(KEYS, sort=True).indices if len(frame) else {}
+        return {key: Moments.of(values[rows], shift) for key, rows in positions.items()}
+
+    def patch(self, removed, added):
+        """Statistics after removing the rows ``removed`` and adding the rows ``added``."""
+        groups = dict(self.groups)
+        for frame, sign in ((removed, -1), (added, 1)):
+            values = frame[COLUMNS].to_numpy(dtype=float)
+            for key, moments in self._moments(frame, values, self.shift).items():
+                current = groups.get(key, Moments.zero())
+                groups[key] = current + moments if sign > 0 else current - moments
+        # Districts left without schools drop out, as in a fresh build
+        groups = {key: m for key, m in groups.items() if np.diag(m.n).max() > 0.5}
+        return CorrelationStats(groups, self.shift)
+
+    def merged(self, keys):
+        total = Moments.zero()
+        for key in keys:
+            if key in self.groups:
+                total = total + self.groups[key]
+        return total
+
+    def matrix(self, year, districts):
+        """Correlation matrix of ``COLUMNS`` across the schools of ``districts`` in ``year``."""
+        return self.merged([(year, d) for d in districts]).corr()
@@ -0,0 +1,105 @@
+"""Year x district x performance-tier aggregate cube shared by the analysis pages.
+
+The cube holds only additive quantities (grade counts, absences, student
+totals, school counts and per-metric sums/counts), so any roll-up of it -
+per year, district, tier or overall - is a cheap sum over a handful of rows,
+independent of how many schools are in the dataset. For the same reason it
+can be patched when rows change, by subtracting the old rows' cube and
+adding the new rows' cube, without touching the unchanged schools.
+"""
+import numpy as np
+import pandas as pd
+
+from uneb.metrics import GRADES, METRICS, TIERS
+
+DIMENSIONS = ['Year', 'DistrictName', 'Performance_Category']
+SUM_COLUMNS = GRADES + ['Absent', 'Total_Students']
+
+
+def build_cube(df):
+    """Aggregate ``df`` to one row per (year, district, performance tier)."""
+    # Sum in full-width types whatever the table stores (see uneb.schema), and
+    # group on district names as text so only districts present are listed
+    df = df[DIMENSIONS + SUM_COLUMNS + list(METRICS)].astype(
+        {'Year': 'int64', 'DistrictName': 'str', **dict.fromkeys(SUM_COLUMNS, 'int64'),
+         **dict.fromkeys(METRICS, 'float64')})
+    groups = df.groupby(DIMENSIONS, observed=False, dropna=False)
+    cube = groups[SUM_COLUMNS].sum()
+    cube['Schools'] = groups.size()
+    for metric in METRICS:
+        # Sum and non-null count, so means can be re-derived after rolling up
+        cube[f'{metric}_sum'] = groups[metric].sum()
+        cube[f'{metric}_n'] = groups[metric].count()
+    return cube
+
+
+def _canonical_index(cube):
+    # build_cube yields every tier (and the NaN tier, if any school has one)
+    # for each (year, district) pair that has schools
+    present = cube['Schools'] > 0
+    keys = cube.index.droplevel('Performance_Category')[present].unique().sort_values()
+    tiers = list(TIERS)
+    if cube.index.get_level_values('Performance_Category')[present].isna().any():
+        tiers.append(np.nan)
+    return pd.MultiIndex.from_arrays([
+        np.repeat(keys.get_level_values('Year'), len(tiers)),
+        np.repeat(keys.get_level_values('DistrictName'), len(tiers)),
+        pd.Categorical(tiers * len(keys), categories=TIERS, ordered=True),
+    ], names=DIMENSIONS)
+
+
+def _complete(cube, dtypes):
+    cube = cube.reindex(_canonical_index(cube), fill_value=0).astype(dtypes)
+    for metric in METRICS:
+        # Don't leave float residue behind in cells that no longer hold a school
+        cube.loc[cube[f'{metric}_n'] == 0, f'{metric}_sum'] = 0.0
+    return cube
+
+
+def patch_cube(cube, removed, added):
+    """``cube`` after removing the rows ``removed`` and adding the rows ``added``."""
+    delta = [cube]
+    if len(added):
+        delta.append(build_cube(added))
+    if len(removed):
+        delta.append(-build_cube(removed))
+    patched = pd.concat(delta).groupby(level=DIMENSIONS, observed=True, dropna=False).sum()
+    return _complete(patched, cube.dtypes)
+
+
+def cube_from_totals(totals):
+    """A cube from per-group totals aggregated elsewhere, such as in SQL (see ``uneb.database``).
+
+    ``totals`` has the ``DIMENSIONS`` and cube columns, one row per non-empty
+    group; the result has the layout and dtypes ``build_cube`` gives.
+    """
+    totals = totals.assign(Performance_Category=pd.Categorical(
+        totals['Performance_Category'], categories=TIERS, ordered=True))
+    cube = totals.set_index(DIMENSIONS).fillna(0)
+    dtypes = {col: 'float64' if col.endswith('_sum') else 'int64' for col in cube.columns}
+    return _complete(cube, dtypes)
+
+
+def _finish(totals):
+    for metric in METRICS:
+        totals[metric] = totals[f'{metric}_sum'] / totals[f'{metric}_n']
+    totals['Avg_School_Size'] = totals['Total_Students'] / totals['Schools']
+    totals['Absent_Rate'] = totals['Absent'] / totals['Total_Students'] * 100
+    return totals
+
+
+def rollup(cube, level=None):
+    """Collapse the cube onto ``level`` (or to overall totals when ``None``).
+
+    The result carries the additive columns plus the mean of each metric
+    across schools, the average school size and the absenteeism rate.
+    """
+    if level is None:
+        return _finish(cube.sum())
+    return _finish(cube.groupby(level=level, observed=True).sum())
+
+
+def tier_counts(cube):
+    """Number of schools per district (rows) and performance tier (columns)."""
+    counts = cube['Schools'].unstack('Performance_Category', fill_value=0)
+    return counts.loc[:, counts.columns.notna()]
@@ -0,0 +1,341 @@
+"""Dataset accessors shared by the landing page and every analysis page.
+
+Importing this module has no UI side effects; the workbooks are only read (or
+their snapshot mapped) the first time an accessor is called, and the results
+are memoized by Streamlit's caches. Changed workbooks are picked up
+incrementally while the app runs (see ``uneb.refresh``), unless the app is
+serving a pre-rendered bundle (see ``uneb.bundle``).
+
+Every accessor reads through the dataset's store, whichever backend holds
+the rows (see ``uneb.store``). By default that is the full table in memory,
+answered from presorted rank orders and filter indexes. With
+``UNEB_DATABASE`` set the rows stay in an embedded database instead (see
+``uneb.database``): the cube and correlation statistics are aggregated
+there, and the previews, top and bottom lists, ranked pages, counts and
+percentiles below are ORDER BY / LIMIT queries. The name index reads only
+the names, and other rows reach pandas only as the columns a chart plots
+(``get_columns``) or when a page asks for ``get_schools`` itself.
+
+Every frame handed out is a read-only ``FrozenFrame``: the full table is
+loaded once per process, and it and every selection taken from it live in
+``st.cache_resource``, shared by all sessions and reruns without being
+pickled or copied per caller. Pages cannot accidentally write into them.
+Small derived results (histogram counts and the like) stay in
+``st.cache_data``.
+
+The dataset may hold several exam years and any number of districts. Every
+accessor takes an optional ``year`` (default: the latest year loaded) and
+``districts`` selection (default: every district sitting that year).
+"""
+import os
+
+import numpy as np
+import streamlit as st
+
+from uneb import binning, bundle, perf
+from uneb.cube import rollup
+from uneb.database import DATABASE_ENV, Database
+from uneb.frozen import freeze
+from uneb.metrics import GRADES, METRICS, TIERS
+from uneb.refresh import LiveDataset
+from uneb.schema import memory_report as _memory_report
+from uneb.search import SchoolIndex
+
+# The metric names are re-exported for the pages, alongside the accessors
+__all__ = [
+    'GRADES', 'METRICS', 'TIERS',
+    'current', 'load_data', 'exam_years', 'district_names', 'get_schools', 'get_columns',
+    'school_names', 'schools_at', 'school_index', 'preview', 'ranked_schools', 'best_schools',
+    'worst_schools', 'school_count', 'filter_values', 'percentiles', 'memory_report', 'get_cube',
+    'histograms', 'density', 'correlation_matrix', 'year_cube', 'district_summary', 'overall_summary',
+]
+
+
+@perf.counted('_live')
+@st.cache_resource(show_spinner=False)
+def _live():
+    perf.count('cache._live.miss')
+    with perf.span('data.load'):
+        served = bundle.active()
+        if served:
+            return LiveDataset.fixed(*served.dataset())
+        if os.environ.get(DATABASE_ENV):
+            return Database(os.environ[DATABASE_ENV])
+        return LiveDataset()
+
+
+def current():
+    """The current generation of the dataset, after picking up changed workbooks.
+
+    Derived results below are cached per ``version``, so a refresh reaches
+    every page on its next rerun without invalidating anything by hand.
+    """
+    live = _live()
+    live.refresh()
+    return live.state
+
+
+def load_data():
+    """The full school table (read in full even from a database; prefer ``get_schools``)."""
+    return freeze(current().store.schools())
+
+
+@perf.counted('scopes')
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _scopes(version, _cube):
+    # Every (year, district) pair with schools, sorted; the cube already lists them
+    perf.count('cache.scopes.miss')
+    present = _cube.index[_cube['Schools'].to_numpy() > 0]
+    return tuple(present.droplevel('Performance_Category').unique())
+
+
+def _parts():
+    state = current()
+    return _scopes(state.version, state.cube)
+
+
+def exam_years():
+    """Exam years present in the dataset, oldest first."""
+    return sorted({int(year) for year, _ in _parts()})
+
+
+def _year(year):
+    return exam_years()[-1] if year is None else year
+
+
+def district_names(year=None):
+    """Districts with results in ``year``, alphabetically."""
+    year = _year(year)
+    return [district for y, district in _parts() if y == year]
+
+
+def _scope(year, districts):
+    year = _year(year)
+    return year, tuple(districts or district_names(year))
+
+
+def _criteria(criteria):
+    # Hashable, and the same key whatever order the filters were picked in
+    return tuple(sorted((criteria or {}).items()))
+
+
+@perf.counted('get_schools')
+@st.cache_resource(show_spinner=False, max_entries=16)
+def _schools(version, year, districts, _store):
+    perf.count('cache.get_schools.miss')
+    return freeze(_store.schools(year, list(districts)))
+
+
+def get_schools(year=None, districts=None):
+    """Schools with their derived metric columns for a year and district selection."""
+    state = current()
+    return _schools(state.version, *_scope(year, districts), state.store)
+
+
+@perf.counted('get_columns')
+@st.cache_resource(show_spinner=False, max_entries=32)
+def _columns(version, year, districts, columns, _store):
+    perf.count('cache.get_columns.miss')
+    return freeze(_store.schools(year, list(districts), columns=list(columns)))
+
+
+def get_columns(columns, year=None, districts=None):
+    """The selection's schools with only ``columns``; a database reads only those."""
+    state = current()
+    return _columns(state.version, *_scope(year, districts), tuple(columns), state.store)
+
+
+@perf.counted('school_names')
+@st.cache_resource(show_spinner=False, max_entries=8)
+def _names(version, year, _store):
+    perf.count('cache.school_names.miss')
+    return freeze(_store.names(year))
+
+
+def school_names(year=None):
+    """``CentreName``, ``DistrictName`` and row ``Key`` of every school in ``year``, in workbook order.
+
+    Only the names are read from a database.
+    """
+    state = current()
+    return _names(state.version, _year(year), state.store)
+
+
+def schools_at(positions, year=None):
+    """The schools at ``positions`` of ``school_names(year)`` (and of ``school_index(year)``)."""
+    keys = school_names(year)['Key'].to_numpy()[positions]
+    return freeze(current().store.rows(keys))
+
+
+@perf.counted('school_index')
+@st.cache_resource(show_spinner=False, max_entries=8)
+def _school_index(version, year):
+    perf.count('cache.school_index.miss')
+    with perf.span('search.index'):
+        names = school_names(year)
+        return SchoolIndex(names['CentreName'], groups=names['DistrictName'])
+
+
+def school_index(year=None):
+    """Centre-name index over ``school_names(year)``; see ``schools_at`` for the rows."""
+    return _school_index(current().version, _year(year))
+
+
+@perf.counted('ranked')
+@st.cache_resource(show_spinner=False, max_entries=64)
+def _ranked(version, year, districts, column, ascending, start, stop, criteria, _store):
+    perf.count('cache.ranked.miss')
+    return freeze(_store.schools(year, list(districts), criteria=dict(criteria), order=column,
+                                 ascending=ascending, limit=stop - start, offset=start))
+
+
+def preview(rows=10, year=None, districts=None):
+    """The first ``rows`` schools of the selection, in workbook order."""
+    state = current()
+    return _ranked(state.version, *_scope(year, districts), None, False, 0, rows, (), state.store)
+
+
+def ranked_schools(column, start, stop, criteria=None, year=None, districts=None):
+    """Ranks ``start`` to ``stop`` (0-based) of the selection by ``column``, best first.
+
+    ``criteria`` keeps only the schools matching every ``{column: value}``;
+    schools without a value rank last, ties in workbook order.
+    """
+    state = current()
+    return _ranked(state.version, *_scope(year, districts), column, False, start, stop,
+                   _criteria(criteria), state.store)
+
+
+def best_schools(column, n, year=None, districts=None):
+    """The ``n`` schools with the highest ``column``, best first (ties in workbook order)."""
+    state = current()
+    schools = _ranked(state.version, *_scope(year, districts), column, False, 0, n, (), state.store)
+    return schools[schools[column].notna()]
+
+
+def worst_schools(column, n, year=None, districts=None):
+    """The ``n`` schools with the lowest ``column``, worst first (ties in workbook order)."""
+    state = current()
+    schools = _ranked(state.version, *_scope(year, districts), column, True, 0, n, (), state.store)
+    return schools[schools[column].notna()]
+
+
+@perf.counted('school_count')
+@st.cache_data(show_spinner=False, max_entries=64)
+def _count(version, year, districts, criteria, _store):
+    perf.count('cache.school_count.miss')
+    return _store.count(year, list(districts), dict(criteria))
+
+
+def school_count(year=None, districts=None, criteria=None):
+    """How many schools of the selection match every ``{column: value}`` of ``criteria``."""
+    state = current()
+    return _count(state.version, *_scope(year, districts), _criteria(criteria), state.store)
+
+
+@perf.counted('filter_values')
+@st.cache_data(show_spinner=False, max_entries=64)
+def _distinct(version, year, districts, column, _store):
+    perf.count('cache.filter_values.miss')
+    return _store.distinct(column, year, list(districts))
+
+
+def filter_values(column, year=None, districts=None):
+    """Distinct values of a filterable column in the selection, in order of first appearance."""
+    state = current()
+    return _distinct(state.version, *_scope(year, districts), column, state.store)
+
+
+def percentiles(column, positions, year=None):
+    """Percentile ranks by ``column`` of the schools at ``positions`` (see ``schools_at``).
+
+    Returns two arrays: the rank among all of the year's schools and among
+    the school's own district, as ``uneb.ranking.RankOrder`` defines them.
+    """
+    store = current().store
+    year = _year(year)
+    names = school_names(year).take(positions)
+    overall, district = np.full(len(names), np.nan), np.full(len(names), np.nan)
+    for i, (key, name) in enumerate(zip(names['Key'], names['DistrictName'])):
+        below, present = store.at_most(column, key, year)
+        if below is None:
+            continue
+        overall[i] = 100 * below / present
+        below, present = store.at_most(column, key, year, [name])
+        district[i] = 100 * below / present
+    return overall, district
+
+
+@perf.counted('memory_report')
+@st.cache_data(show_spinner=False, max_entries=2)
+def _memory(version, _frame):
+    perf.count('cache.memory_report.miss')
+    return _memory_report(_frame)
+
+
+def memory_report():
+    """Per-column memory of the shared table against the default column types (see ``uneb.schema``)."""
+    state = current()
+    if state.frame is None:
+        return None
+    return _memory(state.version, state.frame)
+
+
+def get_cube():
+    """Year x district x performance-tier aggregates (see ``uneb.cube``)."""
+    return current().cube
+
+
+@perf.counted('histograms')
+@st.cache_data(show_spinner=False, max_entries=64)
+def _histograms(version, year, districts, column):
+    perf.count('cache.histograms.miss')
+    with perf.span('data.histograms', column=column):
+        schools = get_columns([column, 'DistrictName'], year, districts)
+        values = schools[column].to_numpy()
+        rows = schools.groupby('DistrictName', observed=True, sort=False).indices
+        return binning.histograms([values[rows.get(name, [])] for name in districts])
+
+
+def histograms(column, year=None, districts=None):
+    """Shared bin edges and per-district counts of ``column`` (see ``uneb.binning``)."""
+    year = _year(year)
+    return _histograms(current().version, year, tuple(districts or district_names(year)), column)
+
+
+@perf.counted('density')
+@st.cache_data(show_spinner=False, max_entries=64)
+def _density(version, year, districts, x, y):
+    perf.count('cache.density.miss')
+    with perf.span('data.density', x=x, y=y):
+        schools = get_columns([x, y], year, districts)
+        return binning.density(schools[x], schools[y])
+
+
+def density(x, y, year=None, districts=None):
+    """2-D counts of ``x`` against ``y`` over the selected schools (see ``uneb.binning``)."""
+    year = _year(year)
+    return _density(current().version, year, tuple(districts or district_names(year)), x, y)
+
+
+def correlation_matrix(year=None, districts=None):
+    """Pairwise correlations of the school metrics in ``uneb.correlation.COLUMNS``."""
+    year = _year(year)
+    return current().correlations.matrix(year, districts or district_names(year))
+
+
+def year_cube(year=None, districts=None):
+    """The cube rows of one exam year, restricted to ``districts``."""
+    year = _year(year)
+    cube = get_cube().xs(year, level='Year')
+    return cube.loc[list(districts or district_names(year))]
+
+
+def district_summary(year=None, districts=None):
+    """One row per district: totals, metric means, school size and absenteeism."""
+    return rollup(year_cube(year, districts), 'DistrictName')
+
+
+def overall_summary(year=None, districts=None):
+    """The same figures as ``district_summary`` across the whole selection."""
+    return rollup(year_cube(year, districts))
@@ -0,0 +1,420 @@
+"""Embedded SQL backend for archives too large to hold in memory.
+
+By default the dashboard keeps the whole school table in a pandas frame.
+For a national, multi-year archive the table can instead live in an
+embedded database file - SQLite from the standard library, or DuckDB
+(optional, for files ending in ``.duckdb``) - built from the workbooks
+with:
+
+    python -m uneb.database archive.db          # or archive.duckdb
+    UNEB_DATABASE=archive.db streamlit run app.py
+
+The build reads one workbook at a time and, when run again, only re-reads
+workbooks that changed. An update is a single transaction, and SQLite
+archives are kept in write-ahead-log mode, so an app reading the archive
+keeps serving the previous generation while it is rebuilt. DuckDB does not
+let one process write a file another has open: rebuild a copy and move it
+over the archive instead, and the app reopens it.
+
+In the app the work the pages need is pushed down into the database: the
+year x district x tier cube is one GROUP BY, and the correlation
+statistics are one more per (year, district). Previews, top and bottom
+lists and ranked pages are ORDER BY / LIMIT queries, counts and percentile
+ranks are COUNTs, and the search index reads only the names. Only those
+small results, and the few columns a chart plots, are ever brought into
+pandas, so memory follows the size of the results rather than of the
+archive. The app checks every few seconds (``UNEB_REFRESH_INTERVAL``)
+whether the archive was rebuilt and picks the new generation up.
+"""
+import argparse
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import namedtuple
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from uneb import perf
+from uneb.correlation import COLUMNS as CORRELATED, CorrelationStats, Moments
+from uneb.cube import DIMENSIONS, SUM_COLUMNS, cube_from_totals
+from uneb.metrics import METRICS, TIERS, add_metrics
+from uneb.schema import compact
+
+DATABASE_ENV = 'UNEB_DATABASE'
+
+log = logging.getLogger(__name__)
+
+# Rows sent to the database per INSERT batch
+BATCH = 10_000
+
+# A row's key is Source * SPAN + Position; sources hold far fewer rows than this
+SPAN = 2 ** 32
+
+# One generation of the archive, shaped like ``uneb.refresh.State`` for the
+# accessors in ``uneb.data``; ``frame`` is None as rows stay in the database
+State = namedtuple('State', 'version frame cube correlations store')
+
+_SCHEMA = [
+    'CREATE TABLE IF NOT EXISTS meta ("Key" VARCHAR PRIMARY KEY, "Value" BIGINT)',
+    'CREATE TABLE IF NOT EXISTS sources ("Source" BIGINT PRIMARY KEY, "Path" VARCHAR, "Ordinal" BIGINT, '
+    '"Mtime" BIGINT, "Size" BIGINT, "Rows" BIGINT)',
+    'CREATE TABLE IF NOT EXISTS columns ("Name" VARCHAR PRIMARY KEY, "Dtype" VARCHAR, "Ordinal" BIGINT)',
+]
+
+
+def _q(name):
+    # Quote every identifier: grade columns such as "As" are SQL keywords
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _sql_type(dtype):
+    if pd.api.types.is_integer_dtype(dtype) or pd.api.types.is_bool_dtype(dtype):
+        return 'BIGINT'
+    if pd.api.types.is_float_dtype(dtype):
+        return 'DOUBLE'
+    return 'VARCHAR'
+
+
+def _stamp(path):
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def connect(path, read_only=False):
+    """A connection to the archive at ``path``; DuckDB for ``.duckdb`` files, SQLite otherwise."""
+    if Path(path).suffix == '.duckdb':
+        try:
+            import duckdb
+        except ImportError:
+            raise RuntimeError(f"{path} needs the optional duckdb package (pip install duckdb)") from None
+        return duckdb.connect(str(path), read_only=read_only)
+    if read_only:
+        return sqlite3.connect(f'file:{Path(path).resolve()}?mode=ro', uri=True,
+                               check_same_thread=False, isolation_level=None)
+    con = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+    # Readers see the last committed generation instead of waiting on the writer's lock
+    con.execute('PRAGMA journal_mode=WAL')
+    return con
+
+
+def _identity(path):
+    stat = os.stat(path)
+    return stat.st_dev, stat.st_ino
+
+
+class Database:
+    """A school-results archive in an embedded database file."""
+
+    def __init__(self, path, read_only=True, interval=None):
+        from uneb.refresh import DEFAULT_INTERVAL, REFRESH_ENV
+
+        if interval is None:
+            interval = float(os.environ.get(REFRESH_ENV) or DEFAULT_INTERVAL)
+        self.path = path
+        self.interval = interval
+        self.read_only = read_only
+        self._con = connect(path, read_only)
+        self._file = _identity(path)
+        self._lock = threading.Lock()
+        self._refreshing = threading.Lock()
+        self._checked = time.monotonic()
+        if not read_only:
+            for statement in _SCHEMA:
+                self._con.execute(statement)
+        self.state = self._load() if read_only else None
+
+    def query(self, sql, params=()):
+        """``(column names, rows)`` of one query; calls are serialized across threads."""
+        with self._lock:
+            cursor = self._con.execute(sql, list(params))
+            names = [d[0] for d in cursor.description]
+            return names, cursor.fetchall()
+
+    def frame(self, sql, params=()):
+        names, rows = self.query(sql, params)
+        return pd.DataFrame.from_records(rows, columns=names)
+
+    def generation(self):
+        _, rows = self.query('SELECT "Value" FROM meta WHERE "Key" = ?', ['generation'])
+        return rows[0][0] if rows else 0
+
+    def columns(self):
+        """``(name, pandas dtype)`` of the school table's columns, in table order."""
+        return self.query('SELECT "Name", "Dtype" FROM columns ORDER BY "Ordinal"')[1]
+
+    # -- reading ---------------------------------------------------------------
+
+    def _where(self, year=None, districts=None, criteria=None):
+        where, params = [], []
+        if year is not None:
+            where.append('s."Year" = ?')
+            params.append(int(year))
+        if districts is not None:
+            where.append(f's."DistrictName" IN ({", ".join("?" * len(districts))})')
+            params.extend(districts)
+        for column, value in (criteria or {}).items():
+            where.append(f's.{_q(column)} = ?')
+            params.append(value)
+        return (f'WHERE {" AND ".join(where)} ' if where else ''), params
+
+    def _restore(self, df, columns):
+        # SQL hands back plain integers, floats and strings; give them the build's types
+        # again, then the in-memory table's (see uneb.schema)
+        for name, dtype in columns:
+            if dtype == 'category':
+                # The one categorical column is the tier add_metrics assigns
+                df[name] = pd.Categorical(df[name], categories=TIERS, ordered=True)
+            elif dtype.startswith('int') and df[name].notna().all():
+                df[name] = df[name].astype(dtype)
+            elif dtype.startswith('float'):
+                df[name] = df[name].astype(dtype)
+            elif dtype == 'str':
+                df[name] = df[name].astype('str')
+        return compact(df)
+
+    def schools(self, year=None, districts=None, columns=None, criteria=None,
+                order=None, ascending=False, limit=None, offset=0):
+        """School rows of ``districts`` in ``year`` (default: everything), in workbook order.
+
+        ``columns`` reads only those columns and ``criteria`` only the rows
+        matching every ``{column: value}``. With ``order`` the rows come
+        ranked by that column instead, best (highest, or lowest when
+        ``ascending``) first and missing values last, ties in workbook
+        order; ``limit`` and ``offset`` then read one window of the ranking.
+        """
+        columns = [(name, dtype) for name, dtype in self.columns() if columns is None or name in columns]
+        where, params = self._where(year, districts, criteria)
+        ranked = '' if order is None else f's.{_q(order)} IS NULL, s.{_q(order)} {"ASC" if ascending else "DESC"}, '
+        sql = (f'SELECT {", ".join("s." + _q(name) for name, _ in columns)} '
+               f'FROM schools AS s JOIN sources AS f ON s."Source" = f."Source" {where}'
+               f'ORDER BY {ranked}f."Ordinal", s."Position"')
+        if limit is not None:
+            sql += ' LIMIT ? OFFSET ?'
+            params += [int(limit), int(offset)]
+        with perf.span('database.schools', districts=len(districts or ())):
+            return self._restore(self.frame(sql, params), columns)
+
+    def names(self, year):
+        """Centre and district names of ``year``'s schools in workbook order, with each row's key."""
+        where, params = self._where(year)
+        return self.frame(f'SELECT s."CentreName", s."DistrictName", s."Source" * {SPAN} + s."Position" AS "Key" '
+                          f'FROM schools AS s JOIN sources AS f ON s."Source" = f."Source" {where}'
+                          'ORDER BY f."Ordinal", s."Position"', params)
+
+    def rows(self, keys):
+        """School rows by key (see ``names``), in the order of ``keys``."""
+        keys = [divmod(int(key), SPAN) for key in keys]
+        if not keys:
+            return self.schools(limit=0)
+        columns = self.columns()
+        match = ' OR '.join(['("Source" = ? AND "Position" = ?)'] * len(keys))
+        df = self.frame(f'SELECT "Source", "Position", {", ".join(_q(name) for name, _ in columns)} '
+                        f'FROM schools WHERE {match}', [v for key in keys for v in key])
+        df = df.set_index(['Source', 'Position']).loc[keys].reset_index(drop=True)
+        return self._restore(df, columns)
+
+    def count(self, year=None, districts=None, criteria=None):
+        """How many schools match; see ``schools``."""
+        where, params = self._where(year, districts, criteria)
+        return self.query(f'SELECT COUNT(*) FROM schools AS s {where}', params)[1][0][0]
+
+    def distinct(self, column, year=None, districts=None):
+        """Distinct non-null values of ``column``, in order of first appearance."""
+        where, params = self._where(year, districts)
+        where += ('AND ' if where else 'WHERE ') + f's.{_q(column)} IS NOT NULL '
+        # Orders by (Ordinal, Position), as sources hold fewer than SPAN rows
+        _, rows = self.query(f'SELECT s.{_q(column)} FROM schools AS s JOIN sources AS f ON s."Source" = f."Source" '
+                             f'{where}GROUP BY s.{_q(column)} '
+                             f'ORDER BY MIN(f."Ordinal" * {SPAN} + s."Position")', params)
+        return [value for value, in rows]
+
+    def at_most(self, column, key, year=None, districts=None):
+        """``(schools with column <= the school's at key, schools with a value)``, for percentile ranks.
+
+        The school's own stored value is the reference, so it always counts
+        itself; the first item is None when it has no value.
+        """
+        own = f'(SELECT {_q(column)} FROM schools WHERE "Source" = ? AND "Position" = ?)'
+        where, params = self._where(year, districts)
+        key = list(divmod(int(key), SPAN))
+        _, rows = self.query(f'SELECT {own} IS NULL, SUM(CASE WHEN s.{_q(column)} <= {own} THEN 1 ELSE 0 END), '
+                             f'COUNT(s.{_q(column)}) FROM schools AS s {where}', key + key + params)
+        missing, below, present = rows[0]
+        return None if missing else below or 0, present
+
+    def cube(self):
+        """The year x district x tier cube, aggregated in the database."""
+        sums = [f'SUM({_q(c)}) AS {_q(c)}' for c in SUM_COLUMNS]
+        sums.append('COUNT(*) AS "Schools"')
+        for metric in METRICS:
+            sums.append(f'SUM({_q(metric)}) AS {_q(metric + "_sum")}')
+            sums.append(f'COUNT({_q(metric)}) AS {_q(metric + "_n")}')
+        keys = ', '.join(map(_q, DIMENSIONS))
+        with perf.span('database.cube'):
+            totals = self.frame(f'SELECT {keys}, {", ".join(sums)} FROM schools GROUP BY {keys}')
+        return cube_from_totals(totals.astype({'DistrictName': 'str'}))
+
+    def correlations(self):
+        """Correlation statistics per (year, district), summed in the database."""
+        k = len(CORRELATED)
+        _, rows = self.query(f'SELECT {", ".join(f"AVG({_q(c)})" for c in CORRELATED)} FROM schools')
+        shift = np.nan_to_num(np.array(rows[0], dtype=float)) if rows else np.zeros(k)
+
+        x = [f'({_q(c)} - {float(shift[i])!r})' for i, c in enumerate(CORRELATED)]
+        sums = []
+        for i, ci in enumerate(CORRELATED):
+            for j, cj in enumerate(CORRELATED):
+                both = f'{_q(ci)} IS NOT NULL AND {_q(cj)} IS NOT NULL'
+                sums += [f'SUM(CASE WHEN {both} THEN 1 ELSE 0 END)',
+                         f'SUM(CASE WHEN {both} THEN {x[i]} ELSE 0 END)',
+                         f'SUM(CASE WHEN {both} THEN {x[i]} * {x[i]} ELSE 0 END)',
+                         f'SUM(CASE WHEN {both} THEN {x[i]} * {x[j]} ELSE 0 END)']
+        with perf.span('database.correlations'):
+            _, rows = self.query(f'SELECT "Year", "DistrictName", {", ".join(sums)} '
+                                 'FROM schools GROUP BY "Year", "DistrictName"')
+        groups = {}
+        for year, district, *values in rows:
+            n, s, ss, p = np.array(values, dtype=float).reshape(k, k, 4).transpose(2, 0, 1)
+            groups[(int(year), district)] = Moments(n, s, ss, p)
+        return CorrelationStats(dict(sorted(groups.items())), shift)
+
+    def _load(self):
+        with perf.span('database.load'):
+            return State(self.generation(), None, self.cube(), self.correlations(), self)
+
+    def _reopen(self):
+        # A rebuilt copy moved over the archive is a new file; the open connection still reads the old one
+        if _identity(self.path) == self._file:
+            return
+        con = connect(self.path, read_only=True)
+        with self._lock:
+            con, self._con = self._con, con
+            self._file = _identity(self.path)
+        con.close()
+
+    def refresh(self):
+        """Pick up a rebuilt archive, checking at most every ``interval`` seconds.
+
+        Returns True when the data changed. A failed check is logged and
+        retried later; the current generation keeps being served meanwhile.
+        """
+        if not self.interval or time.monotonic() - self._checked < self.interval:
+            return False
+        with self._refreshing:
+            if time.monotonic() - self._checked < self.interval:
+                return False
+            self._checked = time.monotonic()
+            state = self.state
+            try:
+                self._reopen()
+                if self.generation() == state.version:
+                    return False
+                self.state = self._load()
+            except Exception:
+                log.exception("Archive refresh failed; still serving generation %d", state.version)
+                return False
+        perf.count('data.refresh')
+        return True
+
+    # -- building --------------------------------------------------------------
+
+    def _ensure_columns(self, frame):
+        known = dict(self.columns())
+        if not known:
+            defs = ', '.join(f'{_q(c)} {_sql_type(t)}' for c, t in frame.dtypes.items())
+            self._con.execute(f'CREATE TABLE schools ("Source" BIGINT, "Position" BIGINT, {defs})')
+            self._con.execute('CREATE INDEX schools_scope ON schools ("Year", "DistrictName")')
+        elif missing := [c for c in frame.columns if c not in known]:
+            for column in missing:
+                self._con.execute(f'ALTER TABLE schools ADD COLUMN {_q(column)} {_sql_type(frame[column].dtype)}')
+        for column in frame.columns:
+            if column not in known:
+                self._con.execute('INSERT INTO columns VALUES (?, ?, ?)',
+                                  [column, str(frame[column].dtype), len(known)])
+                known[column] = str(frame[column].dtype)
+
+    def _insert(self, source, frame):
+        self._ensure_columns(frame)
+        names = ', '.join(['"Source"', '"Position"'] + [_q(c) for c in frame.columns])
+        marks = ', '.join('?' * (len(frame.columns) + 2))
+        # NaN is stored as NULL so SQL aggregates skip it as pandas does
+        values = [frame[c].astype(object).where(frame[c].notna(), None).tolist() for c in frame.columns]
+        rows = list(zip([source] * len(frame), range(len(frame)), *values))
+        for start in range(0, len(rows), BATCH):
+            self._con.executemany(f'INSERT INTO schools ({names}) VALUES ({marks})', rows[start:start + BATCH])
+
+    def update(self, sources):
+        """Bring the archive in line with ``sources``; returns how many workbooks were (re)loaded."""
+        from uneb.ingest import read_each
+        from uneb.refresh import prepare
+
+        _, rows = self.query('SELECT "Path", "Source", "Mtime", "Size" FROM sources')
+        known = {path: (source, (mtime, size)) for path, source, mtime, size in rows}
+        next_id = max((source for source, _ in known.values()), default=0) + 1
+        loaded = 0
+        paths = [str(Path(s).resolve()) for s in sources]
+        # One transaction, so readers see the whole new generation or none of it
+        self._con.execute('BEGIN')
+        try:
+            for ordinal, path in enumerate(paths):
+                source, stamp = known.get(path, (None, None))
+                if stamp == _stamp(path):
+                    self._con.execute('UPDATE sources SET "Ordinal" = ? WHERE "Source" = ?', [ordinal, source])
+                    continue
+                with perf.span('database.ingest', source=Path(path).name):
+                    raw = read_each([path])[0]
+                    frame = None if raw is None else add_metrics(prepare(raw))
+                    if source is None:
+                        source, next_id = next_id, next_id + 1
+                    elif self.columns():
+                        self._con.execute('DELETE FROM schools WHERE "Source" = ?', [source])
+                    self._con.execute('DELETE FROM sources WHERE "Source" = ?', [source])
+                    if frame is not None:
+                        self._insert(source, frame)
+                    self._con.execute('INSERT INTO sources VALUES (?, ?, ?, ?, ?, ?)',
+                                      [source, path, ordinal, *_stamp(path), 0 if frame is None else len(frame)])
+                loaded += 1
+            for path, (source, _) in known.items():
+                if path not in paths:
+                    self._con.execute('DELETE FROM schools WHERE "Source" = ?', [source])
+                    self._con.execute('DELETE FROM sources WHERE "Source" = ?', [source])
+                    loaded += 1
+            if loaded:
+                generation = self.generation() + 1
+                self._con.execute('DELETE FROM meta WHERE "Key" = ?', ['generation'])
+                self._con.execute('INSERT INTO meta VALUES (?, ?)', ['generation', generation])
+        except BaseException:
+            self._con.execute('ROLLBACK')
+            raise
+        self._con.execute('COMMIT')
+        return loaded
+
+    def close(self):
+        self._con.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or update a school-results archive database.")
+    parser.add_argument('database', type=Path, help='archive file (.db for SQLite, .duckdb for DuckDB)')
+    args = parser.parse_args(argv)
+
+    from uneb.ingest import source_files
+
+    start = time.perf_counter()
+    db = Database(args.database, read_only=False)
+    sources = source_files()
+    loaded = db.update(sources)
+    _, rows = db.query('SELECT COUNT(*) FROM schools') if db.columns() else (None, [(0,)])
+    print(f"{args.database}: {loaded} of {len(sources)} workbook(s) loaded, {rows[0][0]:,} schools, "
+          f"generation {db.generation()}, {time.perf_counter() - start:.1f}s")
+    db.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
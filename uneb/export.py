@@ -0,0 +1,301 @@
+"""Batch export of the analysis pages to static reports, one per district.
+
+Each report runs the analysis pages headlessly for one exam year and one
+district (or a named cohort of districts) and writes what they show - text,
+metrics, tables and the charts as embedded images - to a self-contained HTML
+file, and optionally a PDF:
+
+    python -m uneb.export                                 # every district, latest year
+    python -m uneb.export --years 2023 2024 --format html pdf
+    python -m uneb.export --districts MOYO ADJUMANI --national
+    python -m uneb.export --cohort "West Nile=ARUA,KOBOKO,YUMBE" --output reports/
+
+Reports are rendered by a pool of worker processes (``--workers``, default
+one per CPU). The dataset and its aggregates - the table, the cube and the
+correlation statistics - are loaded once, before the pool starts, and forked
+workers share them; where fork is unavailable each worker maps the data
+snapshot the parent has just written. Widgets keep their defaults, except
+that the ranking table shows up to 250 schools per report.
+
+PDF output needs the optional ``weasyprint`` package.
+"""
+import argparse
+import base64
+import html
+import importlib
+import os
+import re
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_all_start_methods, get_context
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Pages included in every report, in order
+PAGES = ['Overall_Performance', 'Grade_Distribution', 'Performance_Distribution',
+         'School_Ranking', 'Correlation_Analysis', 'Comprehensive_Insights']
+
+# Session state a page starts from in a report, where its defaults suit the screen
+PRESETS = {'School_Ranking': {'ranking_page_size': 250}}
+
+# Seconds one page may take to render
+PAGE_TIMEOUT = 600
+
+FORMATS = ['html', 'pdf']
+
+Report = namedtuple('Report', 'year name districts')
+
+STYLE = """
+body { font-family: sans-serif; max-width: 1100px; margin: 2em auto; color: #262730; }
+h1 { font-size: 1.8em; } h2 { font-size: 1.4em; } h3 { font-size: 1.15em; }
+section.page { page-break-before: always; }
+section.page:first-of-type { page-break-before: auto; }
+.row { display: flex; flex-wrap: wrap; gap: 1em; }
+.row > .column { flex: 1 1 0; min-width: 10em; }
+.metric .label { font-size: 0.85em; color: #555; }
+.metric .value { font-size: 1.6em; }
+.metric .delta { font-size: 0.85em; color: #09ab3b; }
+.alert { padding: 0.8em 1em; border-radius: 0.4em; margin: 0.8em 0; }
+.info { background: #e8f0fe; } .success { background: #e6f4ea; }
+.warning { background: #fff8e1; } .error { background: #fdecea; }
+.caption { font-size: 0.85em; color: #777; }
+img { max-width: 100%; }
+table { border-collapse: collapse; font-size: 0.85em; }
+th, td { border: 1px solid #ddd; padding: 0.25em 0.5em; }
+"""
+
+
+def slug(name):
+    return re.sub(r'[^A-Za-z0-9]+', '_', name).strip('_').lower() or 'report'
+
+
+def _inline(text):
+    text = html.escape(text)
+    text = re.sub(r'\*\*(.+?)\*\*', r'<strong>\1</strong>', text)
+    return re.sub(r'(?<![\w*])\*(?!\s)(.+?)\*', r'<em>\1</em>', text)
+
+
+def markdown(text):
+    """The small subset of Markdown the pages write: paragraphs, lists and emphasis."""
+    out = []
+    for block in re.split(r'\n\s*\n', text.strip()):
+        lines = [line.strip() for line in block.splitlines() if line.strip()]
+        if lines and all(re.match(r'\d+\.\s', line) for line in lines):
+            items = [re.sub(r'^\d+\.\s+', '', line) for line in lines]
+            out.append('<ol>' + ''.join(f'<li>{_inline(item)}</li>' for item in items) + '</ol>')
+        elif lines and all(re.match(r'[-*]\s', line) for line in lines):
+            out.append('<ul>' + ''.join(f'<li>{_inline(line[2:])}</li>' for line in lines) + '</ul>')
+        elif lines:
+            out.append(f'<p>{_inline(" ".join(lines))}</p>')
+    return ''.join(out)
+
+
+def to_html(node, charts):
+    """HTML for one node of a page's element tree; ``charts`` yields its images in order."""
+    kind = node.type
+    if kind in ('title', 'header', 'subheader'):
+        tag = {'title': 'h1', 'header': 'h2', 'subheader': 'h3'}[kind]
+        return f'<{tag}>{html.escape(node.value)}</{tag}>'
+    if kind == 'markdown':
+        return markdown(node.value)
+    if kind == 'caption':
+        return f'<p class="caption">{_inline(node.value)}</p>'
+    if kind in ('info', 'success', 'warning', 'error'):
+        return f'<div class="alert {kind}">{markdown(node.value)}</div>'
+    if kind == 'metric':
+        delta = f'<div class="delta">{html.escape(node.delta)}</div>' if node.delta else ''
+        return (f'<div class="metric"><div class="label">{html.escape(node.label)}</div>'
+                f'<div class="value">{html.escape(node.value)}</div>{delta}</div>')
+    if kind == 'image':
+        return ''.join(f'<img src="data:image/png;base64,{base64.b64encode(next(charts)).decode()}">'
+                       for _ in node.value)
+    if kind in ('dataframe', 'table'):
+        return node.value.to_html(index=False, na_rep='', float_format='{:,.1f}'.format, border=0)
+
+    children = ''.join(to_html(child, charts) for child in getattr(node, 'children', {}).values())
+    if kind == 'tab':
+        return f'<h2>{html.escape(node.label)}</h2>{children}'
+    if kind == 'column':
+        return f'<div class="column">{children}</div>'
+    if kind == 'flex_container' and node.proto.flex_container.direction == 1:
+        return f'<div class="row">{children}</div>'
+    # Widgets render nothing; other containers just their contents
+    return children
+
+
+def run_page(script, year, districts, presets=None):
+    """Run ``script`` (relative to the repo) headlessly for ``districts`` in ``year``.
+
+    Returns the finished ``AppTest`` and the ``(key, png)`` of every chart it showed.
+    """
+    from streamlit.testing.v1 import AppTest
+
+    from uneb.charts import recording
+
+    at = AppTest.from_file(str(ROOT / script), default_timeout=PAGE_TIMEOUT)
+    at.session_state['year'] = year
+    at.session_state['districts'] = list(districts)
+    for key, value in (presets or {}).items():
+        at.session_state[key] = value
+    with recording() as charts:
+        at.run()
+    if at.exception:
+        raise RuntimeError(f"{script} failed for {', '.join(districts)} ({year}): {at.exception[0].value}")
+    return at, charts
+
+
+def render_page(page, year, districts):
+    """Body HTML of ``page`` run headlessly for ``districts`` in ``year``."""
+    at, charts = run_page(f'pages/{page}.py', year, districts, PRESETS.get(page))
+    return to_html(at.main, (png for _, png in charts))
+
+
+def document(report, bodies):
+    title = f"{report.name} - UNEB {report.year} results"
+    sections = ''.join(f'<section class="page">{body}</section>' for body in bodies)
+    return (f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>{html.escape(title)}</title>'
+            f'<style>{STYLE}</style></head><body><p class="caption">{html.escape(title)}</p>'
+            f'{sections}</body></html>')
+
+
+def write_pdf(text, path):
+    from weasyprint import HTML
+
+    HTML(string=text, base_url=str(ROOT)).write_pdf(path)
+
+
+def export(report, output, formats):
+    """Render every page for ``report`` and write its files; returns their paths and the time taken."""
+    from uneb import perf
+
+    start = time.perf_counter()
+    with perf.span('export.report', report=report.name, year=report.year):
+        text = document(report, [render_page(page, report.year, report.districts) for page in PAGES])
+        folder = output / str(report.year)
+        folder.mkdir(parents=True, exist_ok=True)
+        paths = []
+        if 'html' in formats:
+            paths.append(folder / f'{slug(report.name)}.html')
+            paths[-1].write_text(text, encoding='utf-8')
+        if 'pdf' in formats:
+            paths.append(folder / f'{slug(report.name)}.pdf')
+            write_pdf(text, paths[-1])
+    return paths, time.perf_counter() - start
+
+
+def plan(years, districts=None, cohorts=(), national=False):
+    """The reports to produce: one per district per year, plus cohorts and national roll-ups."""
+    from uneb import data
+    from uneb.layout import district_label
+
+    reports = []
+    for year in years:
+        names = data.district_names(year)
+        for name in districts or names:
+            if name in names:
+                reports.append(Report(year, district_label(name), (name,)))
+        for cohort, members in cohorts:
+            members = tuple(m for m in members if m in names)
+            if members:
+                reports.append(Report(year, cohort, members))
+        if national:
+            reports.append(Report(year, 'All districts', tuple(names)))
+    return reports
+
+
+def write_index(output, done):
+    links = ''.join(
+        f'<li>{report.year} - {html.escape(report.name)}: '
+        + ', '.join(f'<a href="{p.relative_to(output).as_posix()}">{p.suffix[1:].upper()}</a>' for p in paths)
+        + '</li>'
+        for report, paths in sorted(done, key=lambda item: (item[0].year, item[0].name))
+    )
+    (output / 'index.html').write_text(
+        f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>UNEB reports</title>'
+        f'<style>{STYLE}</style></head><body><h1>UNEB reports</h1><ul>{links}</ul></body></html>',
+        encoding='utf-8')
+
+
+def headless():
+    """Set this process up to run pages outside a server, all on one generation of the data."""
+    from streamlit import config, logger
+
+    from uneb.refresh import REFRESH_ENV
+
+    # Keep Streamlit's bare-mode warnings out of the log
+    config.get_config_options()
+    config.set_option('logger.level', 'error')
+    logger.set_log_level('error')
+    os.environ[REFRESH_ENV] = '0'
+
+
+def worker_pool(workers):
+    """A process pool sharing the data this process has loaded (by forking, where possible)."""
+    method = 'fork' if 'fork' in get_all_start_methods() else 'spawn'
+    return ProcessPoolExecutor(max(1, workers), mp_context=get_context(method))
+
+
+def _cohort(text):
+    name, _, members = text.partition('=')
+    if not name or not members:
+        raise argparse.ArgumentTypeError(f"expected NAME=DISTRICT,DISTRICT,... not {text!r}")
+    return name.strip(), tuple(m.strip().upper() for m in members.split(',') if m.strip())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--output', type=Path, default=Path('reports'), help='folder for the reports (default: reports)')
+    parser.add_argument('--format', nargs='+', choices=FORMATS, default=['html'], dest='formats')
+    parser.add_argument('--years', nargs='+', type=int, help='exam years (default: the latest)')
+    parser.add_argument('--districts', nargs='+', type=str.upper, help='only these districts (default: all)')
+    parser.add_argument('--cohort', action='append', type=_cohort, default=[], metavar='NAME=D1,D2',
+                        help='also report on a group of districts together (repeatable)')
+    parser.add_argument('--national', action='store_true', help='also report on all districts together')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args(argv)
+
+    if 'pdf' in args.formats:
+        try:
+            importlib.import_module('weasyprint')
+        except ImportError:
+            parser.error("PDF output needs the optional weasyprint package (pip install weasyprint)")
+
+    headless()
+    from uneb import data
+
+    start = time.perf_counter()
+    data.current()
+    years = args.years or data.exam_years()[-1:]
+    reports = plan(years, args.districts, args.cohort, args.national)
+    if not reports:
+        parser.error("no district matches the requested years and districts")
+    print(f"Exporting {len(reports)} report(s) of {len(PAGES)} pages with {args.workers} worker(s)")
+
+    args.output.mkdir(parents=True, exist_ok=True)
+    done, failed = [], 0
+    with worker_pool(args.workers) as pool:
+        futures = {pool.submit(export, report, args.output, args.formats): report for report in reports}
+        for future in as_completed(futures):
+            report = futures[future]
+            try:
+                paths, took = future.result()
+            except Exception as exc:
+                failed += 1
+                print(f"  FAILED {report.year} {report.name}: {exc}", file=sys.stderr)
+                continue
+            done.append((report, paths))
+            print(f"  {report.year} {report.name:30s} {took:6.1f}s  {', '.join(map(str, paths))}")
+
+    write_index(args.output, done)
+    print(f"{len(done)} report(s) in {time.perf_counter() - start:.1f}s; index at {args.output / 'index.html'}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    # Run the importable copy: the pages replace __main__ while they run in a
+    # worker, so tasks must not be pickled as references to this script
+    import uneb.export
+    sys.exit(uneb.export.main())
@@ -0,0 +1,56 @@
+"""Per-value row-position index for the categorical filter widgets.
+
+Built once per dataset version and selection, the index maps every value of
+a few categorical columns to the sorted row positions holding it. A
+combination of filters is resolved by intersecting those arrays, smallest
+first, with binary searches. The cost therefore follows the size of the
+matching sets rather than the size of the table, and an extra filter widget
+costs one more intersection instead of another scan of every row.
+"""
+import numpy as np
+import pandas as pd
+
+# Columns pages can filter schools on
+COLUMNS = ['DistrictName', 'Performance_Category']
+
+_EMPTY = np.array([], dtype=np.intp)
+
+
+def _intersect(smaller, larger):
+    # Both sorted and unique: look each of the smaller set up in the larger
+    at = np.searchsorted(larger, smaller)
+    found = at < len(larger)
+    found[found] = larger[at[found]] == smaller[found]
+    return smaller[found]
+
+
+class FilterIndex:
+    """Sorted row positions of each value of ``columns`` in ``frame``."""
+
+    def __init__(self, frame, columns=COLUMNS):
+        self.rows = len(frame)
+        self._values = {}
+        self._positions = {}
+        for column in columns:
+            values = frame[column]
+            self._values[column] = [v for v in values.unique() if not pd.isna(v)]
+            self._positions[column] = values.groupby(values, observed=True, sort=False).indices
+
+    def values(self, column):
+        """Distinct non-null values of ``column``, in order of first appearance."""
+        return self._values[column]
+
+    def positions(self, column, value):
+        return self._positions[column].get(value, _EMPTY)
+
+    def select(self, criteria):
+        """Sorted positions of the rows matching every ``{column: value}``; None if unfiltered."""
+        if not criteria:
+            return None
+        matches = sorted((self.positions(c, v) for c, v in criteria.items()), key=len)
+        result = matches[0]
+        for other in matches[1:]:
+            if not len(result):
+                break
+            result = _intersect(result, other)
+        return result
@@ -0,0 +1,87 @@
+"""Read-only frames for data shared between reruns and sessions.
+
+A ``FrozenFrame`` behaves like a normal DataFrame for every read, but any
+attempt to change it in place - assigning or deleting a column, writing
+through ``loc``/``iloc``/``at``/``iat``, or an ``inplace=True`` method -
+raises ``ReadOnlyError``. Anything derived from it (selections, groupbys,
+arithmetic) is an ordinary, writable DataFrame, so pages that need extra
+columns can still build them on their own copy.
+"""
+import pandas as pd
+
+
+class ReadOnlyError(TypeError):
+    """Raised when code tries to modify the shared dataset in place."""
+
+
+def _refuse(what):
+    raise ReadOnlyError(
+        f"{what} would modify the shared school dataset; register derived columns "
+        "in uneb.metrics.add_metrics or work on a copy (df.copy())"
+    )
+
+
+class _ReadOnlyIndexer:
+    def __init__(self, indexer, name):
+        self._indexer = indexer
+        self._name = name
+
+    def __getitem__(self, key):
+        return self._indexer[key]
+
+    def __setitem__(self, key, value):
+        _refuse(f"Writing through .{self._name}[]")
+
+    def __getattr__(self, name):
+        return getattr(self._indexer, name)
+
+
+class FrozenFrame(pd.DataFrame):
+
+    @property
+    def _constructor(self):
+        return pd.DataFrame
+
+    def __setitem__(self, key, value):
+        _refuse(f"Assigning column {key!r}")
+
+    def __delitem__(self, key):
+        _refuse(f"Deleting column {key!r}")
+
+    def __setattr__(self, name, value):
+        if name in ('columns', 'index') or (not name.startswith('_') and name in self.columns):
+            _refuse(f"Setting .{name}")
+        super().__setattr__(name, value)
+
+    def insert(self, *args, **kwargs):
+        _refuse("insert()")
+
+    def pop(self, item):
+        _refuse(f"pop({item!r})")
+
+    def _update_inplace(self, result, verify_is_copy=True):
+        # Shared exit point of every inplace=True method
+        _refuse("An inplace=True operation")
+
+    @property
+    def loc(self):
+        return _ReadOnlyIndexer(super().loc, 'loc')
+
+    @property
+    def iloc(self):
+        return _ReadOnlyIndexer(super().iloc, 'iloc')
+
+    @property
+    def at(self):
+        return _ReadOnlyIndexer(super().at, 'at')
+
+    @property
+    def iat(self):
+        return _ReadOnlyIndexer(super().iat, 'iat')
+
+
+def freeze(df):
+    """Read-only view of ``df`` (no data is copied)."""
+    if isinstance(df, FrozenFrame):
+        return df
+    return FrozenFrame(df)
@@ -0,0 +1,181 @@
+"""Streaming ingestion of UNEB result workbooks.
+
+Workbooks are read through openpyxl's read-only mode one row at a time and
+accumulated straight into per-column lists, so a sheet is never materialized
+as both a cell grid and a frame. Any number of workbooks (one per district,
+region or exam year) can be combined; every sheet whose header has a
+``DistrictName`` column is treated as school results.
+
+Parsing is CPU-bound, so when there are several sheets and a few megabytes
+to read they are fanned out across a process pool, one task per workbook
+(or per sheet when there are fewer workbooks than workers). Workers send
+back finished columnar frames and the parent concatenates them in source
+order, so the result is identical to reading serially.
+"""
+import glob
+import os
+import re
+import sys
+import types
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from multiprocessing import get_context
+from pathlib import Path
+from xml.etree import ElementTree
+
+import pandas as pd
+from openpyxl import load_workbook
+
+from uneb import perf
+
+DEFAULT_SOURCE = Path(__file__).resolve().parent.parent / 'moyo_adjumani_schools.xlsx'
+
+# os.pathsep-separated list of workbooks, directories or glob patterns
+SOURCES_ENV = 'UNEB_WORKBOOKS'
+
+# Exam year for sheets that carry neither a Year column nor a year in the file name
+DEFAULT_YEAR = 2024
+
+_YEAR_PATTERN = re.compile(r'(?<!\d)(19|20)\d{2}(?!\d)')
+
+# Number of parsing processes (default: one per CPU); 1 reads serially in-process
+WORKERS_ENV = 'UNEB_INGEST_WORKERS'
+
+# Starting a worker costs about as much as parsing a megabyte of workbook, so
+# smaller intakes are always read serially
+PARALLEL_MIN_BYTES = 4 << 20
+
+_SHEET_TAG = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}sheet'
+
+
+def source_files():
+    """Workbooks to load, from ``$UNEB_WORKBOOKS`` or the bundled 2024 file."""
+    spec = os.environ.get(SOURCES_ENV)
+    if not spec:
+        return [DEFAULT_SOURCE]
+    paths = set()
+    for entry in filter(None, spec.split(os.pathsep)):
+        if os.path.isdir(entry):
+            entry = os.path.join(entry, '*.xlsx')
+        matches = glob.glob(entry)
+        if not matches:
+            raise FileNotFoundError(f"No workbooks match {entry!r} (from ${SOURCES_ENV})")
+        paths.update(Path(m).resolve() for m in matches)
+    return sorted(paths)
+
+
+def year_of(path):
+    """Exam year encoded in a workbook's file name, else ``DEFAULT_YEAR``."""
+    match = _YEAR_PATTERN.search(Path(path).stem)
+    return int(match.group(0)) if match else DEFAULT_YEAR
+
+
+def read_sheet(rows):
+    """Columnar frame from an iterator of row tuples whose first row is the header."""
+    header = next(rows, None)
+    if header is None:
+        return None
+    names = [str(h).strip() if h is not None else '' for h in header]
+    if 'DistrictName' not in names:
+        return None
+    keep = [i for i, name in enumerate(names) if name]
+    columns = {names[i]: [] for i in keep}
+    targets = [columns[names[i]] for i in keep]
+    for row in rows:
+        if row is None or all(v is None for v in row):
+            continue
+        for i, target in zip(keep, targets):
+            target.append(row[i] if i < len(row) else None)
+    return pd.DataFrame(columns)
+
+
+def _read_worksheet(ws, path):
+    df = read_sheet(ws.iter_rows(values_only=True))
+    if df is None or df.empty:
+        return None
+    if 'Year' not in df.columns:
+        df['Year'] = year_of(path)
+    return df
+
+
+def read_workbook(path):
+    """All result sheets of one workbook, tagged with their exam year."""
+    with perf.span('ingest.workbook', path=Path(path).name):
+        wb = load_workbook(path, read_only=True, data_only=True)
+        try:
+            frames = [_read_worksheet(ws, path) for ws in wb.worksheets]
+        finally:
+            wb.close()
+        return [df for df in frames if df is not None]
+
+
+def sheet_names(path):
+    """Sheet names of a workbook, read from its manifest without parsing any cells."""
+    with zipfile.ZipFile(path) as zf:
+        root = ElementTree.fromstring(zf.read('xl/workbook.xml'))
+    return [sheet.get('name') for sheet in root.iter(_SHEET_TAG)]
+
+
+def read_task(task):
+    """Result frames of one ``(path, sheet name or None for all)`` task; runs in pool workers."""
+    path, name = task
+    if name is None:
+        return read_workbook(path)
+    with perf.span('ingest.sheet', path=Path(path).name, sheet=name):
+        wb = load_workbook(path, read_only=True, data_only=True)
+        try:
+            ws = wb[name]
+            # Chartsheets are listed alongside worksheets but hold no cells
+            df = _read_worksheet(ws, path) if hasattr(ws, 'iter_rows') else None
+        finally:
+            wb.close()
+        return [] if df is None else [df]
+
+
+def ingest_workers(paths, tasks):
+    """How many processes to parse ``tasks`` sheets of ``paths`` with."""
+    configured = os.environ.get(WORKERS_ENV)
+    if not configured and sum(os.path.getsize(p) for p in paths) < PARALLEL_MIN_BYTES:
+        return 1
+    workers = int(configured or 0) or os.cpu_count() or 1
+    return max(1, min(workers, tasks))
+
+
+@contextmanager
+def _bare_main():
+    # Streamlit runs every page as __main__, and spawned workers would re-run
+    # that script while starting up; they only need this module
+    main = sys.modules['__main__']
+    sys.modules['__main__'] = types.ModuleType('__main__')
+    try:
+        yield
+    finally:
+        sys.modules['__main__'] = main
+
+
+def read_each(paths):
+    """One raw frame per source workbook, in order (None if it has no result sheets)."""
+    sheets = [(path, name) for path in paths for name in sheet_names(path)]
+    workers = ingest_workers(paths, len(sheets))
+    if workers > 1:
+        # Every task re-reads its workbook's shared strings, so only split
+        # workbooks into sheets when there are too few to go round
+        tasks = sheets if len(paths) < workers else [(path, None) for path in paths]
+        chunks = {path: [] for path in paths}
+        # spawn rather than fork: the Streamlit server process is multi-threaded
+        with perf.span('ingest.parallel', workers=workers, tasks=len(tasks)), _bare_main():
+            with ProcessPoolExecutor(workers, mp_context=get_context('spawn')) as pool:
+                for (path, _), frames in zip(tasks, pool.map(read_task, tasks)):
+                    chunks[path].extend(frames)
+    else:
+        chunks = {path: read_workbook(path) for path in paths}
+    return [pd.concat(frames, ignore_index=True) if frames else None for frames in chunks.values()]
+
+
+def read_sources(paths):
+    """Concatenate every result sheet of ``paths`` into one raw frame."""
+    frames = [df for df in read_each(paths) if df is not None]
+    if not frames:
+        raise ValueError(f"No result sheets with a DistrictName column in {list(map(str, paths))}")
+    return pd.concat(frames, ignore_index=True)
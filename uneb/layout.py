@@ -0,0 +1,127 @@
+"""Page chrome shared by the landing page and the analysis pages."""
+import os
+
+import pandas as pd
+import streamlit as st
+
+from uneb import data, perf
+
+PAGE_CONFIG = dict(
+    page_title="Moyo & Adjumani Schools UNEB 2024 Analysis",
+    page_icon="🏫",
+    layout="wide",
+    initial_sidebar_state="expanded",
+)
+
+
+# Set to 1 (or open any page with ?diagnostics=1) to show the diagnostics panel
+DIAGNOSTICS_ENV = 'UNEB_DIAGNOSTICS'
+
+
+def configure_page():
+    """Apply the dashboard-wide page configuration; call first in every script."""
+    st.set_page_config(**PAGE_CONFIG)
+    # The spans of this run are shown by the panel on the next one
+    previous = st.session_state.get('perf_spans', [])
+    st.session_state['perf_spans'] = perf.start_run()
+    if diagnostics_enabled():
+        diagnostics_panel(previous)
+
+
+def diagnostics_enabled():
+    """Whether this session asked for the diagnostics panel."""
+    flag = st.query_params.get('diagnostics')
+    if flag is not None:
+        st.session_state['diagnostics'] = flag not in ('0', 'false', 'off')
+    return st.session_state.get('diagnostics', os.environ.get(DIAGNOSTICS_ENV) == '1')
+
+
+def diagnostics_panel(spans):
+    """Sidebar timings of the previous script run plus process-wide cache counters."""
+    with st.sidebar.expander("⏱️ Diagnostics"):
+        st.caption("Previous script run (nested spans overlap)")
+        if spans:
+            st.dataframe(pd.DataFrame({
+                'Span': [name for name, _, _ in spans],
+                'ms': [elapsed * 1000 for _, elapsed, _ in spans],
+                'Detail': [' '.join(f'{k}={v}' for k, v in attrs.items()) for _, _, attrs in spans],
+            }), column_config={'ms': st.column_config.NumberColumn(format="%.1f")}, hide_index=True)
+
+        totals = perf.span_totals()
+        st.caption("Process totals")
+        st.dataframe(pd.DataFrame({
+            'Span': list(totals),
+            'Calls': [calls for calls, _, _ in totals.values()],
+            'Total ms': [total * 1000 for _, total, _ in totals.values()],
+            'Max ms': [worst * 1000 for _, _, worst in totals.values()],
+        }), column_config={'Total ms': st.column_config.NumberColumn(format="%.1f"),
+                           'Max ms': st.column_config.NumberColumn(format="%.1f")}, hide_index=True)
+
+        caches = perf.cache_counts()
+        st.caption("Streamlit caches (hits are calls that did not run the function)")
+        st.dataframe(pd.DataFrame({
+            'Cache': list(caches),
+            'Calls': [calls for calls, _, _ in caches.values()],
+            'Hits': [hits for _, hits, _ in caches.values()],
+            'Misses': [misses for _, _, misses in caches.values()],
+        }), hide_index=True)
+
+        counters = perf.counters()
+        st.caption("Counters")
+        st.dataframe(pd.DataFrame({'Counter': list(counters), 'Count': list(counters.values())}),
+                     hide_index=True)
+
+        memory = data.memory_report()
+        if memory is not None:
+            st.caption("Shared table memory, against default column types")
+            st.dataframe(memory.assign(**{'KB': memory['Bytes'] / 1024,
+                                          'Default KB': memory['Default bytes'] / 1024})
+                         [['Column', 'Type', 'KB', 'Default KB']],
+                         column_config={'KB': st.column_config.NumberColumn(format="%.1f"),
+                                        'Default KB': st.column_config.NumberColumn(format="%.1f")},
+                         hide_index=True)
+
+
+# The two Madi sub-region districts keep their original colours; any others
+# loaded from national workbooks cycle through the rest
+DISTRICT_COLORS = {'MOYO': 'skyblue', 'ADJUMANI': 'lightcoral'}
+EXTRA_COLORS = ['mediumseagreen', 'orange', 'mediumpurple', 'goldenrod', 'lightpink',
+                'cadetblue', 'peru', 'olivedrab', 'slategray', 'orchid']
+
+
+def district_colors(names):
+    """One colour per district name, stable for the Madi districts."""
+    extra = iter(EXTRA_COLORS * (len(names) // len(EXTRA_COLORS) + 1))
+    return [DISTRICT_COLORS.get(name) or next(extra) for name in names]
+
+
+def district_label(name):
+    return name.title()
+
+
+def _keep(key):
+    # Copy a widget's value to a plain session key so it survives page switches
+    st.session_state[key] = st.session_state[f'_{key}']
+
+
+def select_scope():
+    """Sidebar exam-year and district pickers shared by every page.
+
+    Returns ``(year, districts)``; the selection is kept in session state so it
+    carries over when the user moves between pages.
+    """
+    years = data.exam_years()
+    if 'year' not in st.session_state or st.session_state['year'] not in years:
+        st.session_state['year'] = years[-1]
+    if len(years) > 1:
+        st.session_state['_year'] = st.session_state['year']
+        st.sidebar.selectbox("Exam year", years, key='_year', on_change=_keep, args=('year',))
+    year = st.session_state['year']
+
+    options = data.district_names(year)
+    chosen = [d for d in st.session_state.get('districts', options) if d in options]
+    st.session_state['districts'] = st.session_state['_districts'] = chosen
+    st.sidebar.multiselect("Districts", options, key='_districts', on_change=_keep, args=('districts',),
+                           placeholder="All districts")
+    # An empty selection means every district
+    return year, tuple(st.session_state['districts'] or options)
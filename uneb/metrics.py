@@ -0,0 +1,72 @@
+"""Derived school performance metrics, computed in one vectorized pass.
+
+Everything here runs once when the dataset is built (and is stored in the
+snapshot), so pages only ever read the resulting columns. This is the one
+place derived columns are registered: the shared dataset is read-only, so a
+page that needs a new column should add it here rather than assign it.
+"""
+import numpy as np
+import pandas as pd
+
+GRADES = ['As', 'Bs', 'Cs', 'Ds', 'Es']
+
+# Derived performance metrics and their chart labels
+METRICS = {
+    'Pass_Rate': 'Pass Rate (A-C)',
+    'Excellent_Performance': 'Excellent Performance (A-B)',
+    'Failure_Rate': 'Failure Rate (D-E)',
+}
+
+# Pass-rate tiers, lowest first; each edge is the inclusive lower bound of the next tier
+TIER_EDGES = [40, 60, 80]
+TIERS = ['Poor (<40%)', 'Fair (40-59%)', 'Good (60-79%)', 'Excellent (80-100%)']
+
+
+def clean(df):
+    """Strip whitespace from column names and string cells."""
+    df = df.rename(columns=str.strip)
+    for col in df.select_dtypes(include=['object', 'string']).columns:
+        df[col] = df[col].str.strip()
+    return df
+
+
+def _rate(numerator, denominator, missing):
+    # Schools where nobody sat the exam get NaN instead of inf/0-division noise,
+    # and so do rates over a blank count
+    return np.divide(numerator * 100.0, denominator,
+                     out=np.full(len(numerator), np.nan), where=(denominator > 0) & ~missing)
+
+
+def _unless(values, missing):
+    # Keep integer counts integer unless some of them are undefined
+    return np.where(missing, np.nan, values) if missing.any() else values
+
+
+def add_metrics(df):
+    """Return ``df`` with every derived column appended.
+
+    A blank grade or absence cell counts as zero towards Total_Students, and
+    makes every sum and rate that uses it NaN, as pandas arithmetic on the
+    raw columns would.
+    """
+    values = df[GRADES + ['Absent']].to_numpy(dtype=np.float64)
+    blank = np.isnan(values)
+    a, b, c, d, e, absent = np.where(blank, 0, values).astype(np.int64).T
+    na, nb, nc, nd, ne, nabsent = blank.T
+
+    excellent = a + b
+    passed = excellent + c
+    failed = d + e
+    sat = passed + failed
+
+    df = df.assign(
+        Total_Students=sat + absent,
+        Excellent_Grades=_unless(excellent, na | nb),
+        Pass_Rate=_rate(passed, sat, na | nb | nc | nabsent),
+        Excellent_Performance=_rate(excellent, sat, na | nb | nabsent),
+        Failure_Rate=_rate(failed, sat, nd | ne | nabsent),
+    )
+    df['Performance_Category'] = pd.cut(
+        df['Pass_Rate'], bins=[-np.inf, *TIER_EDGES, np.inf], labels=TIERS, right=False
+    )
+    return df
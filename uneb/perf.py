@@ -0,0 +1,131 @@
+"""Hot-path instrumentation: named timing spans and cache counters.
+
+The data layer and chart cache wrap their expensive stages in ``span``
+blocks and bump ``count`` counters on cache hits, misses and evictions.
+Both are cheap enough to stay on permanently:
+
+* process-wide totals (calls, total and worst time per span, counter
+  values) are kept in memory for the sidebar diagnostics panel;
+* the spans of the current script run are collected per thread, so the
+  panel can show where the previous rerun of a page spent its time;
+* when ``UNEB_PERF_LOG`` is set, every span and counter update is also
+  written as one JSON object per line to that file (``-`` for stderr).
+
+Streamlit's own caches do not report hits, so the functions they wrap count
+a ``cache.<name>.miss`` each time their body actually runs, and ``counted``
+counts a ``cache.<name>.call`` on every call; hits are the difference (see
+``cache_counts``). Streamlit does not report its evictions either.
+
+This module has no Streamlit dependency; the panel lives in ``uneb.layout``.
+"""
+import functools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+LOG_ENV = 'UNEB_PERF_LOG'
+
+log = logging.getLogger('uneb.perf')
+
+_lock = threading.Lock()
+_totals = {}  # span name -> [calls, total seconds, max seconds]
+_counters = Counter()
+_local = threading.local()
+
+
+def _configure_log():
+    target = os.environ.get(LOG_ENV)
+    if not target or log.handlers:
+        return
+    handler = logging.StreamHandler(sys.stderr) if target == '-' else logging.FileHandler(target)
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    log.addHandler(handler)
+    log.setLevel(logging.INFO)
+    log.propagate = False
+
+
+_configure_log()
+
+
+def _emit(record):
+    if log.isEnabledFor(logging.INFO):
+        log.info(json.dumps({'ts': round(time.time(), 3), 'pid': os.getpid(), **record}, default=str))
+
+
+@contextmanager
+def span(name, **attrs):
+    """Time the enclosed block under ``name``; ``attrs`` go to the run list and log."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        with _lock:
+            entry = _totals.setdefault(name, [0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += elapsed
+            entry[2] = max(entry[2], elapsed)
+        spans = getattr(_local, 'spans', None)
+        if spans is not None:
+            spans.append((name, elapsed, attrs))
+        _emit({'event': 'span', 'name': name, 'ms': round(elapsed * 1000, 3), **attrs})
+
+
+def count(name, n=1):
+    """Add ``n`` to the counter ``name``."""
+    with _lock:
+        _counters[name] += n
+        value = _counters[name]
+    _emit({'event': 'count', 'name': name, 'value': value})
+
+
+def counted(name):
+    """Decorator counting every call of a Streamlit-cached function as ``cache.<name>.call``."""
+    def decorate(cached):
+        @functools.wraps(cached)
+        def call(*args, **kwargs):
+            count(f'cache.{name}.call')
+            return cached(*args, **kwargs)
+        return call
+    return decorate
+
+
+def start_run():
+    """Start collecting the spans recorded on this thread; returns the (live) list."""
+    _local.spans = []
+    return _local.spans
+
+
+def span_totals():
+    """``{name: (calls, total_s, max_s)}`` across the whole process."""
+    with _lock:
+        return {name: tuple(entry) for name, entry in _totals.items()}
+
+
+def counters():
+    with _lock:
+        return dict(_counters)
+
+
+def cache_counts():
+    """``{name: (calls, hits, misses)}`` of the caches whose calls are ``counted``."""
+    values = counters()
+    stats = {}
+    for key, calls in values.items():
+        if key.startswith('cache.') and key.endswith('.call'):
+            name = key[len('cache.'):-len('.call')]
+            misses = values.get(f'cache.{name}.miss', 0)
+            stats[name] = (calls, calls - misses, misses)
+    return stats
+
+
+def reset():
+    """Forget all totals and counters."""
+    with _lock:
+        _totals.clear()
+        _counters.clear()
@@ -0,0 +1,87 @@
+"""Presorted rank orders, so ranked tables can be served a page at a time.
+
+Schools are sorted once per dataset version and selection, and each row's
+rank is kept alongside. After that a filtered ranking is the filter's rows
+(see ``uneb.filters``) reordered by their rank, without copying the frame or
+sorting the whole table. A page is a slice of that ranking. Only the rows of
+the visible page are ever taken out of the frame and sent to the browser.
+
+The same orders answer top-N and bottom-N lists and percentile ranks, for
+the whole frame and for each district in it, as slices and lookups.
+"""
+import numpy as np
+
+
+class RankOrder:
+    """Row positions of a frame ordered by one column, best first.
+
+    With ``groups`` (one label per row, such as the district) each group is
+    also ranked on its own. ``percentile`` and ``group_percentile`` hold each
+    row's percentile rank: the share of ranked rows it does at least as well
+    as, so the best row is at 100. Rows without a value rank last and have
+    no percentile.
+    """
+
+    def __init__(self, values, ascending=False, groups=None):
+        values = np.asarray(values, dtype=float)
+        key = values if ascending else -values
+        self.missing = np.isnan(values)
+        # Stable, so ties keep frame order; NaN sorts last either way
+        self.order = np.argsort(key, kind='stable')
+        self.rank = np.empty_like(self.order)
+        self.rank[self.order] = np.arange(len(self.order))
+        # Worst first, ties still in frame order, as nsmallest lists them
+        self.reverse = np.argsort(-key, kind='stable')
+        self.percentile = _percentile(key)
+        self.group_percentile = None
+        self._groups = {}
+        if groups is not None:
+            self._rank_groups(key, np.asarray(groups))
+
+    def _rank_groups(self, key, groups):
+        names, codes = np.unique(groups, return_inverse=True)
+        self.group_percentile = np.full(len(key), np.nan)
+        best = self.order[np.argsort(codes[self.order], kind='stable')]
+        worst = self.reverse[np.argsort(codes[self.reverse], kind='stable')]
+        bounds = np.searchsorted(codes[best], np.arange(len(names) + 1))
+        for i, name in enumerate(names):
+            rows = best[bounds[i]:bounds[i + 1]]
+            self._groups[name] = rows, worst[bounds[i]:bounds[i + 1]]
+            self.group_percentile[rows] = _percentile(key[rows])
+
+    def __len__(self):
+        return len(self.order)
+
+    def select(self, positions=None):
+        """``positions`` (default: every row) in rank order."""
+        if positions is None:
+            return self.order
+        return positions[np.argsort(self.rank[positions], kind='stable')]
+
+    def top(self, n, group=None):
+        """Positions of the ``n`` best rows with a value, overall or in ``group``."""
+        order = self.order if group is None else self._groups[group][0]
+        return self._present(order[:n])
+
+    def bottom(self, n, group=None):
+        """Positions of the ``n`` worst rows with a value, worst first."""
+        order = self.reverse if group is None else self._groups[group][1]
+        return self._present(order[:n])
+
+    def _present(self, positions):
+        # Missing values sort last in both orders, so only the tail can hold them
+        return positions[~self.missing[positions]]
+
+
+def _percentile(key):
+    present = ~np.isnan(key)
+    ranked = np.sort(key[present])
+    percentile = np.full(len(key), np.nan)
+    if len(ranked):
+        better = np.searchsorted(ranked, key[present], side='left')
+        percentile[present] = 100 * (len(ranked) - better) / len(ranked)
+    return percentile
+
+
+def page_count(total, size):
+    return max(1, -(-total // size))
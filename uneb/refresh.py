@@ -0,0 +1,198 @@
+"""The live dataset: built once, then patched as source workbooks change.
+
+``LiveDataset`` holds the full table (read through a ``uneb.store.MemoryStore``),
+its aggregate cube and its correlation statistics. Every
+``interval`` seconds (``$UNEB_REFRESH_INTERVAL``, default 5; 0 turns watching
+off) a call to ``refresh`` stats the source workbooks. Only workbooks whose
+mtime or size changed (or that were added or removed) are parsed again.
+Their rows are matched to the previous rows by centre, and derived metrics
+are recomputed only for centres whose grade counts changed. The cube and the
+correlation statistics are patched with just those rows, and the result is written back as the new
+snapshot. A correction to one school therefore costs one workbook parse
+plus work proportional to the rows that changed.
+
+The table is kept as one segment of rows per source, in source order, so a
+refreshed table is identical to one built from scratch.
+"""
+import logging
+import os
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from uneb import perf, snapshot
+from uneb.cube import patch_cube
+from uneb.frozen import freeze
+from uneb.ingest import read_each, source_files
+from uneb.metrics import GRADES, add_metrics, clean
+from uneb.schema import compact
+from uneb.store import MemoryStore
+
+log = logging.getLogger(__name__)
+
+REFRESH_ENV = 'UNEB_REFRESH_INTERVAL'
+DEFAULT_INTERVAL = 5.0
+
+# A centre is identified by exam year, district and name (plus a running
+# number for centres sharing a name within a district)
+KEY = ['Year', 'DistrictName', 'CentreName']
+
+# The only columns the derived metrics depend on
+INPUTS = GRADES + ['Absent']
+
+# One consistent generation of the dataset; swapped as a whole on refresh
+State = namedtuple('State', 'version frame cube correlations store sources rows stamps')
+
+
+def prepare(raw):
+    """Cleaned rows of one source, before metrics."""
+    df = clean(raw)
+    df['Year'] = df['Year'].astype('int64')
+    return df
+
+
+def build(sources):
+    """Parse ``sources`` from scratch; returns the table and its snapshot meta."""
+    with perf.span('data.parse', sources=len(sources)):
+        frames = [None if raw is None else prepare(raw) for raw in read_each(sources)]
+        if all(df is None for df in frames):
+            raise ValueError(f"No result sheets with a DistrictName column in {list(map(str, sources))}")
+        df = pd.concat([df for df in frames if df is not None], ignore_index=True)
+    with perf.span('data.metrics', rows=len(df)):
+        df = compact(add_metrics(df))
+    return df, {'rows': [0 if f is None else len(f) for f in frames]}
+
+
+def _stamp(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _centres(df):
+    # Compare in full-width types: the stored table is compacted (see uneb.schema)
+    keys = df[KEY].astype({'Year': 'int64', 'DistrictName': 'str', 'CentreName': 'str'})
+    keys = keys.assign(_n=keys.groupby(KEY, sort=False).cumcount())
+    return pd.MultiIndex.from_frame(keys)
+
+
+def merge_source(old, raw):
+    """Re-derive one source's rows from its new ``raw`` contents.
+
+    Returns ``(rows, removed, added)``: the source's new rows, the old rows
+    whose cube contribution is gone and the new rows that replace them.
+    Centres whose grade counts are unchanged keep their derived values.
+    """
+    new = prepare(raw)
+    position = _centres(old).get_indexer(_centres(new))
+    same = position >= 0
+    same[same] = (old[INPUTS].to_numpy()[position[same]] == new[INPUTS].to_numpy()[same]).all(axis=1)
+
+    added = add_metrics(new[~same])
+    derived = [col for col in added.columns if col not in new.columns]
+    kept = pd.concat([new[same], old[derived].iloc[position[same]].set_axis(new.index[same])], axis=1)
+    rows = pd.concat([kept, added]).sort_index()[added.columns]
+
+    stale = np.ones(len(old), dtype=bool)
+    stale[position[same]] = False
+    return rows, old[stale], added
+
+
+class LiveDataset:
+    """The dataset and its cube, kept current with the source workbooks."""
+
+    def __init__(self, interval=None):
+        if interval is None:
+            interval = float(os.environ.get(REFRESH_ENV) or DEFAULT_INTERVAL)
+        sources = source_files()
+        frame, meta = snapshot.load(sources, lambda: build(sources))
+        self._start(interval, sources, frame, meta)
+
+    @classmethod
+    def fixed(cls, frame, meta):
+        """A dataset over an already-built table that never refreshes (see ``uneb.bundle``)."""
+        live = cls.__new__(cls)
+        live._start(0, [], frame, meta)
+        return live
+
+    def _start(self, interval, sources, frame, meta):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._checked = time.monotonic()
+        store = MemoryStore(freeze(frame))
+        with perf.span('data.cube'):
+            cube = store.cube()
+        with perf.span('data.correlations'):
+            correlations = store.correlations()
+        self.state = State(0, store.frame, freeze(cube), correlations, store, sources, meta['rows'],
+                           [_stamp(s) for s in sources])
+
+    def refresh(self):
+        """Pick up changed workbooks, at most every ``interval`` seconds.
+
+        Returns True when the dataset changed. A failed refresh (say, a
+        workbook caught half-written) is logged and retried later; the
+        current data keeps being served meanwhile.
+        """
+        if not self.interval or time.monotonic() - self._checked < self.interval:
+            return False
+        with self._lock:
+            if time.monotonic() - self._checked < self.interval:
+                return False
+            self._checked = time.monotonic()
+            state = self.state
+            try:
+                sources = source_files()
+                stamps = [_stamp(s) for s in sources]
+                if sources == state.sources and stamps == state.stamps:
+                    return False
+                with perf.span('data.refresh'):
+                    self.state = self._patch(state, sources, stamps)
+            except Exception:
+                log.exception("Dataset refresh failed; still serving version %d", state.version)
+                return False
+            perf.count('data.refresh')
+            return True
+
+    def _patch(self, state, sources, stamps):
+        ends = np.cumsum(state.rows)
+        segments = {source: state.frame.iloc[end - rows:end]
+                    for source, rows, end in zip(state.sources, state.rows, ends)}
+        previous = dict(zip(state.sources, state.stamps))
+        changed = [s for s, stamp in zip(sources, stamps) if previous.get(s) != stamp]
+
+        removed = [segments[s] for s in state.sources if s not in sources]
+        added = []
+        for source, raw in zip(changed, read_each(changed)):
+            old = segments.get(source, state.frame.iloc[:0])
+            if raw is None:
+                segments[source] = state.frame.iloc[:0]
+                removed.append(old)
+                continue
+            segments[source], stale, fresh = merge_source(old, raw)
+            removed.append(stale)
+            added.append(fresh)
+
+        parts = [segments[s] for s in sources]
+        frame = compact(pd.concat(parts, ignore_index=True))
+        if frame.empty:
+            raise ValueError(f"No result sheets with a DistrictName column in {list(map(str, sources))}")
+        removed = pd.concat(removed, ignore_index=True) if removed else frame.iloc[:0]
+        # Same types as the table, so the cube and correlations see the stored values
+        added = compact(pd.concat(added, ignore_index=True)) if added else frame.iloc[:0]
+        with perf.span('data.cube', removed=len(removed), added=len(added)):
+            cube = patch_cube(state.cube, removed, added)
+        with perf.span('data.correlations', removed=len(removed), added=len(added)):
+            correlations = state.correlations.patch(removed, added)
+
+        rows = [len(part) for part in parts]
+        snapshot.save(sources, frame, {'rows': rows})
+        log.info("Dataset refreshed: %d rows replaced by %d across %d workbook(s)",
+                 len(removed), len(added), len(changed))
+        store = MemoryStore(freeze(frame))
+        return State(state.version + 1, store.frame, freeze(cube), correlations, store, sources, rows, stamps)
@@ -0,0 +1,92 @@
+"""Compact column types for the school table.
+
+Applied once when the table is built (and stored that way in the snapshot),
+so every copy of it - the shared frame, selections taken from it and the
+values Streamlit caches - is several times smaller than with the default
+types:
+
+* text columns (district and centre names) become categoricals, so each
+  distinct name is stored once and rows hold small integer codes;
+* grade and student counts share the smallest unsigned type that holds the
+  largest centre total, so adding up a centre's counts cannot overflow (a
+  count column holding a negative or missing value keeps its type, so a bad
+  cell is never wrapped into a plausible small number);
+* other integers, the exam year included, get the smallest type that fits;
+* rates become float32, which is far more precision than the one decimal
+  place they are shown with.
+
+Code that sums or groups these columns in bulk (the cube, for one) widens
+them first.
+"""
+import pandas as pd
+
+from uneb.metrics import GRADES, METRICS
+
+# Per-centre counts; none can exceed the centre's Total_Students
+COUNTS = GRADES + ['Absent', 'Total', 'Total_Students', 'Excellent_Grades']
+
+
+def _smallest_int(values):
+    if values.isna().any():
+        return values
+    kind = 'unsigned' if not len(values) or values.min() >= 0 else 'signed'
+    return pd.to_numeric(values, downcast=kind)
+
+
+def _category(values):
+    # Sorted categories, so compacting is deterministic and idempotent
+    return pd.Categorical(values, categories=sorted(values.dropna().unique()))
+
+
+def _unsigned(values):
+    # Only complete, non-negative integers fit an unsigned type unchanged
+    return (pd.api.types.is_integer_dtype(values.dtype) and not values.isna().any()
+            and (not len(values) or values.min() >= 0))
+
+
+def compact(df):
+    """``df`` with every column in its compact type."""
+    columns = {}
+    counts = [c for c in COUNTS if c in df.columns and _unsigned(df[c])]
+    if counts:
+        shared = _smallest_int(pd.Series([df[c].max() for c in counts] + [0]).fillna(0).astype('int64')).dtype
+    for column in df.columns:
+        values = df[column]
+        if column in counts:
+            columns[column] = values.astype(shared)
+        elif column in COUNTS and pd.api.types.is_integer_dtype(values.dtype):
+            continue
+        elif column in METRICS or pd.api.types.is_float_dtype(values.dtype):
+            columns[column] = values.astype('float32')
+        elif pd.api.types.is_integer_dtype(values.dtype):
+            columns[column] = _smallest_int(values)
+        elif isinstance(values.dtype, pd.CategoricalDtype) and values.cat.ordered:
+            continue
+        elif pd.api.types.is_string_dtype(values.dtype) or isinstance(values.dtype, pd.CategoricalDtype):
+            columns[column] = _category(values)
+    return df.assign(**columns)
+
+
+def _wide(dtype):
+    # The type a column would have without ``compact``
+    if pd.api.types.is_integer_dtype(dtype):
+        return 'int64'
+    if pd.api.types.is_float_dtype(dtype):
+        return 'float64'
+    if isinstance(dtype, pd.CategoricalDtype) and not dtype.ordered:
+        return 'str'
+    return dtype
+
+
+def memory_report(df):
+    """Bytes per column as stored, next to what the default types would take."""
+    stored = df.memory_usage(deep=True, index=False)
+    wide = df.astype({c: _wide(t) for c, t in df.dtypes.items()}).memory_usage(deep=True, index=False)
+    report = pd.DataFrame({
+        'Column': df.columns,
+        'Type': [str(t) for t in df.dtypes],
+        'Bytes': stored.to_numpy(),
+        'Default bytes': wide.to_numpy(),
+    })
+    totals = pd.DataFrame({'Column': ['Total'], 'Type': [''], 'Bytes': [stored.sum()], 'Default bytes': [wide.sum()]})
+    return pd.concat([report, totals], ignore_index=True)
@@ -0,0 +1,126 @@
+"""Normalized school-name index: exact, prefix and fuzzy lookup.
+
+Centre names are case-folded, accent- and punctuation-stripped before
+indexing, so "St. Mary's" and "ST.MARY'S" are the same key. Exact lookups
+are a dict hit and prefix/word lookups binary searches over sorted keys, so
+they stay sub-millisecond for thousands of centres. The fuzzy fallback
+corrects each query word against vocabulary words sharing its initial and
+keeps the names matching every word that way, ranked by how closely their
+opening reads like the query.
+
+Given each row's district, searches can be limited to a set of districts;
+the limit then counts only names found there.
+"""
+import bisect
+import difflib
+import re
+import unicodedata
+from collections import Counter
+from heapq import nlargest
+
+import numpy as np
+
+_NON_ALNUM = re.compile(r'[^0-9a-z]+')
+
+
+def normalize(name):
+    """Case-folded, punctuation-insensitive form of a school name."""
+    text = unicodedata.normalize('NFKD', str(name)).encode('ascii', 'ignore').decode()
+    return _NON_ALNUM.sub(' ', text.casefold()).strip()
+
+
+class SchoolIndex:
+    """Maps normalized centre names to row positions of the frame they came from."""
+
+    def __init__(self, names, groups=None):
+        self._groups = None if groups is None else np.asarray(groups, dtype=object)
+        positions = {}
+        for position, name in enumerate(names):
+            positions.setdefault(normalize(name), []).append(position)
+        self._positions = {key: np.array(rows) for key, rows in positions.items()}
+        self._keys = sorted(self._positions)
+
+        words = {}
+        for key in self._keys:
+            for word in key.split():
+                words.setdefault(word, []).append(key)
+        self._words = words
+        self._vocabulary = sorted(words)
+        self._by_initial = {}
+        for word in self._vocabulary:
+            self._by_initial.setdefault(word[0], []).append(word)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def exact(self, name):
+        """Row positions of the school called ``name`` (empty if unknown)."""
+        return self._positions.get(normalize(name), np.array([], dtype=int))
+
+    def _prefixed(self, sorted_keys, prefix):
+        start = bisect.bisect_left(sorted_keys, prefix)
+        end = bisect.bisect_left(sorted_keys, prefix + '\x7f')
+        return sorted_keys[start:end]
+
+    def _word_matches(self, query):
+        # Names in which every query word starts one of the name's words
+        matches = None
+        for word in query.split():
+            keys = {key for w in self._prefixed(self._vocabulary, word) for key in self._words[w]}
+            matches = keys if matches is None else matches & keys
+            if not matches:
+                return []
+        return sorted(matches or ())
+
+    def _within(self, groups):
+        # Whether each row belongs to ``groups``; None when searching everything
+        if groups is None or self._groups is None:
+            return None
+        return np.isin(self._groups, list(groups))
+
+    def _fuzzy(self, query, limit, rows):
+        # Names containing a near miss of every query word, those whose opening
+        # reads most like the query first
+        words = query.split()
+        hits = Counter()
+        for word in words:
+            vocabulary = self._by_initial.get(word[0], [])
+            keys = {key for close in difflib.get_close_matches(word, vocabulary, n=5, cutoff=0.7)
+                    for key in self._words[close]}
+            hits.update(key for key in keys if rows is None or rows[self._positions[key]].any())
+        matched = [key for key, count in hits.items() if count == len(words)]
+
+        def score(key):
+            return difflib.SequenceMatcher(None, query, key[:len(query)]).ratio()
+
+        return nlargest(limit, matched, key=score)
+
+    def search(self, text, limit=20, groups=None):
+        """Best matching normalized names: exact, then prefix, then word matches.
+
+        Fuzzy matching is only a fallback for queries nothing else matches.
+        With ``groups``, only names of schools in those districts are returned.
+        """
+        query = normalize(text)
+        if not query:
+            return []
+        rows = self._within(groups)
+        found, seen = [], set()
+        for keys in ([query] if query in self._positions else [],
+                     self._prefixed(self._keys, query),
+                     self._word_matches(query)):
+            for key in keys:
+                if key not in seen and (rows is None or rows[self._positions[key]].any()):
+                    seen.add(key)
+                    found.append(key)
+                    if len(found) == limit:
+                        return found
+        return found or self._fuzzy(query, limit, rows)
+
+    def positions(self, keys, groups=None):
+        """Row positions for normalized names returned by ``search``, optionally only in ``groups``."""
+        if not keys:
+            return np.array([], dtype=int)
+        positions = np.concatenate([self._positions[key] for key in keys])
+        rows = self._within(groups)
+        return positions if rows is None else positions[rows[positions]]
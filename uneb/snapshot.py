@@ -0,0 +1,136 @@
+"""On-disk columnar snapshots of the cleaned school results.
+
+Parsing the workbook through openpyxl dominates a cold start, so the cleaned
+frame (derived metric columns included) is written once to an Arrow/Feather
+file named after the content hash of its source workbooks. Later processes
+memory-map that file instead of parsing Excel again.
+
+The source mtime and size are recorded in a small manifest next to the
+snapshots; while they are unchanged the workbook is not even re-hashed.
+
+A snapshot can carry a small JSON ``meta`` dict alongside the frame (stored
+in the Arrow schema metadata), such as how many rows each source produced.
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from uneb import perf
+
+SNAPSHOT_DIR = Path(os.environ.get(
+    "UNEB_SNAPSHOT_DIR", Path(__file__).resolve().parent.parent / ".snapshots"
+))
+
+# Bump whenever the cleaning or metric code changes what ends up in a snapshot
+FORMAT_VERSION = 8
+
+_MANIFEST = "manifest.json"
+_META_KEY = b"uneb.meta"
+
+
+def _read_manifest():
+    try:
+        with open(SNAPSHOT_DIR / _MANIFEST) as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_manifest(manifest):
+    tmp = SNAPSHOT_DIR / f"{_MANIFEST}.{os.getpid()}.tmp"
+    with open(tmp, "w") as fh:
+        json.dump(manifest, fh, indent=1, sort_keys=True)
+    os.replace(tmp, SNAPSHOT_DIR / _MANIFEST)
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def source_hashes(sources):
+    """Return the content hash of each source, re-hashing only changed files."""
+    manifest = _read_manifest()
+    hashes, dirty = [], False
+    for source in sources:
+        path = str(Path(source).resolve())
+        stat = os.stat(path)
+        entry = manifest.get(path)
+        if not entry or entry["mtime_ns"] != stat.st_mtime_ns or entry["size"] != stat.st_size:
+            entry = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha256": _sha256(path)}
+            manifest[path] = entry
+            dirty = True
+        hashes.append(entry["sha256"])
+    if dirty:
+        SNAPSHOT_DIR.mkdir(parents=True, exist_ok=True)
+        _write_manifest(manifest)
+    return hashes
+
+
+def snapshot_key(sources):
+    """Stable name for the snapshot built from ``sources`` at their current content."""
+    paths = sorted(str(Path(s).resolve()) for s in sources)
+    group = hashlib.sha256("\n".join(paths).encode()).hexdigest()[:12]
+    content = hashlib.sha256()
+    content.update(f"v{FORMAT_VERSION}".encode())
+    for digest in source_hashes(paths):
+        content.update(digest.encode())
+    return f"{group}-{content.hexdigest()[:16]}"
+
+
+def read_frame(path):
+    """Memory-map a frame written by ``write_frame``; returns ``(frame, meta)``."""
+    table = feather.read_table(path, memory_map=True)
+    meta = json.loads((table.schema.metadata or {}).get(_META_KEY, b"{}"))
+    return table.to_pandas(), meta
+
+
+def write_frame(path, df, meta):
+    """Atomically write ``df`` with ``meta`` to ``path``."""
+    table = pa.Table.from_pandas(df.reset_index(drop=True), preserve_index=False)
+    table = table.replace_schema_metadata({**table.schema.metadata, _META_KEY: json.dumps(meta).encode()})
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    tmp = Path(path).with_suffix(f".{os.getpid()}.tmp")
+    feather.write_feather(table, tmp)
+    os.replace(tmp, path)
+
+
+def save(sources, df, meta, key=None):
+    """Write ``df`` and ``meta`` as the snapshot of ``sources``, replacing older ones."""
+    key = key or snapshot_key(sources)
+    path = SNAPSHOT_DIR / f"{key}.feather"
+    with perf.span("snapshot.write"):
+        write_frame(path, df, meta)
+
+    # Drop stale snapshots of the same sources
+    group = key.split("-")[0]
+    for old in SNAPSHOT_DIR.glob(f"{group}-*.feather"):
+        if old != path:
+            old.unlink(missing_ok=True)
+
+
+def load(sources, build):
+    """Return ``(frame, meta)`` for ``sources``, calling ``build()`` only on a snapshot miss."""
+    with perf.span("snapshot.key"):
+        key = snapshot_key(sources)
+    path = SNAPSHOT_DIR / f"{key}.feather"
+    if path.exists():
+        try:
+            with perf.span("snapshot.read"):
+                loaded = read_frame(path)
+            perf.count("snapshot.hit")
+            return loaded
+        except (OSError, ValueError, pa.ArrowInvalid):
+            pass
+
+    perf.count("snapshot.miss")
+    df, meta = build()
+    save(sources, df, meta, key)
+    return df, meta
@@ -0,0 +1,138 @@
+"""The in-memory school table, read through the same interface as the database.
+
+``uneb.data`` serves every page through a store, whichever backend holds the
+rows: ``uneb.database.Database`` for an archive on disk, ``MemoryStore`` for
+the frame ``uneb.refresh.LiveDataset`` keeps. Both answer
+
+* ``schools`` - rows of a year and district selection, optionally only some
+  columns, only the rows matching ``criteria``, or one window of a ranking;
+* ``names`` and ``rows`` - the names of a year's schools with one integer
+  ``Key`` per row, and the full rows of given keys;
+* ``count``, ``distinct`` and ``at_most`` - match counts, filter values and
+  the counts behind a percentile rank;
+* ``cube`` and ``correlations`` - the aggregate statistics.
+
+Here a key is the row's position in the table. Selections, rank orders and
+filter indexes are built on first use and kept per store, and a store serves
+one generation of the table, so they never go stale.
+"""
+from functools import cached_property, lru_cache
+
+import numpy as np
+import pandas as pd
+
+from uneb import perf
+from uneb.correlation import CorrelationStats
+from uneb.cube import build_cube
+from uneb.filters import COLUMNS as FILTERED, FilterIndex
+from uneb.ranking import RankOrder
+
+
+def _take(frame, positions):
+    # Consecutive rows in order (a whole workbook, usually) are a view, not a copy
+    if positions is None:
+        return frame
+    if len(positions) and (np.diff(positions) == 1).all():
+        return frame.iloc[positions[0]:positions[-1] + 1]
+    return frame.take(positions)
+
+
+class MemoryStore:
+    """A school table held as a frame, with the read methods of ``uneb.database.Database``."""
+
+    def __init__(self, frame):
+        self.frame = frame
+        self._selection = lru_cache(maxsize=64)(self._select)
+        self._ranking = lru_cache(maxsize=32)(self._rank)
+        self._sorted = lru_cache(maxsize=64)(self._sort)
+        self._index = lru_cache(maxsize=32)(self._filter)
+
+    @cached_property
+    def _partitions(self):
+        # Row positions of every (year, district) pair, from a single groupby pass
+        with perf.span('data.partitions'):
+            return self.frame.groupby(['Year', 'DistrictName'], sort=True, observed=True).indices
+
+    def _select(self, year, districts):
+        # Sorted row positions of the selection; None for the whole table
+        if year is None and districts is None:
+            return None
+        wanted = None if districts is None else set(districts)
+        parts = [rows for (y, district), rows in self._partitions.items()
+                 if (year is None or y == year) and (wanted is None or district in wanted)]
+        positions = np.sort(np.concatenate(parts)) if parts else np.array([], dtype=np.intp)
+        positions.flags.writeable = False
+        return positions
+
+    def _rank(self, year, districts, column, ascending):
+        with perf.span('data.rank', column=column):
+            return RankOrder(_take(self.frame[column], self._selection(year, districts)), ascending)
+
+    def _sort(self, year, districts, column):
+        values = _take(self.frame[column], self._selection(year, districts)).to_numpy()
+        return np.sort(values[~np.isnan(values)])
+
+    def _filter(self, year, districts):
+        with perf.span('data.filter_index'):
+            return FilterIndex(_take(self.frame[FILTERED], self._selection(year, districts)))
+
+    def _positions(self, year, districts, criteria=None, order=None, ascending=False):
+        # Row positions of the matching rows (None for the whole table), ranked when ``order`` is set
+        districts = None if districts is None else tuple(districts)
+        positions = self._selection(year, districts)
+        if not criteria and order is None:
+            return positions
+        picked = self._index(year, districts).select(criteria)
+        if order is not None:
+            picked = self._ranking(year, districts, order, ascending).select(picked)
+        return picked if positions is None else positions[picked]
+
+    def schools(self, year=None, districts=None, columns=None, criteria=None,
+                order=None, ascending=False, limit=None, offset=0):
+        """School rows of ``districts`` in ``year``; see ``uneb.database.Database.schools``."""
+        positions = self._positions(year, districts, criteria, order, ascending)
+        if limit is not None:
+            if positions is None:
+                positions = np.arange(len(self.frame))
+            positions = positions[offset:offset + limit]
+        frame = self.frame if columns is None else self.frame[[c for c in self.frame.columns if c in columns]]
+        return _take(frame, positions)
+
+    def names(self, year):
+        """Centre and district names of ``year``'s schools in table order, with each row's key."""
+        positions = self._selection(year, None)
+        return _take(self.frame[['CentreName', 'DistrictName']], positions).assign(
+            Key=np.arange(len(self.frame)) if positions is None else positions)
+
+    def rows(self, keys):
+        """School rows by key, in the order of ``keys``."""
+        return self.frame.take(np.asarray(keys, dtype=np.intp))
+
+    def count(self, year=None, districts=None, criteria=None):
+        """How many schools match; see ``schools``."""
+        positions = self._positions(year, districts, criteria)
+        return len(self.frame) if positions is None else len(positions)
+
+    def distinct(self, column, year=None, districts=None):
+        """Distinct non-null values of ``column``, in order of first appearance."""
+        districts = None if districts is None else tuple(districts)
+        if column in FILTERED:
+            return self._index(year, districts).values(column)
+        values = _take(self.frame[column], self._selection(year, districts))
+        return [v for v in values.unique() if not pd.isna(v)]
+
+    def at_most(self, column, key, year=None, districts=None):
+        """``(schools with column <= the school's at key, schools with a value)``, for percentile ranks."""
+        ranked = self._sorted(year, None if districts is None else tuple(districts), column)
+        own = self.frame[column].iat[int(key)]
+        if pd.isna(own):
+            return None, len(ranked)
+        return int(np.searchsorted(ranked, own, side='right')), len(ranked)
+
+    def cube(self):
+        """The year x district x tier cube (see ``uneb.cube``)."""
+        return build_cube(self.frame)
+
+    def correlations(self):
+        """Correlation statistics per (year, district) (see ``uneb.correlation``)."""
+        return CorrelationStats.build(self.frame)